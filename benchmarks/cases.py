@@ -0,0 +1,161 @@
+"""
+Cases of the benchmark suite (see benchmarks/run.py). Each case builds its inputs and returns the function
+which is timed, so that the setup is not measured. A case with params is run once for each of them
+"""
+
+import functools
+import numpy as np
+import flamb
+from flamb import Variable, nn, runtime
+from flamb.autograd.batched import backward_tensor
+from flamb.nn.utils import prune
+
+# Name of each benchmark: (setup, args of setup)
+CASES = {}
+
+
+def case(name, params=None):
+    """Registers the decorated function as the benchmark name, or name[param] for each param of params"""
+    def register(setup):
+        if params is None:
+            CASES[name] = (setup, ())
+        for param in params or []:
+            CASES[f"{name}[{'x'.join(map(str, np.atleast_1d(param)))}]"] = (setup, (param,))
+        return setup
+    return register
+
+
+@case("variable.ops")
+def variable_ops():
+    x, w = Variable(1.5), Variable(0.5)
+
+    def run():
+        for _ in range(20000):
+            (x * w + 1.0 - x) / w
+    return run
+
+
+@case("variable.backward.deep")
+def variable_backward_deep():
+    """Chains of 500 operations (the backward is recursive, the depth stays below the recursion limit)"""
+    x, w = Variable(0.1), Variable(0.5)
+    outputs = []
+    for _ in range(20):
+        y = x
+        for _ in range(250):
+            y = (y * w + 0.1).tanh()
+        outputs.append(y)
+
+    def run():
+        for output in outputs:
+            output.backward()
+    return run
+
+
+@case("variable.backward.wide")
+def variable_backward_wide():
+    """Sum of 20000 products of leaves, reduced pairwise"""
+    rng = np.random.default_rng(0)
+    terms = [Variable(a) * Variable(b) for a, b in rng.normal(size=(20000, 2)).tolist()]
+    while len(terms) > 1:
+        terms = [terms[i] + terms[i + 1] for i in range(0, len(terms) - 1, 2)] + terms[len(terms) - len(terms) % 2:]
+    return terms[0].backward
+
+
+@case("tensor.zeros", params=[(100,), (100, 100), (300, 300)])
+def tensor_zeros(shape):
+    return lambda: flamb.zeros(shape)
+
+
+@case("tensor.rand", params=[(100,), (100, 100), (300, 300)])
+def tensor_rand(shape):
+    generator = flamb.Generator(0)
+    return lambda: flamb.rand(shape, generator=generator)
+
+
+@case("tensor.to_tensor", params=[(100,), (100, 100), (300, 300)])
+def tensor_to_tensor(shape):
+    values = np.random.default_rng(0).normal(size=shape)
+    return lambda: flamb.to_tensor(values)
+
+
+def linear_inputs(batch_size, input_size, output_size):
+    flamb.manual_seed(0)
+    layer = nn.Linear(input_size, output_size)
+    x = flamb.to_tensor(np.random.default_rng(0).normal(size=(batch_size, input_size)))
+    return layer, x
+
+
+@case("linear.forward", params=[(64, 128, 128), (256, 512, 256)])
+def linear_forward(sizes):
+    layer, x = linear_inputs(*sizes)
+    return lambda: layer(x)
+
+
+@case("linear.backward", params=[(64, 128, 128), (256, 512, 256)])
+def linear_backward(sizes):
+    layer, x = linear_inputs(*sizes)
+    output = layer(x)
+    grad = np.ones(output.shape)
+    return lambda: backward_tensor(output, grad)
+
+
+@case("loss.mse", params=[(16, 10), (64, 10)])
+def loss_mse(shape):
+    rng = np.random.default_rng(0)
+    x = flamb.to_tensor(rng.normal(size=shape), requires_grad=True)
+    y = flamb.to_tensor(rng.normal(size=shape))
+    loss_fn = nn.losses.MSE()
+
+    def run():
+        loss_fn(x, y).backward()
+    return run
+
+
+def optimizer_step(optimizer_class, size):
+    flamb.manual_seed(0)
+    layer = nn.Linear(size, size)
+    optimizer = optimizer_class(layer.get_parameters(), learning_rate=1e-3)
+    optimizer.storage.grads[...] = np.random.default_rng(0).normal(size=len(optimizer.storage))
+
+    def run():
+        for _ in range(20):
+            optimizer.step(zero_grad=False)
+    return run
+
+
+@case("optimizer.sgd", params=[128, 512])
+def optimizer_sgd(size):
+    return optimizer_step(nn.optimizers.SGD, size)
+
+
+@case("optimizer.adam", params=[128, 512])
+def optimizer_adam(size):
+    return optimizer_step(nn.optimizers.Adam, size)
+
+
+@functools.lru_cache(maxsize=None)
+def pruned_linear(percent):
+    flamb.manual_seed(0)
+    linear = nn.Linear(1024, 1024)
+    prune(linear, 1 - percent / 100)
+    return linear
+
+
+def sparse_linear(params, max_csr_density):
+    """Kernel of a SparseLinear layer (as run by flamb.runtime) on batch_size samples, with percent % of weights left"""
+    batch_size, percent = params
+    layer = nn.SparseLinear(pruned_linear(percent), max_csr_density)
+    kernel, _ = runtime.KERNELS[layer.format + "_linear"]
+    x = np.random.default_rng(0).normal(size=(batch_size, 1024))
+    return lambda: kernel(x, *layer.constants())
+
+
+@case("sparse_linear.csr", params=[(1, 2), (1, 5), (1, 10), (1, 30), (64, 5)])
+def sparse_linear_csr(params):
+    return sparse_linear(params, max_csr_density=1)
+
+
+@case("sparse_linear.compact", params=[(1, 2), (1, 5), (1, 10), (1, 30), (64, 5)])
+def sparse_linear_compact(params):
+    return sparse_linear(params, max_csr_density=0)
@@ -0,0 +1,67 @@
+"""
+Measures the scaling of flamb.parallel.DataParallel: time per training step for several numbers of workers,
+speedup and scaling efficiency (speedup / number of workers) relative to a single process.
+
+    python benchmarks/data_parallel.py --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flamb import nn
+from flamb.parallel import DataParallel
+
+
+class Model(nn.Module):
+    def __init__(self, size):
+        super().__init__()
+        self.linear = nn.Linear(size, size)
+        self.linear2 = nn.Linear(size, 1)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear2(self.linear(x))
+
+
+def mean_squared_error(output, target):
+    diff = (output - target) ** 2
+    return diff.sum() / diff.size
+
+
+def time_steps(nb_workers, batch, size, nb_steps):
+    model = Model(size)
+    optimizer = nn.optimizers.SGD(model.parameters, learning_rate=1e-3)
+    with DataParallel(model, mean_squared_error, optimizer, nb_workers) as data_parallel:
+        data_parallel.train_batch(batch)
+        start = time.perf_counter()
+        for _ in range(nb_steps):
+            data_parallel.train_batch(batch)
+        return (time.perf_counter() - start) / nb_steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--steps", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    batch = (rng.normal(size=(args.batch_size, args.size)), rng.normal(size=(args.batch_size, 1)))
+    reference = None
+    print(f"{'workers':>8} {'step (ms)':>10} {'speedup':>8} {'efficiency':>10}")
+    for nb_workers in args.workers:
+        duration = time_steps(nb_workers, batch, args.size, args.steps)
+        # Time of a single process, estimated from the first number of workers if it is not 1
+        reference = reference or duration * nb_workers
+        speedup = reference / duration
+        print(f"{nb_workers:>8} {duration * 1e3:>10.1f} {speedup:>8.2f} {speedup / nb_workers:>10.0%}")
+
+
+if __name__ == '__main__':
+    main()
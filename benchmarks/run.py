@@ -0,0 +1,171 @@
+"""
+Runs the benchmark suite of flamb (see benchmarks/cases.py): time and peak memory of each case, written as JSON
+and compared to a baseline. Exits with status 1 if a case is slower, or uses more memory, than the baseline
+by more than the thresholds.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --filter "linear.*" --output results.json
+    python benchmarks/run.py --save-baseline
+
+The time of a case is the fastest of --repeat runs, each on freshly built inputs (the median is also
+reported), and the cases slower than the baseline are measured again before being reported. The peak memory
+is measured with tracemalloc in a separate run (tracemalloc slows the code down). The baseline may contain
+a "thresholds" dict {pattern: {"time": ..., "memory": ...}} overriding the thresholds of the cases matching the pattern
+"""
+
+import argparse
+import datetime
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import numpy as np
+from cases import CASES
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Differences of peak memory below this number of bytes are ignored
+MEMORY_SLACK = 64 * 1024
+
+
+def measure(setup, args, repeat):
+    """Returns the times of repeat runs of the case, and its peak memory (in bytes)"""
+    setup(*args)()  # warm-up
+    times = []
+    for _ in range(repeat):
+        run = setup(*args)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    run = setup(*args)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak_memory
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def thresholds_of(name, baseline, time_threshold, memory_threshold):
+    """Thresholds of the case name: the defaults, overridden by the patterns of the baseline matching name"""
+    thresholds = {"time": time_threshold, "memory": memory_threshold}
+    for pattern, overrides in baseline.get("thresholds", {}).items():
+        if fnmatch.fnmatchcase(name, pattern):
+            thresholds.update(overrides)
+    return thresholds
+
+
+def compare(results, baseline, time_threshold, memory_threshold):
+    """
+    Returns the list of the regressions of results with respect to baseline (both as written by this script):
+    (name, metric, ratio to the baseline, threshold). The cases missing from the baseline are not compared
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        thresholds = thresholds_of(name, baseline, time_threshold, memory_threshold)
+        ratio = result["time"] / reference["time"]
+        if ratio > 1 + thresholds["time"]:
+            regressions.append((name, "time", ratio, thresholds["time"]))
+        memory, reference_memory = result["peak_memory"], reference["peak_memory"]
+        if memory - reference_memory > MEMORY_SLACK and memory > reference_memory * (1 + thresholds["memory"]):
+            regressions.append((name, "memory", memory / max(reference_memory, 1), thresholds["memory"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filter", default="*", help="run only the cases whose name matches this pattern")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="file in which the results are written as JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("--time-threshold", type=float, default=0.3, help="allowed relative increase of the time")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="allowed relative increase of the memory")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if fnmatch.fnmatchcase(name, args.filter)]
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = {}
+    print(f"{'case':<32} {'time (ms)':>10} {'median (ms)':>12} {'peak (KB)':>10} {'vs baseline':>12}")
+    for name in names:
+        setup, setup_args = CASES[name]
+        times, peak_memory = measure(setup, setup_args, args.repeat)
+        results[name] = {
+            "time": min(times),
+            "time_median": statistics.median(times),
+            "peak_memory": peak_memory,
+            "repeat": args.repeat,
+        }
+        reference = baseline["results"].get(name) if baseline else None
+        change = f"{results[name]['time'] / reference['time'] - 1:+.0%}" if reference else "-"
+        print(f"{name:<32} {min(times) * 1e3:>10.2f} {statistics.median(times) * 1e3:>12.2f} "
+              f"{peak_memory / 1024:>10.0f} {change:>12}")
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare(results, baseline, args.time_threshold, args.memory_threshold)
+        # The slower cases are measured again, to ignore the ones slowed down by the noise of the machine
+        for name in sorted({name for name, metric, _, _ in regressions if metric == "time"}):
+            setup, setup_args = CASES[name]
+            times, _ = measure(setup, setup_args, args.repeat)
+            results[name]["time"] = min(results[name]["time"], min(times))
+        regressions = compare(results, baseline, args.time_threshold, args.memory_threshold)
+
+    report = {"metadata": metadata(), "results": results}
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                # The results of the cases which were not run, and the thresholds, are kept
+                previous = json.load(file)
+            report["thresholds"] = previous.get("thresholds", {})
+            results.update({name: result for name, result in previous["results"].items() if name not in results})
+        args.output = args.baseline
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+
+    for name, metric, ratio, threshold in regressions:
+        print(f"Regression of {name}: {metric} is {ratio:.2f}x the baseline (threshold +{threshold:.0%})")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
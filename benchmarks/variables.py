@@ -0,0 +1,70 @@
+"""
+Measures the scalar Variables: memory per node of the graph, operations per second in the forward,
+backward passes per second, and training-like steps (forward and backward) with and without an arena.
+
+    python benchmarks/variables.py
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flamb import Variable
+from flamb.autograd.variable import arena
+
+
+def bytes_per_node(nb_nodes=200000):
+    """Memory of the results of x * w + 1 (2 nodes per expression), with their values"""
+    x, w = Variable(1.5), Variable(0.5)
+    gc.collect()
+    tracemalloc.start()
+    nodes = [x * w + 1.0 for _ in range(nb_nodes // 2)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (current - sys.getsizeof(nodes)) / nb_nodes
+
+
+def forward_ops_per_second(nb_iterations=200000):
+    x, w = Variable(1.5), Variable(0.5)
+    start = time.perf_counter()
+    for _ in range(nb_iterations):
+        y = (x * w + 1.0 - x) / w
+    return 4 * nb_iterations / (time.perf_counter() - start)
+
+
+def backward_per_second(nb_graphs=100000):
+    x, w = Variable(1.5), Variable(0.5)
+    outputs = [(x * w + 1.0).tanh() for _ in range(nb_graphs)]
+    start = time.perf_counter()
+    for output in outputs:
+        output.backward()
+    return nb_graphs / (time.perf_counter() - start)
+
+
+def steps_ops_per_second(use_arena, depth=300, nb_steps=20):
+    def step():
+        x, w = Variable(1.5), Variable(0.5)
+        y = x
+        for _ in range(depth):
+            y = (y * w + 1.0).tanh()
+        y.backward()
+
+    start = time.perf_counter()
+    for _ in range(nb_steps):
+        if use_arena:
+            with arena():
+                step()
+        else:
+            step()
+    return 3 * depth * nb_steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    print(f"bytes per node: {bytes_per_node():.0f}")
+    print(f"forward: {max(forward_ops_per_second() for _ in range(3)):.0f} ops/s")
+    print(f"backward: {max(backward_per_second() for _ in range(3)):.0f} graphs/s")
+    print(f"steps: {max(steps_ops_per_second(False) for _ in range(3)):.0f} ops/s")
+    print(f"steps with an arena: {max(steps_ops_per_second(True) for _ in range(3)):.0f} ops/s")
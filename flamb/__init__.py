@@ -1,22 +1,44 @@
-from flamb.autograd import Variable, no_grad
+from flamb.random import Generator, manual_seed
+from flamb.autograd import Variable, Parameter, no_grad, is_grad_enabled, set_grad_enabled
+from flamb.autograd.grad_mode import Environ
 from flamb.tensor import *
 from flamb import functional
 from flamb import nn
+from flamb import data
+from flamb import train
+from flamb import parallel
+from flamb import serve
+from flamb import runtime
+from flamb import random
+from flamb.export import export
 
-environ = {"is_grad_enabled": True}
+environ = Environ(is_grad_enabled=True)
 
 __all__ = [
     "Variable",
+    "Parameter",
     "Tensor",
     "zeros",
     "ones",
     "rand",
+    "randn",
     "to_tensor",
     "concatenate",
     "dot",
     "matmul",
     "no_grad",
+    "is_grad_enabled",
+    "set_grad_enabled",
+    "Generator",
+    "manual_seed",
     "environ",
     "functional",
     "nn",
+    "data",
+    "train",
+    "parallel",
+    "serve",
+    "runtime",
+    "random",
+    "export",
 ]
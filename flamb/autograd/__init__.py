@@ -1,4 +1,8 @@
 from .variable import Variable
-from .grad_mode import no_grad
+from .parameter import Parameter, SparseGrad
+from .flat_parameters import FlatParameters
+from .grad_mode import no_grad, is_grad_enabled, set_grad_enabled
+from .batched import per_sample_grad, jacobian
+from .function import Function
 
-__all__ = ["Variable", "no_grad", "operators"]
+__all__ = ["Variable", "Parameter", "SparseGrad", "FlatParameters", "no_grad", "is_grad_enabled", "set_grad_enabled", "per_sample_grad", "jacobian", "Function", "operators"]
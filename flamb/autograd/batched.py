@@ -0,0 +1,89 @@
+"""
+This file contains derivatives computed for each example of a batch at once: per-example gradients
+of the parameters of a module, and Jacobians of a batched function
+"""
+
+import flamb
+import numpy as np
+from . import operators
+from .operators import collect_per_sample_grads, get_value, needs_grad, send_grad
+
+
+def backward_tensor(x, grad):
+    """Runs a backward pass from the tensor x, whose gradient is grad (a numpy array with the shape of x)"""
+    is_root = operators.start_backward_pass()
+    try:
+        send_grad(x, grad)
+        if is_root:
+            operators.run_pending_operators()
+    finally:
+        if is_root:
+            operators.end_backward_pass()
+
+
+def first_element(x):
+    """Identifies a tensor of variables by its first variable (a Parameter by itself)"""
+    return id(x.flat[0]) if isinstance(x, flamb.Tensor) and x.size else id(x)
+
+
+def per_sample_grad(module, loss_fn, batch):
+    """
+    Returns the gradient of the loss of each example of batch (a pair (inputs, targets) whose first axis is the batch)
+    with respect to the parameters of module (a Module or a layer), as a dict "layer.attribute": array of shape
+    (batch_size, *parameter.shape), for instance {"linear.weights": ..., "linear.bias": ...}.
+    The loss of an example is loss_fn(outputs[i:i + 1], targets[i:i + 1]), and the examples should not interact
+    in the forward (as in BatchNorm1d in training mode).
+
+    All the gradients are computed in a single forward and backward on the batch: the layers compute the
+    gradients of each example from the values saved for backward (for instance the outer products of the inputs
+    and the gradients of the outputs of a Linear layer, see TensorOperator.per_sample_backward).
+    The parameters do not receive gradients. An exception is raised if a layer cannot compute per-example gradients
+    """
+    inputs, targets = batch
+    with collect_per_sample_grads() as collected:
+        outputs = module(inputs)
+        loss = loss_fn(outputs[:1], targets[:1])
+        for i in range(1, len(outputs)):
+            loss = loss + loss_fn(outputs[i:i + 1], targets[i:i + 1])
+        loss.backward()
+
+    # The layers can give their parameters to the operators reshaped (a view holding the same variables)
+    collected = {first_element(x): (x, grad) for x, grad in collected.grads.values()}
+    layers = module.named_layers() if isinstance(module, flamb.nn.Module) else [("", module)]
+    grads = {}
+    for layer_name, layer in layers:
+        for attribute, value in vars(layer).items():
+            if not isinstance(value, (flamb.Tensor, flamb.Parameter)):
+                continue
+            name = f"{layer_name}.{attribute}" if layer_name else attribute
+            x, grad = collected.get(first_element(value), (None, None))
+            if x is not None and x.size == value.size:
+                grads[name] = grad.reshape((len(grad),) + value.shape)
+            elif needs_grad(value):
+                raise Exception(f"The per-example gradients of {name} ({type(layer).__name__}) cannot be computed")
+    return grads
+
+
+def jacobian(fn, x):
+    """
+    Returns the Jacobian of a batched function fn at x (an array of shape (batch_size, *input_shape)),
+    as an array of shape (batch_size, *output_shape, *input_shape), where fn(x) has shape (batch_size, *output_shape)
+    and the output of each example only depends on its input.
+
+    The m = prod(output_shape) rows of the Jacobians are computed with a single forward and backward:
+    the batch is repeated m times, and the k-th copy receives the gradient of the k-th output of each example
+    """
+    x = np.asarray(get_value(x), dtype=np.float64)
+    batch_size, input_shape = x.shape[0], x.shape[1:]
+    with flamb.no_grad():
+        output_shape = get_value(fn(flamb.to_tensor(x[:1]))).shape[1:]
+    nb_outputs = int(np.prod(output_shape))
+
+    inputs = flamb.to_tensor(np.broadcast_to(x, (nb_outputs,) + x.shape).reshape((-1,) + input_shape), requires_grad=True)
+    outputs = fn(inputs)
+    grad = np.zeros((nb_outputs, batch_size, nb_outputs))
+    grad[np.arange(nb_outputs), :, np.arange(nb_outputs)] = 1
+    backward_tensor(outputs, grad.reshape(outputs.shape))
+
+    grads = np.array([var.grad for var in inputs.flat], dtype=np.float64).reshape((nb_outputs, batch_size, -1))
+    return grads.swapaxes(0, 1).reshape((batch_size,) + output_shape + input_shape)
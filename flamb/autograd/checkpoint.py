@@ -0,0 +1,74 @@
+"""
+This file defines the operator used by flamb.utils.checkpoint, which recomputes the activations of a function
+during the backward instead of keeping them
+"""
+
+import random
+import numpy as np
+import flamb
+from flamb.random import record_states
+from .operators import TensorOperator, get_value, needs_grad, send_grad, run_pending_operators, nested_backward_pass
+
+
+class CheckpointOperator(TensorOperator):
+    """
+    Output of fn(*inputs) (a tensor), computed without building its graph. The backward runs fn again,
+    with the graph, on copies of the inputs, and backpropagates through it in a nested backward pass:
+    the gradients reach the parameters used by fn, and those of the copies are returned for the inputs.
+    The random states of random and np.random, and those of the flamb generators which drew numbers during
+    the forward (recorded when they draw, see flamb.random.record_states), are restored before fn is run again
+    """
+
+    has_hidden_parameters = True
+
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+
+    def __call__(self, *inputs):
+        self.inputs = inputs
+        try:
+            return super().__call__(*inputs)
+        finally:
+            self.inputs = None
+
+    def forward(self, *values):
+        self.values = values
+        self.random_states = random.getstate(), np.random.get_state()
+        with flamb.no_grad(), record_states() as generator_states:
+            output = self.fn(*self.inputs)
+        self.generator_states = generator_states
+        return np.array(get_value(output), dtype=np.float64)
+
+    def backward(self, grad):
+        current_states = self.get_random_states()
+        self.set_random_states(self.random_states + (self.generator_states,))
+        copies = [
+            flamb.to_tensor(value, requires_grad=True) if needs_grad(x) else x
+            for x, value in zip(self.variables, self.values)
+        ]
+        try:
+            with nested_backward_pass():
+                send_grad(self.fn(*copies), grad)
+                run_pending_operators()
+        finally:
+            self.set_random_states(current_states)
+
+        return [
+            np.array([var.grad for var in copy.flat], dtype=np.float64).reshape(copy.shape) if copy is not x else None
+            for x, copy in zip(self.variables, copies)
+        ]
+
+    def get_random_states(self):
+        generator_states = {generator: generator.get_state() for generator in self.generator_states}
+        return random.getstate(), np.random.get_state(), generator_states
+
+    def set_random_states(self, states):
+        random.setstate(states[0])
+        np.random.set_state(states[1])
+        for generator, state in states[2].items():
+            generator.set_state(state)
+
+    def release(self):
+        self.values = None
+        self.generator_states = None
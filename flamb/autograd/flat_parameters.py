@@ -0,0 +1,167 @@
+"""
+This file defines a FlatParameters class, which stores the values and the gradients of many parameters
+in two contiguous numpy arrays, so that optimizers can update all of them with a few vectorized operations
+"""
+
+import numpy as np
+from . import operators
+from .variable import Variable
+from .parameter import Parameter
+
+
+# A FlatVariable does not use the slots value and grad of Variable: they hold its storage and its index
+_storage_slot = Variable.value
+_index_slot = Variable.grad
+
+
+class FlatVariable(Variable):
+    """
+    Variable whose value and gradient are stored in the arrays of a FlatParameters, at position index
+    (as well as requires_grad, so that the gradients of a whole tensor can be added at once).
+    Variables become FlatVariables inplace when they are given to a FlatParameters: they keep their identity
+    (which requires the same slots as Variable)
+    """
+
+    __slots__ = ()
+
+    storage = property(_storage_slot.__get__, _storage_slot.__set__)
+    index = property(_index_slot.__get__, _index_slot.__set__)
+
+    @property
+    def value(self):
+        return self.storage.values.item(self.index)
+
+    @value.setter
+    def value(self, value):
+        self.storage.values[self.index] = value
+
+    @property
+    def requires_grad(self):
+        return self.storage.requires_grad.item(self.index)
+
+    @requires_grad.setter
+    def requires_grad(self, requires_grad):
+        self.storage.requires_grad[self.index] = requires_grad
+
+    @property
+    def grad(self):
+        return self.storage.grads.item(self.index)
+
+    @grad.setter
+    def grad(self, grad):
+        self.storage.grads[self.index] = grad
+
+    def __getstate__(self):
+        return None, {
+            "storage": self.storage, "index": self.index,
+            "op": self.op, "left": self.left, "right": self.right,
+        }
+
+    def __setstate__(self, state):
+        for name, value in state[1].items():
+            setattr(self, name, value)
+
+
+class FlatParameters:
+    """
+    Stores the parameters contained in params (a tensor of Variables and Parameters) in two flat arrays,
+    values and grads: the Variables are converted to FlatVariables, and the data (and the dense gradient)
+    of the Parameters become views of the arrays. The Variables come first, then the Parameters.
+    A parameter can only be stored by one FlatParameters (given to one optimizer).
+
+    Sparse Parameters (see Parameter) are not stored in the arrays: their gradients only contain a few rows,
+    which are applied separately by the optimizers.
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.variables = []
+        self.parameters = []
+        self.sparse_parameters = []
+        seen = set()
+        for param in params:
+            if id(param) in seen:
+                continue
+            seen.add(id(param))
+            if getattr(param, "storage", None) is not None:
+                raise Exception("A parameter is already stored by another optimizer, it cannot be given to a second one")
+            if isinstance(param, Variable):
+                self.variables.append(param)
+            elif isinstance(param, Parameter):
+                if param.sparse:
+                    self.sparse_parameters.append(param)
+                else:
+                    self.parameters.append(param)
+
+        size = len(self.variables) + sum(param.size for param in self.parameters)
+        self.values = np.zeros(size)
+        self.grads = np.zeros(size)
+        # requires_grad of the Variables, True when they are stored (the Parameters keep their own)
+        self.requires_grad = np.ones(len(self.variables), dtype=bool)
+
+        for index, var in enumerate(self.variables):
+            value, grad = var.value, var.grad
+            var.__class__ = FlatVariable
+            var.storage = self
+            var.index = index
+            var.value, var.grad = value, grad
+
+        operators.new_storage_generation()
+
+        offset = len(self.variables)
+        self.slices = []
+        for param in self.parameters:
+            values = self.values[offset : offset + param.size].reshape(param.shape)
+            grads = self.grads[offset : offset + param.size].reshape(param.shape)
+            values[...] = param.data
+            grads[...] = param.dense_grad()
+            param.data = values
+            param.grad_buffer = grads
+            param.storage = self
+            param.grad = grads if param.grad is not None else None
+            param.requires_grad = True
+            self.slices.append(slice(offset, offset + param.size))
+            offset += param.size
+
+        for param in self.sparse_parameters:
+            param.requires_grad = True
+            param.storage = self
+
+    @staticmethod
+    def of(params):
+        """Returns the FlatParameters built on the tensor params, or None if params is not stored in flat arrays"""
+        if isinstance(params, FlatParameters):
+            return params
+        if len(params) == 0:
+            return None
+        storage = getattr(params[0], "storage", None)
+        if isinstance(storage, FlatParameters) and storage.params is params:
+            return storage
+        return None
+
+    def move_to(self, values=None, grads=None):
+        """
+        Replaces the flat arrays with values and/or grads (flat arrays of the same size, for instance
+        in shared memory), after copying their content: the parameters then read and write the new arrays
+        """
+        if values is not None:
+            values[...] = self.values
+            self.values = values
+        if grads is not None:
+            grads[...] = self.grads
+            self.grads = grads
+        for param, param_slice in zip(self.parameters, self.slices):
+            param.data = self.values[param_slice].reshape(param.shape)
+            param.grad_buffer = self.grads[param_slice].reshape(param.shape)
+            param.grad = param.grad_buffer if param.grad is not None else None
+
+    def __len__(self):
+        return len(self.values)
+
+    def zero_grad(self):
+        """Sets all the gradients to 0"""
+        self.grads.fill(0)
+        for param in self.parameters:
+            param.grad = None
+        for param in self.sparse_parameters:
+            param.grad = None
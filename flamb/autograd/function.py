@@ -0,0 +1,81 @@
+"""
+This file defines the Function class, which allows to add differentiable operations computed with numpy
+on whole tensors, without modifying flamb
+"""
+
+import numpy as np
+from .operators import TensorOperator, needs_grad
+
+
+class FunctionContext:
+    """
+    Object given to the forward and the backward of a Function. The forward can store any attribute on it,
+    and the arrays needed by the backward with save_for_backward. needs_input_grad tells, for each input,
+    if a gradient has to be computed
+    """
+
+    def __init__(self, needs_input_grad):
+        self.needs_input_grad = needs_input_grad
+        self.saved_tensors = ()
+
+    def save_for_backward(self, *arrays):
+        self.saved_tensors = arrays
+
+
+class FunctionOperator(TensorOperator):
+    """Node of the graph calling the static methods of a Function"""
+
+    def __init__(self, function, ctx):
+        super().__init__()
+        self.function = function
+        self.ctx = ctx
+
+    def forward(self, *values):
+        result = self.function.forward(self.ctx, *values)
+        if isinstance(result, tuple):
+            return tuple(np.asarray(value, dtype=np.float64) for value in result)
+        return np.asarray(result, dtype=np.float64)
+
+    def backward(self, *grad_outputs):
+        return self.function.backward(self.ctx, *grad_outputs)
+
+    def release(self):
+        self.ctx.saved_tensors = ()
+
+
+class Function:
+    """
+    Differentiable operation on whole tensors, added as a single node of the graph. Subclasses implement
+    the static methods forward(ctx, *inputs) and backward(ctx, *grad_outputs) with numpy:
+    - forward receives the values of the inputs as numpy arrays and returns an array, or a tuple of arrays
+    - backward receives the gradients of the outputs and returns the gradient of each input
+      (or None for the inputs which do not need one, see ctx.needs_input_grad)
+
+    The operation is applied with Function.apply(*inputs), which returns tensors:
+
+        class Square(Function):
+            @staticmethod
+            def forward(ctx, x):
+                ctx.save_for_backward(x)
+                return x ** 2
+
+            @staticmethod
+            def backward(ctx, grad):
+                x, = ctx.saved_tensors
+                return 2 * x * grad
+
+        y = Square.apply(x)
+    """
+
+    @staticmethod
+    def forward(ctx, *inputs):
+        raise Exception("You need to implement the forward method")
+
+    @staticmethod
+    def backward(ctx, *grad_outputs):
+        raise Exception("You need to implement the backward method")
+
+    @classmethod
+    def apply(cls, *inputs):
+        ctx = FunctionContext(tuple(needs_grad(x) for x in inputs))
+        return FunctionOperator(cls, ctx)(*inputs)
@@ -2,7 +2,34 @@
 This file contains a class allowing to use a context where gradient is not computed
 """
 
-import flamb
+from . import variable
+
+
+class Environ(dict):
+    """
+    Type of flamb.environ. Writing its key "is_grad_enabled" also updates the mode cached by the Variables,
+    so that the mode is the same for the Variables and the TensorOperators however it is set
+    """
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key == "is_grad_enabled":
+            variable._grad_enabled = bool(value)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+def is_grad_enabled():
+    return variable._grad_enabled
+
+
+def set_grad_enabled(mode):
+    """Enables or disables the gradient computation (flamb.environ["is_grad_enabled"])"""
+    import flamb
+
+    flamb.environ["is_grad_enabled"] = mode
 
 
 class no_grad:
@@ -10,11 +37,9 @@ class no_grad:
     Context that disables gradient computation
     """
 
-    def __init__(self):
-        pass
-
     def __enter__(self):
-        flamb.environ["is_grad_enabled"] = False
+        self.previous_mode = is_grad_enabled()
+        set_grad_enabled(False)
 
     def __exit__(self, type, value, traceback):
-        flamb.environ["is_grad_enabled"] = True
+        set_grad_enabled(self.previous_mode)
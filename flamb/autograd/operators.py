@@ -1,5 +1,9 @@
+import flamb
 from flamb.utils import *
+import heapq
+import itertools
 import math
+import numpy as np
 
 
 class BaseOperator:
@@ -28,6 +32,13 @@ class SumOperator(BaseOperator):
         return [1 for _ in range(len(self.variables))]
 
 
+class SubtractionOperator(BaseOperator):
+    """Difference of two variables"""
+
+    def gradient(self):
+        return [1, -1]
+
+
 class ProductOperator(BaseOperator):
     """Product of variables"""
 
@@ -139,4 +150,361 @@ class ReLUOperator(BaseOperator):
         if variable > 0:
             return [1]
         else:
-            return [0]
\ No newline at end of file
+            return [0]
+
+# List of the (operator, inputs) of the TensorOperators called while tracing (see trace)
+_traced_operations = None
+
+
+class trace:
+    """Context recording the TensorOperators which are called, in order, in self.operations"""
+
+    def __enter__(self):
+        global _traced_operations
+        assert _traced_operations is None, "Cannot trace inside another trace"
+        self.operations = _traced_operations = []
+        return self
+
+    def __exit__(self, type, value, traceback):
+        global _traced_operations
+        _traced_operations = None
+
+
+# Per-example gradients recorded during the backward passes (see collect_per_sample_grads)
+_per_sample_grads = None
+
+
+class collect_per_sample_grads:
+    """
+    Context in which the TensorOperators able to compute the gradients of each example of the batch with respect
+    to some of their inputs (see TensorOperator.per_sample_backward) record them in self.grads, a dict
+    id(input): [input, per-example gradients]. These inputs do not receive the gradient of the batch
+    """
+
+    def __enter__(self):
+        global _per_sample_grads
+        assert _per_sample_grads is None, "Cannot collect per-example gradients inside another collection"
+        self.grads = _per_sample_grads = {}
+        return self
+
+    def __exit__(self, type, value, traceback):
+        global _per_sample_grads
+        _per_sample_grads = None
+
+
+# Heap of the TensorOperators waiting for the gradients of their inputs during the current backward pass
+_pending_operators = None
+_operator_ids = itertools.count()
+
+
+def start_backward_pass():
+    """
+    Starts a backward pass if no backward pass is running.
+    Returns True if a new pass has been started (ie the caller is the root of the backward pass)
+    """
+    global _pending_operators
+    if _pending_operators is not None:
+        return False
+    _pending_operators = []
+    return True
+
+
+def run_pending_operators():
+    """
+    Runs the backward of the TensorOperators reached during the backward pass, from the most recent to the oldest one.
+    An operator can only receive gradients from operations created after it, so when an operator is popped,
+    all the gradients of its outputs are known
+    """
+    while _pending_operators:
+        _, operator = heapq.heappop(_pending_operators)
+        operator.run_backward()
+
+
+def end_backward_pass():
+    global _pending_operators
+    _pending_operators = None
+
+
+class nested_backward_pass:
+    """
+    Context in which a separate backward pass can run inside the current one (to backpropagate through
+    a graph built during the backward, see CheckpointOperator): the operators waiting in the current pass
+    are set aside, and restored at the end
+    """
+
+    def __enter__(self):
+        global _pending_operators
+        self.pending_operators = _pending_operators
+        _pending_operators = []
+
+    def __exit__(self, type, value, traceback):
+        global _pending_operators
+        _pending_operators = self.pending_operators
+
+
+# Incremented each time variables are moved to a FlatParameters, which invalidates the results cached by flat_slice
+_storage_generation = itertools.count()
+storage_generation = next(_storage_generation)
+
+
+def new_storage_generation():
+    global storage_generation
+    storage_generation = next(_storage_generation)
+
+
+def flat_slice(x):
+    """
+    If the variables of the tensor x are stored contiguously and in order in a FlatParameters (which is the case
+    of the parameters of a layer given to an optimizer), returns (storage, slice), otherwise returns None.
+    The result is cached on x until parameters are stored again, so the elements of x should not be replaced
+    """
+    if not isinstance(x, flamb.Tensor) or x.size == 0:
+        return None
+    cached = x.__dict__.get("_flat_slice")
+    if cached is not None and cached[0] == storage_generation:
+        return cached[1]
+
+    result = None
+    storage = getattr(x.flat[0], "storage", None)
+    if storage is not None and hasattr(x.flat[0], "index"):
+        start = x.flat[0].index
+        if all(getattr(var, "storage", None) is storage and var.index == start + i for i, var in enumerate(x.flat)):
+            result = (storage, slice(start, start + x.size))
+    x._flat_slice = (storage_generation, result)
+    return result
+
+
+def get_value(x):
+    """Returns the numerical value of x (a tensor, a variable, a numpy array...) as a numpy array"""
+    if isinstance(x, np.ndarray) and x.dtype == object:
+        operator = getattr(x, "last_operation", None)
+        if isinstance(operator, TensorOperator):
+            return operator.output_value(x)
+        stored = flat_slice(x)
+        if stored is not None:
+            # Read-only view of the values stored by the optimizer
+            storage, values_slice = stored
+            values = storage.values[values_slice].reshape(x.shape)
+            values.flags.writeable = False
+            return values
+        values = [var.value if isinstance(var, flamb.Variable) else var for var in x.flat]
+        return np.array(values, dtype=np.float64).reshape(x.shape)
+    elif isinstance(x, flamb.Variable):
+        return np.asarray(x.value, dtype=np.float64)
+    elif isinstance(x, flamb.Parameter):
+        return x.data
+    return np.asarray(x)
+
+
+def needs_grad(x):
+    """Returns True if a gradient has to be computed with respect to x"""
+    if isinstance(x, np.ndarray) and x.dtype == object:
+        operator = getattr(x, "last_operation", None)
+        if isinstance(operator, TensorOperator):
+            return operator.requires_grad
+        return any(isinstance(var, flamb.Variable) and var.requires_grad for var in x.flat)
+    elif isinstance(x, (flamb.Variable, flamb.Parameter)):
+        return x.requires_grad
+    return False
+
+
+def send_grad(x, grad):
+    """
+    Propagates the gradient grad (a numpy array with the shape of x) to the variables contained in x.
+    The gradient of a Parameter can also be a SparseGrad
+    """
+    if isinstance(x, np.ndarray) and x.dtype == object:
+        operator = getattr(x, "last_operation", None)
+        if isinstance(operator, TensorOperator) and operator.requires_grad:
+            # x is the output of another TensorOperator: the gradient is given to it as a whole
+            operator.add_grad(operator.output_index(x), grad)
+        elif flat_slice(x) is not None:
+            # The variables are stored by an optimizer (they are leaves): their gradients are added at once,
+            # except to the variables which do not require grad
+            storage, grads_slice = flat_slice(x)
+            requires_grad = storage.requires_grad[grads_slice]
+            if requires_grad.all():
+                storage.grads[grads_slice] += grad.ravel()
+            elif requires_grad.any():
+                storage.grads[grads_slice] += np.where(requires_grad, grad.ravel(), 0.)
+        else:
+            for var, value in zip(x.flat, grad.ravel().tolist()):
+                if isinstance(var, flamb.Variable) and var.requires_grad:
+                    var.backward(value)
+    elif isinstance(x, flamb.Variable):
+        if x.requires_grad:
+            x.backward(float(np.sum(grad)))
+    elif isinstance(x, flamb.Parameter):
+        if x.requires_grad:
+            x.add_grad(grad)
+
+
+class TensorOperator(BaseOperator):
+    """
+    Operator applied on whole tensors at once (a convolution, a pooling...).
+
+    Values are computed with numpy in `forward`, and the output is a tensor of variables which all share
+    the same TensorOperator as last_operation. During a backward pass, the gradients of the outputs are gathered,
+    and `backward` computes the gradients with respect to all the inputs with numpy in a single call.
+    Subclasses implement `forward(*values)` and `backward(*grad_outputs)`, and can return several outputs as a tuple.
+
+    The tensors returned by a TensorOperator remember it (tensor.last_operation), so that another TensorOperator
+    can read their values and send their gradients without going through each variable.
+    They should therefore not be modified inplace.
+    """
+
+    # True if the gradients of the operator reach parameters which are not among its inputs (see CheckpointOperator)
+    has_hidden_parameters = False
+
+    def __init__(self):
+        self.variables = []
+        self.id = next(_operator_ids)
+        self.requires_grad = False
+        self.outputs = []
+        self.output_values = []
+        self.grad_outputs = None
+        self.scheduled = False
+        self.released = False
+        self._positions = None
+
+    def forward(self, *values):
+        raise Exception("This function needs to be implemented")
+
+    def backward(self, *grad_outputs):
+        """Returns the gradients with respect to the inputs (None if an input does not need a gradient)"""
+        raise Exception("This function needs to be implemented")
+
+    def per_sample_backward(self, *grad_outputs):
+        """
+        Returns, for each input, the gradients of each example of the batch (the first axis of the inputs and
+        outputs) as an array of shape (batch_size, *input.shape), or None if they are not computed.
+        Returns None if the operator does not compute per-example gradients (see collect_per_sample_grads)
+        """
+        return None
+
+    def release(self):
+        """Called when the values saved for backward are not needed anymore"""
+        pass
+
+    def gradient(self):
+        raise Exception("The gradient of a TensorOperator is computed with the backward method")
+
+    def __call__(self, *inputs):
+        result = self.forward(*[get_value(x) for x in inputs])
+        single_output = not isinstance(result, tuple)
+        results = (result,) if single_output else result
+
+        self.requires_grad = flamb.is_grad_enabled() and (
+            self.has_hidden_parameters or any(needs_grad(x) for x in inputs)
+        )
+        if self.requires_grad:
+            self.variables = list(inputs)
+        else:
+            self.release()
+            self.released = True
+
+        self.output_values = list(results)
+        outputs = [self._to_tensor(value, index) for index, value in enumerate(results)]
+        # Without gradient, the operator does not reference its outputs, so that they are freed as soon as
+        # they are not used (a reference cycle would keep them until the garbage collector runs)
+        if self.requires_grad or _traced_operations is not None:
+            self.outputs = outputs
+        if _traced_operations is not None:
+            _traced_operations.append((self, inputs))
+        return outputs[0] if single_output else tuple(outputs)
+
+    def export(self):
+        """
+        Returns the name of the flamb.runtime kernel computing the forward of the operator, and the list of
+        the constant arrays it takes after the inputs (see flamb.export)
+        """
+        raise Exception(f"{type(self).__name__} cannot be exported")
+
+    def _to_tensor(self, value, index):
+        last_operation = self if self.requires_grad else None
+        variables = np.empty(value.size, dtype=object)
+        variables[:] = [
+            flamb.Variable(v, requires_grad=self.requires_grad, last_operation=last_operation)
+            for v in value.ravel().tolist()
+        ]
+        tensor = variables.reshape(value.shape).view(flamb.Tensor)
+        tensor.last_operation = self
+        tensor.output_index = index
+        return tensor
+
+    def output_index(self, tensor):
+        """Returns the position of tensor in the outputs"""
+        # The attributes are set on the output tensors only (not on their views)
+        if tensor.__dict__.get("last_operation") is self:
+            return tensor.output_index
+        raise Exception("The tensor is not an output of this operator")
+
+    def output_value(self, tensor):
+        """Returns the numerical value of one of the outputs"""
+        return self.output_values[self.output_index(tensor)]
+
+    def add_grad(self, index, grad):
+        """Adds the gradient of the index-th output, given as a numpy array"""
+        if self.grad_outputs is None:
+            self.grad_outputs = [np.zeros(value.shape) for value in self.output_values]
+        self.grad_outputs[index] += grad
+        self._schedule()
+
+    def add_variable_grad(self, variable, grad):
+        """Adds the gradient of one of the variables contained in the outputs"""
+        if self.released:
+            self._raise_released()
+        if self._positions is None:
+            self._positions = {
+                id(var): (index, position)
+                for index, output in enumerate(self.outputs)
+                for position, var in enumerate(output.flat)
+            }
+        if self.grad_outputs is None:
+            self.grad_outputs = [np.zeros(value.shape) for value in self.output_values]
+        index, position = self._positions[id(variable)]
+        self.grad_outputs[index].flat[position] += grad
+        self._schedule()
+
+    def _schedule(self):
+        if _pending_operators is None:
+            raise Exception("The gradient of a TensorOperator can only be computed during a backward pass")
+        if not self.scheduled:
+            self.scheduled = True
+            heapq.heappush(_pending_operators, (-self.id, self))
+
+    def _raise_released(self):
+        raise Exception(
+            "Cannot compute gradient twice through the same operation: the values saved for backward have been freed"
+        )
+
+    def run_backward(self):
+        """Computes the gradients with respect to the inputs and propagates them"""
+        if self.released:
+            self._raise_released()
+        grad_outputs = self.grad_outputs
+        self.grad_outputs = None
+        self.scheduled = False
+
+        grads = self.backward(*grad_outputs)
+        if not isinstance(grads, (tuple, list)):
+            grads = (grads,)
+        per_sample_grads = [None] * len(grads)
+        if _per_sample_grads is not None:
+            per_sample_grads = self.per_sample_backward(*grad_outputs) or per_sample_grads
+        self.release()
+        self.released = True
+
+        for x, grad, per_sample_grad in zip(self.variables, grads, per_sample_grads):
+            if per_sample_grad is not None:
+                if id(x) in _per_sample_grads:
+                    _per_sample_grads[id(x)][1] += per_sample_grad
+                else:
+                    _per_sample_grads[id(x)] = [x, per_sample_grad]
+            elif grad is not None:
+                send_grad(x, grad)
+        # Breaks the reference cycles between the operator and its outputs, so that the graph is freed
+        # as soon as it is not used anymore
+        self.variables = []
+        self.outputs = []
+        self._positions = None
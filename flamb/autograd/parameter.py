@@ -0,0 +1,112 @@
+"""
+This file defines a Parameter class, a trainable array stored with numpy instead of a tensor of variables
+"""
+
+import numpy as np
+
+
+class SparseGrad:
+    """
+    Gradient of a Parameter which is non-zero only on some rows:
+    the row indices[k] of the gradient is equal to values[k]. An index can appear several times, the rows are then summed
+    """
+
+    # numpy arrays leave the operations with a SparseGrad to its reflected operators (dense + sparse calls __radd__)
+    __array_ufunc__ = None
+
+    def __init__(self, indices, values):
+        self.indices = np.asarray(indices, dtype=np.int64).ravel()
+        self.values = np.asarray(values, dtype=np.float64).reshape((len(self.indices),) + np.shape(values)[-1:])
+
+    def __repr__(self):
+        return f"SparseGrad(indices={self.indices}, values={self.values})"
+
+    def coalesce(self):
+        """Returns a SparseGrad in which each index appears once, sorted in increasing order"""
+        order = np.argsort(self.indices, kind="stable")
+        indices = self.indices[order]
+        starts = np.flatnonzero(np.concatenate(([True], indices[1:] != indices[:-1])))
+        values = np.add.reduceat(self.values[order], starts, axis=0) if len(indices) else self.values
+        return SparseGrad(indices[starts], values)
+
+    def to_dense(self, shape):
+        dense = np.zeros(shape)
+        np.add.at(dense, self.indices, self.values)
+        return dense
+
+    def __add__(self, grad):
+        if isinstance(grad, SparseGrad):
+            return SparseGrad(
+                np.concatenate((self.indices, grad.indices)), np.concatenate((self.values, grad.values))
+            )
+        dense = np.array(grad, dtype=np.float64)
+        np.add.at(dense, self.indices, self.values)
+        return dense
+
+    __radd__ = __add__
+
+
+class Parameter:
+    """
+    A Parameter is defined by
+    - data (numpy array) : its value
+    - requires_grad (bool) : True or False
+    - grad : None, a numpy array with the shape of data, or a SparseGrad if only some rows received a gradient
+    - sparse (bool) : True if the gradient is usually a SparseGrad (an embedding table for instance).
+                      Optimizers then only update the rows having a gradient
+
+    It is used for large parameters, for which a tensor of variables would be too expensive.
+    TensorOperators read its data and give it their gradient directly.
+    """
+
+    def __init__(self, data, requires_grad=True, sparse=False):
+        self.data = np.array(data, dtype=np.float64)
+        self.requires_grad = requires_grad
+        self.sparse = sparse
+        self.grad = None
+        # FlatParameters storing the parameter, and array in which its dense gradient is accumulated
+        self.storage = None
+        self.grad_buffer = None
+
+    def __repr__(self):
+        return f"Parameter({self.data})"
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def size(self):
+        return self.data.size
+
+    def add_grad(self, grad):
+        """Accumulates a gradient (a numpy array or a SparseGrad)"""
+        if self.grad_buffer is not None:
+            # The buffer contains zeros when grad is None
+            if isinstance(grad, SparseGrad):
+                np.add.at(self.grad_buffer, grad.indices, grad.values)
+            else:
+                self.grad_buffer += grad
+            self.grad = self.grad_buffer
+        elif self.grad is None:
+            self.grad = grad if isinstance(grad, SparseGrad) else np.array(grad, dtype=np.float64)
+        elif isinstance(self.grad, SparseGrad):
+            self.grad = self.grad + grad
+        elif isinstance(grad, SparseGrad):
+            np.add.at(self.grad, grad.indices, grad.values)
+        else:
+            self.grad += grad
+
+    def dense_grad(self):
+        """Returns the gradient as a numpy array"""
+        if self.grad is None:
+            return np.zeros(self.data.shape)
+        if isinstance(self.grad, SparseGrad):
+            return self.grad.to_dense(self.data.shape)
+        return self.grad
+
+    def reset_state(self, requires_grad=False):
+        if self.grad_buffer is not None:
+            self.grad_buffer.fill(0)
+        self.grad = None
+        self.requires_grad = requires_grad
@@ -7,193 +7,198 @@ from .operators import *
 from flamb.utils import *
 import math
 
+# Codes of the scalar operations. The result of an operation stores its code in op, and its operands in left and right
+ADD, SUB, MUL, DIV, POW, EXP, COS, SIN, TAN, TANH, RELU = range(11)
+
+# Operators equivalent to the codes, built when last_operation is read
+OPERATOR_CLASSES = (
+    SumOperator, SubtractionOperator, ProductOperator, DivisionOperator, PowerOperator,
+    ExpOperator, CosOperator, SinOperator, TanOperator, TanhOperator, ReLUOperator,
+)
+
+# Copy of flamb.environ["is_grad_enabled"], updated when it is written (see grad_mode.Environ)
+_grad_enabled = True
+
+# Variables which can be reused by the operations (see arena), and list of the results of the operations
+# made in the current arena
+_free_variables = []
+_arena = None
+MAX_FREE_VARIABLES = 1 << 20
+
+
+def _value(x):
+    return x.value if isinstance(x, Variable) else x
+
 
 class Variable:
     """
     A Variable is defined by
     - value (int or float)
-    - dtype : the type we want for the value
+    - dtype : if given, the value is converted to it. The dtype of a Variable is the type of its value
+      (it is not stored separately, so a dtype different from the type of the value cannot be kept)
     - requires_grad (bool) : True or False
-    - last_operation (flamb.autograd.operators.BaseOperator) : None or an instance of BaseOperator
+    - last_operation : None, or the operation which computed the variable
+
+    The results of the scalar operations (+, *, exp...) store the code of the operation in op and its operands
+    in left and right (right is None for the functions of one variable), instead of an operator object.
+    The outputs of a TensorOperator have it as op.
+    Variables have no __dict__ (see __slots__), so that a node of the graph is a single small object
     """
 
-    def __init__(self, value, dtype=None, requires_grad=True, last_operation=None):
-        self.value = value
-        if dtype:
-            self.dtype = dtype
-        else:
-            self.dtype = type(self.value)
-        self.requires_grad = requires_grad
-        if not flamb.environ["is_grad_enabled"]:
-            self.requires_grad = False
+    __slots__ = ("value", "grad", "requires_grad", "op", "left", "right")
 
+    def __init__(self, value, dtype=None, requires_grad=True, last_operation=None):
+        self.value = dtype(value) if dtype else value
         self.grad = 0
-        self.last_operation = last_operation
+        self.requires_grad = requires_grad and _grad_enabled
+        self.op = last_operation
+        self.left = self.right = None
 
     def __repr__(self):
         return f"{self.value}"
 
+    @property
+    def dtype(self):
+        return type(self.value)
+
+    @property
+    def parents(self):
+        """Operands of the scalar operation which computed the variable"""
+        return (self.left,) if self.right is None else (self.left, self.right)
+
+    @property
+    def last_operation(self):
+        op = self.op
+        if op.__class__ is int:
+            return OPERATOR_CLASSES[op](*self.parents)
+        return op
+
+    @last_operation.setter
+    def last_operation(self, operation):
+        self.op = operation
+        self.left = self.right = None
+
+    def _set_inplace(self, value):
+        """Replaces the value, and forgets the operations which computed the variable"""
+        self.value = value
+        self.grad = 0
+        self.requires_grad = False
+        self.op = self.left = self.right = None
+        return self
+
     def __add__(self, var, inplace=False):
         """
         The inplace parameter is equal to False if we want a new variable to be created,
         or inplace=True if we want the value to be modified in the current instance.
         If inplace=True, then the gradient is set back to 0 and the last operations made on the instance are forgotten
         """
-        new_value = self.value
-        requires_grad = self.requires_grad
         if isinstance(var, Variable):
-            new_value += var.value
-            requires_grad = requires_grad or var.requires_grad
+            new_value = self.value + var.value
+            requires_grad = self.requires_grad or var.requires_grad
         elif isinstance(var, (int, float)):
-            new_value += var
+            new_value = self.value + var
+            requires_grad = self.requires_grad
         else:
             raise Exception(f"Cannot sum a {self.__class__} and a {type(var)}")
 
-        last_operation = SumOperator(self, var)
-
         if inplace:
-            self.value = new_value
-            self.grad = 0
-            self.requires_grad = False
-            self.last_operation = None
-            return self
-
-        else:
-            return Variable(
-                new_value, requires_grad=requires_grad, last_operation=last_operation,
-            )
+            return self._set_inplace(new_value)
+        return _result(new_value, requires_grad, ADD, self, var)
 
     def __radd__(self, var):
         return self + var
 
     def __iadd__(self, var):
-        if flamb.environ['is_grad_enabled']:
-            return self.__add__(var, inplace=False)
-        else:
-            return self.__add__(var, inplace=True)
+        return self.__add__(var, inplace=not _grad_enabled)
 
     def __sub__(self, var, inplace=False):
-        negative_var = var * (-1)
-        return self.__add__(negative_var, inplace=inplace)
+        if isinstance(var, Variable):
+            new_value = self.value - var.value
+            requires_grad = self.requires_grad or var.requires_grad
+        elif isinstance(var, (int, float)):
+            new_value = self.value - var
+            requires_grad = self.requires_grad
+        else:
+            raise Exception(f"Cannot subtract a {type(var)} from a {self.__class__}")
+
+        if inplace:
+            return self._set_inplace(new_value)
+        return _result(new_value, requires_grad, SUB, self, var)
 
     def __rsub__(self, var):
-        negative_value = self * (-1)
-        return negative_value + var
+        if not isinstance(var, (int, float)):
+            raise Exception(f"Cannot subtract a {self.__class__} from a {type(var)}")
+        return _result(var - self.value, self.requires_grad, SUB, var, self)
 
     def __isub__(self, var):
-        if flamb.environ['is_grad_enabled']:
-            return self.__sub__(var, inplace=False)
-        else:
-            return self.__sub__(var, inplace=True)
+        return self.__sub__(var, inplace=not _grad_enabled)
 
     def __mul__(self, var, inplace=False):
-        new_value = self.value
-        requires_grad = self.requires_grad
         if isinstance(var, Variable):
-            new_value *= var.value
-            requires_grad = requires_grad or var.requires_grad
+            new_value = self.value * var.value
+            requires_grad = self.requires_grad or var.requires_grad
         elif isinstance(var, (int, float)):
-            new_value *= var
+            new_value = self.value * var
+            requires_grad = self.requires_grad
         else:
             raise Exception(f"Cannot multiply a {self.__class__} and a {type(var)}")
 
-        last_operation = ProductOperator(self, var)
         if inplace:
-            self.value = new_value
-            self.grad = 0
-            self.requires_grad = False
-            self.last_operation = None
-            return self
-
-        else:
-            return Variable(
-                new_value, requires_grad=requires_grad, last_operation=last_operation,
-            )
+            return self._set_inplace(new_value)
+        return _result(new_value, requires_grad, MUL, self, var)
 
     def __rmul__(self, var):
         return self * var
 
     def __imul__(self, var):
-        if flamb.environ['is_grad_enabled']:
-            return self.__mul__(var, inplace=False)
-        else:
-            return self.__mul__(var, inplace=True)
+        return self.__mul__(var, inplace=not _grad_enabled)
 
     def __truediv__(self, var, inplace=False):
-        new_value = self.value
-        requires_grad = self.requires_grad
         if isinstance(var, Variable):
-            new_value /= var.value
-            requires_grad = requires_grad or var.requires_grad
+            new_value = self.value / var.value
+            requires_grad = self.requires_grad or var.requires_grad
         elif isinstance(var, (int, float)):
-            new_value /= var
+            new_value = self.value / var
+            requires_grad = self.requires_grad
         else:
             raise Exception(f"Cannot divide a {self.__class__} by a {type(var)}")
 
-        last_operation = DivisionOperator(self, var)
-
         if inplace:
-            self.value = new_value
-            self.grad = 0
-            self.requires_grad = False
-            self.last_operation = None
-            return self
-
-        else:
-            return Variable(
-                new_value, requires_grad=requires_grad, last_operation=last_operation,
-            )
+            return self._set_inplace(new_value)
+        return _result(new_value, requires_grad, DIV, self, var)
 
     def __rtruediv__(self, var, inplace=False):
-        new_value = 0
-        requires_grad = self.requires_grad
         if isinstance(var, Variable):
             new_value = var.value / self.value
-            requires_grad = requires_grad or var.requires_grad
+            requires_grad = self.requires_grad or var.requires_grad
         elif isinstance(var, (int, float)):
             new_value = var / self.value
+            requires_grad = self.requires_grad
         else:
             raise Exception(f"Cannot divide a {type(var)} by a {self.__class__}")
 
-        last_operation = DivisionOperator(var, self)
         if inplace:
-            self.value = new_value
-            self.grad = 0
-            self.requires_grad = False
-            self.last_operation = None
-            return self
-
-        else:
-            return Variable(
-                new_value, requires_grad=requires_grad, last_operation=last_operation,
-            )
+            return self._set_inplace(new_value)
+        return _result(new_value, requires_grad, DIV, var, self)
 
     def __itruediv__(self, var):
-        if flamb.environ['is_grad_enabled']:
-            return self.__truediv__(var, inplace=False)
-        else:
-            return self.__truediv__(var, inplace=True)
+        return self.__truediv__(var, inplace=not _grad_enabled)
 
     def __floordiv__(self, var):
         raise Exception(r"The operation // is not implemented yet")
 
     def __pow__(self, power):
-        new_value = self.value
-        requires_grad = self.requires_grad
         if isinstance(power, Variable):
-            new_value = new_value ** (power.value)
-            requires_grad = requires_grad or power.requires_grad
+            new_value = self.value ** power.value
+            requires_grad = self.requires_grad or power.requires_grad
         elif isinstance(power, (int, float)):
-            new_value = new_value ** power
+            new_value = self.value ** power
+            requires_grad = self.requires_grad
         else:
             raise Exception(
                 f"Cannot calculate a {self.__class__} to the power of a {type(power)}"
             )
-
-        last_operation = PowerOperator(self, power)
-        return Variable(
-            new_value, requires_grad=requires_grad, last_operation=last_operation,
-        )
+        return _result(new_value, requires_grad, POW, self, power)
 
     def __eq__(self, var):
         """="""
@@ -226,58 +231,22 @@ class Variable:
         return self.value <= var
 
     def exp(self):
-        new_value = math.exp(self.value)
-        requires_grad = self.requires_grad
-        last_operation = ExpOperator(self)
-
-        return Variable(
-            new_value, requires_grad=requires_grad, last_operation=last_operation,
-        )
+        return _result(math.exp(self.value), self.requires_grad, EXP, self, None)
 
     def cos(self):
-        new_value = math.cos(self.value)
-        requires_grad = self.requires_grad
-        last_operation = CosOperator(self)
-
-        return Variable(
-            new_value, requires_grad=requires_grad, last_operation=last_operation,
-        )
+        return _result(math.cos(self.value), self.requires_grad, COS, self, None)
 
     def sin(self):
-        new_value = math.sin(self.value)
-        requires_grad = self.requires_grad
-        last_operation = SinOperator(self)
-
-        return Variable(
-            new_value, requires_grad=requires_grad, last_operation=last_operation,
-        )
+        return _result(math.sin(self.value), self.requires_grad, SIN, self, None)
 
     def tan(self):
-        new_value = math.tan(self.value)
-        requires_grad = self.requires_grad
-        last_operation = TanOperator(self)
-
-        return Variable(
-            new_value, requires_grad=requires_grad, last_operation=last_operation,
-        )
+        return _result(math.tan(self.value), self.requires_grad, TAN, self, None)
 
     def tanh(self):
-        new_value = math.tanh(self.value)
-        requires_grad = self.requires_grad
-        last_operation = TanhOperator(self)
-
-        return Variable(
-            new_value, requires_grad=requires_grad, last_operation=last_operation,
-        )
+        return _result(math.tanh(self.value), self.requires_grad, TANH, self, None)
 
     def ReLU(self):
-        new_value = max(self.value, 0)
-        requires_grad = self.requires_grad
-        last_operation = ReLUOperator(self)
-
-        return Variable(
-            new_value, requires_grad=requires_grad, last_operation=last_operation,
-        )
+        return _result(max(self.value, 0), self.requires_grad, RELU, self, None)
 
     def backward(self, accumulated_grad=None):
         """
@@ -289,28 +258,121 @@ class Variable:
             accumulated_grad (float) : default=None. The gradient of the current variable that has been computed.
                                        It allows to use chain rule.
         """
-        if flamb.environ["is_grad_enabled"]:
-            if accumulated_grad == None:
-                accumulated_grad = 1
-
-            self.grad += accumulated_grad
-
-            last_operation = self.last_operation
-            if last_operation != None:
-                variables = last_operation.get_variables()
-                grads = last_operation.gradient()
-
-                for var, grad in zip(variables, grads):
-                    if isinstance(var, Variable) and var.requires_grad:
-                        var.backward(accumulated_grad * grad)
-
-        else:
+        if not _grad_enabled:
             raise Exception(
                 "Cannot compute gradient in because grad is disabled (you're probably in a flamb.no_grad context)"
             )
-    
+        if accumulated_grad is None:
+            accumulated_grad = 1
+
+        is_root = start_backward_pass()
+        try:
+            self._backward(accumulated_grad)
+            if is_root:
+                run_pending_operators()
+        finally:
+            if is_root:
+                end_backward_pass()
+
+    def _backward(self, accumulated_grad):
+        """Adds accumulated_grad to the gradient, and propagates it to the operands (inside a backward pass)"""
+        self.grad += accumulated_grad
+        op = self.op
+        if op is None:
+            return
+        if op.__class__ is int:
+            left, right = self.left, self.right
+            grad_left, grad_right = _gradient(op, left, right, self.value)
+            if isinstance(left, Variable) and left.requires_grad:
+                left._backward(accumulated_grad * grad_left)
+            if grad_right is not None and isinstance(right, Variable) and right.requires_grad:
+                right._backward(accumulated_grad * grad_right)
+        elif isinstance(op, TensorOperator):
+            # The gradients of tensor operations are computed once all their outputs have been reached
+            op.add_variable_grad(self, accumulated_grad)
+        else:
+            for var, grad in zip(op.get_variables(), op.gradient()):
+                if isinstance(var, Variable) and var.requires_grad:
+                    var._backward(accumulated_grad * grad)
 
     def reset_state(self, requires_grad=False):
         self.grad = 0
-        self.last_operation = None
+        self.op = self.left = self.right = None
         self.requires_grad = requires_grad
+
+
+def _gradient(op, left, right, value):
+    """
+    Returns the derivatives of the result value of the operation op with respect to its operands left and right
+    (None if there is no right operand, or if it is not differentiated)
+    """
+    if op == ADD:
+        return 1, 1
+    if op == MUL:
+        return _value(right), _value(left)
+    if op == SUB:
+        return 1, -1
+    if op == DIV:
+        numerator, denominator = _value(left), _value(right)
+        return 1 / denominator, -numerator / (denominator ** 2)
+    if op == POW:
+        x, power = _value(left), _value(right)
+        return power * (x ** (power - 1)), None
+    if op == TANH:
+        return 1 - value ** 2, None
+    if op == EXP:
+        return value, None
+    if op == RELU:
+        return (1 if left.value > 0 else 0), None
+    if op == COS:
+        return -math.sin(left.value), None
+    if op == SIN:
+        return math.cos(left.value), None
+    if op == TAN:
+        return 1 + value ** 2, None
+    raise Exception(f"Unknown operation {op}")
+
+
+_new_variable = object.__new__
+
+
+def _result(value, requires_grad, op, left, right):
+    """Returns a new Variable holding the result of a scalar operation (reusing a recycled one if there is one)"""
+    var = _free_variables.pop() if _free_variables else _new_variable(Variable)
+    var.value = value
+    var.grad = 0
+    var.requires_grad = requires_grad and _grad_enabled
+    var.op = op
+    var.left = left
+    var.right = right
+    if _arena is not None:
+        _arena.append(var)
+    return var
+
+
+class arena:
+    """
+    Context in which the results of the scalar operations are recorded, to be recycled at its exit:
+    the next operations reuse these objects instead of allocating new ones.
+    The results of the operations made inside the context must therefore not be used after it (their values
+    should be read inside). The Variables created directly (parameters, tensors...) are not recycled.
+
+        for x, y in batches:
+            with flamb.autograd.arena():
+                loss = loss_fn(model(x), y)
+                loss.backward()
+                losses.append(loss.value)
+            optimizer.step()
+    """
+
+    def __enter__(self):
+        global _arena
+        assert _arena is None, "Cannot open an arena inside another arena"
+        self.variables = _arena = []
+        return self
+
+    def __exit__(self, type, value, traceback):
+        global _arena
+        _arena = None
+        _free_variables.extend(self.variables[:MAX_FREE_VARIABLES - len(_free_variables)])
+        self.variables = None
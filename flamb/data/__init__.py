@@ -0,0 +1,5 @@
+from .dataset import Dataset, TensorDataset, Subset, IterableDataset, default_collate
+from .dataloader import DataLoader
+from .readers import NpyDataset, BinaryDataset, CSVDataset
+
+__all__ = ["Dataset", "TensorDataset", "Subset", "IterableDataset", "default_collate", "DataLoader", "NpyDataset", "BinaryDataset", "CSVDataset"]
@@ -0,0 +1,161 @@
+"""
+This file defines a DataLoader class, which iterates over the batches of a dataset
+"""
+
+import collections
+import concurrent.futures
+import math
+import queue
+import threading
+import numpy as np
+from flamb.random import default_generator
+from .dataset import IterableDataset, default_collate
+
+
+# Dataset and collate function of the current worker process (see DataLoader with worker_type="process")
+_worker_dataset = None
+_worker_collate_fn = None
+
+
+def _init_worker(dataset, collate_fn):
+    global _worker_dataset, _worker_collate_fn
+    _worker_dataset, _worker_collate_fn = dataset, collate_fn
+
+
+def load_batch(dataset, indices, collate_fn=None):
+    """Returns the batch of the samples of dataset at indices"""
+    if collate_fn is None:
+        return dataset.get_batch(indices)
+    return collate_fn([dataset[index] for index in indices])
+
+
+def _load_worker_batch(indices):
+    return load_batch(_worker_dataset, indices, _worker_collate_fn)
+
+
+class DataLoader:
+    """
+    Iterates over the batches of a dataset (a Dataset or an IterableDataset), as numeric numpy arrays.
+
+    Parameters:
+    - batch_size (int) : number of samples per batch
+    - shuffle (bool) : if True, the samples are visited in a new random order at each epoch (map-style datasets only)
+    - drop_last (bool) : if True, the last batch is dropped when it is smaller than batch_size
+    - collate_fn (callable) : if not None, builds a batch from a list of samples, instead of dataset.get_batch
+    - num_workers (int) : if > 0, the batches are prepared in the background by num_workers workers,
+      and up to prefetch * num_workers batches are ready in advance
+    - worker_type (str) : "thread" or "process". Processes avoid the GIL for python-heavy datasets,
+      but the dataset and collate_fn must be picklable
+    - seed (int) : seed of the shuffling. If None, the shuffling draws from a stream spawned from the default
+      generator (see flamb.manual_seed)
+    """
+
+    def __init__(self, dataset, batch_size=1, shuffle=False, drop_last=False, collate_fn=None,
+                 num_workers=0, prefetch=2, worker_type="thread", seed=None):
+        assert worker_type in ("thread", "process"), f"worker_type should be thread or process, not {worker_type}"
+        assert not (shuffle and isinstance(dataset, IterableDataset)), "An IterableDataset cannot be shuffled"
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.collate_fn = collate_fn
+        self.num_workers = num_workers
+        self.prefetch = prefetch
+        self.worker_type = worker_type
+        self.rng = np.random.default_rng(seed) if seed is not None else default_generator.spawn(1)[0].rng
+
+    def __len__(self):
+        if isinstance(self.dataset, IterableDataset):
+            # TypeError, so that list(loader) ignores the length
+            raise TypeError("The number of batches of an IterableDataset is unknown")
+        if self.drop_last:
+            return len(self.dataset) // self.batch_size
+        return math.ceil(len(self.dataset) / self.batch_size)
+
+    def batch_indices(self):
+        """Returns the list of the arrays of indices of the batches of an epoch"""
+        n = len(self.dataset)
+        order = self.rng.permutation(n) if self.shuffle else np.arange(n)
+        end = len(self) * self.batch_size if self.drop_last else n
+        return [order[start:start + self.batch_size] for start in range(0, end, self.batch_size)]
+
+    def __iter__(self):
+        if isinstance(self.dataset, IterableDataset):
+            return self.iterate_stream()
+        if self.num_workers == 0:
+            return (load_batch(self.dataset, indices, self.collate_fn) for indices in self.batch_indices())
+        return self.iterate_workers()
+
+    def iterate_workers(self):
+        """Yields the batches in order, while the workers prepare the next ones"""
+        if self.worker_type == "thread":
+            executor = concurrent.futures.ThreadPoolExecutor(self.num_workers)
+            load = lambda indices: load_batch(self.dataset, indices, self.collate_fn)
+        else:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                self.num_workers, initializer=_init_worker, initargs=(self.dataset, self.collate_fn)
+            )
+            load = _load_worker_batch
+
+        pending = collections.deque()
+        batches = iter(self.batch_indices())
+        try:
+            for indices in batches:
+                pending.append(executor.submit(load, indices))
+                if len(pending) >= self.prefetch * self.num_workers:
+                    break
+            while pending:
+                batch = pending.popleft().result()
+                for indices in batches:
+                    pending.append(executor.submit(load, indices))
+                    break
+                yield batch
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def iterate_stream(self):
+        """Yields the batches of an IterableDataset, prepared in a background thread if num_workers > 0"""
+        if self.num_workers == 0:
+            yield from self.dataset.batches(self.batch_size, self.drop_last, self.collate_fn)
+            return
+
+        # The stream is read sequentially, so a single background thread prepares the batches
+        batches = queue.Queue(maxsize=self.prefetch * self.num_workers)
+        stop = threading.Event()
+        end = object()
+
+        def put(item):
+            """Puts item in the queue, returns False if the iteration has been stopped"""
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                for batch in self.dataset.batches(self.batch_size, self.drop_last, self.collate_fn):
+                    if not put(batch):
+                        return
+            except Exception as e:
+                put(e)
+                return
+            put(end)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is end:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            producer.join()
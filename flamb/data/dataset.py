@@ -0,0 +1,104 @@
+"""
+This file defines the datasets read by a DataLoader
+"""
+
+import numpy as np
+
+
+class Dataset:
+    """
+    Map-style dataset: subclasses implement __len__ and __getitem__, which returns one sample
+    (a numpy array, a number, or a tuple or dict of them).
+    They can also implement get_batch(indices), which returns a whole collated batch at once
+    """
+
+    def __len__(self):
+        raise Exception("You need to implement the __len__ method")
+
+    def __getitem__(self, index):
+        raise Exception("You need to implement the __getitem__ method")
+
+    def get_batch(self, indices):
+        """Returns the collated batch of the samples at indices (a numpy array of integers)"""
+        return default_collate([self[index] for index in indices])
+
+
+class TensorDataset(Dataset):
+    """
+    Dataset wrapping numeric arrays having the same first dimension. A sample is the tuple of the rows
+    of the arrays at an index, and a batch is gathered from each array with a single fancy indexing
+    """
+
+    def __init__(self, *arrays):
+        assert len(arrays) > 0, "A TensorDataset needs at least one array"
+        self.arrays = [np.asanyarray(array) for array in arrays]
+        assert all(len(array) == len(self.arrays[0]) for array in self.arrays), \
+            "The arrays of a TensorDataset should have the same first dimension"
+
+    def __len__(self):
+        return len(self.arrays[0])
+
+    def __getitem__(self, index):
+        return tuple(array[index] for array in self.arrays)
+
+    def get_batch(self, indices):
+        """Returns views of the arrays if indices are consecutive, otherwise copies of the rows at indices"""
+        if len(indices) > 0 and indices[-1] - indices[0] == len(indices) - 1 and np.all(np.diff(indices) == 1):
+            batch = slice(indices[0], indices[-1] + 1)
+            return tuple(array[batch] for array in self.arrays)
+        return tuple(array[indices] for array in self.arrays)
+
+
+class Subset(Dataset):
+    """The samples of dataset at indices (an array of integers)"""
+
+    def __init__(self, dataset, indices):
+        self.dataset = dataset
+        self.indices = np.asarray(indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        return self.dataset[self.indices[index]]
+
+    def get_batch(self, indices):
+        return self.dataset.get_batch(self.indices[indices])
+
+
+class IterableDataset:
+    """
+    Stream-style dataset: subclasses implement __iter__, which yields the samples one by one.
+    They can also implement batches, to build the batches without going through each sample
+    """
+
+    def __iter__(self):
+        raise Exception("You need to implement the __iter__ method")
+
+    def batches(self, batch_size, drop_last=False, collate_fn=None):
+        """Yields the collated batches of batch_size samples"""
+        collate_fn = collate_fn or default_collate
+        samples = iter(self)
+        while True:
+            batch = [sample for _, sample in zip(range(batch_size), samples)]
+            if not batch or (drop_last and len(batch) < batch_size):
+                return
+            yield collate_fn(batch)
+
+
+def default_collate(samples):
+    """
+    Stacks a list of samples into numeric arrays whose first dimension is the batch.
+    Tuples and dicts are collated field by field
+    """
+    first = samples[0]
+    if isinstance(first, (tuple, list)):
+        return tuple(default_collate([sample[i] for sample in samples]) for i in range(len(first)))
+    if isinstance(first, dict):
+        return {key: default_collate([sample[key] for sample in samples]) for key in first}
+
+    first = np.asarray(first)
+    batch = np.empty((len(samples),) + first.shape, dtype=first.dtype)
+    for i, sample in enumerate(samples):
+        batch[i] = sample
+    return batch
@@ -0,0 +1,97 @@
+"""
+This file defines datasets reading files which may not fit in memory: .npy and raw binary files are memory-mapped,
+and CSV files are streamed in chunks
+"""
+
+import itertools
+import os
+import numpy as np
+from .dataset import TensorDataset, IterableDataset
+
+
+class NpyDataset(TensorDataset):
+    """
+    TensorDataset whose arrays are memory-mapped from .npy files (one array per path): only the pages of the
+    rows read by a batch are loaded. Batches of consecutive indices (without shuffling) are zero-copy views
+    """
+
+    def __init__(self, *paths):
+        super().__init__(*[np.load(path, mmap_mode="r") for path in paths])
+
+
+class BinaryDataset(TensorDataset):
+    """
+    TensorDataset whose array is memory-mapped from a raw binary file containing samples of shape sample_shape
+    and type dtype, stored contiguously (in C order) from offset (in bytes)
+    """
+
+    def __init__(self, path, dtype, sample_shape=(), offset=0):
+        dtype = np.dtype(dtype)
+        sample_size = dtype.itemsize * int(np.prod(sample_shape))
+        nb_bytes = os.path.getsize(path) - offset
+        assert nb_bytes % sample_size == 0, f"The size of {path} is not a multiple of the size of a sample"
+        shape = (nb_bytes // sample_size,) + tuple(sample_shape)
+        super().__init__(np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape))
+
+
+class CSVDataset(IterableDataset):
+    """
+    Streams the rows of a numeric CSV file, reading and parsing chunk_size lines at a time, so that the memory
+    used does not depend on the size of the file.
+    A sample is the array of the values of a row, or the pair (features, targets) if target_columns
+    (a list of column indices) is given
+    """
+
+    def __init__(self, path, target_columns=None, delimiter=",", skip_header=1, chunk_size=4096, dtype=np.float64):
+        self.path = path
+        self.target_columns = target_columns
+        self.delimiter = delimiter
+        self.skip_header = skip_header
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+
+    def chunks(self):
+        """Yields the rows of the file as 2D arrays of at most chunk_size rows"""
+        with open(self.path) as file:
+            lines = itertools.islice(file, self.skip_header, None)
+            while True:
+                chunk = list(itertools.islice(lines, self.chunk_size))
+                if not chunk:
+                    return
+                yield np.loadtxt(chunk, delimiter=self.delimiter, dtype=self.dtype, ndmin=2)
+
+    def split(self, rows):
+        """Returns rows, or the pair (features, targets) if target_columns is given"""
+        if self.target_columns is None:
+            return rows
+        features = np.delete(rows, self.target_columns, axis=-1)
+        return features, rows[..., self.target_columns]
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            for row in chunk:
+                yield self.split(row)
+
+    def batches(self, batch_size, drop_last=False, collate_fn=None):
+        """Yields the batches as views of the parsed chunks, only the batches overlapping two chunks are copied"""
+        if collate_fn is not None:
+            yield from super().batches(batch_size, drop_last, collate_fn)
+            return
+
+        remainder = None
+        for chunk in self.chunks():
+            start = 0
+            if remainder is not None:
+                start = batch_size - len(remainder)
+                if start > len(chunk):
+                    remainder = np.concatenate([remainder, chunk])
+                    continue
+                yield self.split(np.concatenate([remainder, chunk[:start]]))
+                remainder = None
+            end = start + (len(chunk) - start) // batch_size * batch_size
+            for batch_start in range(start, end, batch_size):
+                yield self.split(chunk[batch_start:batch_start + batch_size])
+            if end < len(chunk):
+                remainder = chunk[end:]
+        if remainder is not None and not drop_last:
+            yield self.split(remainder)
@@ -0,0 +1,82 @@
+"""
+This file defines the export function, which writes the forward computation of a model in a file
+executed by flamb.runtime
+"""
+
+import numpy as np
+import flamb
+from flamb import runtime
+from flamb.autograd.operators import trace, get_value
+
+
+def is_constant(x):
+    """Returns True if x does not depend on the input of the model (its variables are not results of operations)"""
+    if isinstance(x, np.ndarray) and x.dtype == object:
+        return all(not isinstance(var, flamb.Variable) or var.last_operation is None for var in x.flat)
+    return not isinstance(x, flamb.Variable) or x.last_operation is None
+
+
+def export(module, example_input, path):
+    """
+    Runs module on example_input (in evaluation mode, without gradients) and writes the operations applied
+    to the input, with the values of the weights, in the .npz file path, which can be loaded with flamb.runtime.load.
+
+    Only the operations made by the layers and functions having a runtime kernel are recorded: Linear,
+    BatchNorm1d and Dropout (in evaluation mode), and the activations of flamb.functional. An exception is raised
+    if the output depends on the input through other operations
+    """
+    training = getattr(module, "training", None)
+    if training is not None:
+        module.eval()
+    try:
+        with flamb.no_grad(), trace() as traced:
+            output = module(example_input)
+    finally:
+        if training:
+            module.train()
+
+    # Keeps the traced tensors alive, so that their ids are not reused
+    tensors = [example_input, output]
+    names = {id(example_input): "input"}
+    constants = {}
+    operations = []
+    for operator, inputs in traced.operations:
+        kernel, extra_constants = operator.export()
+        input_names = []
+        for x in inputs:
+            if id(x) not in names:
+                if not is_constant(x):
+                    raise Exception(
+                        f"An input of {type(operator).__name__} is computed by an operation which cannot be exported"
+                    )
+                names[id(x)] = f"constant_{len(constants)}"
+                constants[names[id(x)]] = np.array(get_value(x), dtype=np.float64)
+                tensors.append(x)
+            input_names.append(names[id(x)])
+        for constant in extra_constants:
+            input_names.append(f"constant_{len(constants)}")
+            # The constants of the operators keep their type (int8 weights for instance)
+            constants[input_names[-1]] = np.array(constant)
+
+        output_tensor = operator.outputs[0]
+        names[id(output_tensor)] = f"value_{len(operations)}"
+        tensors.append(output_tensor)
+        operations.append({"type": kernel, "inputs": input_names, "output": names[id(output_tensor)]})
+
+    if id(output) not in names or names[id(output)] == "input":
+        raise Exception("The output of the module is not computed by operations which can be exported")
+    operations = prune(operations, names[id(output)])
+    used = {name for operation in operations for name in operation["inputs"]}
+    constants = {name: value for name, value in constants.items() if name in used}
+    runtime.save(path, {"operations": operations, "output": names[id(output)]}, constants)
+
+
+def prune(operations, output):
+    """Removes the operations whose result is not used to compute output"""
+    needed = {output}
+    kept = []
+    for operation in reversed(operations):
+        if operation["output"] in needed:
+            kept.append(operation)
+            needed.update(operation["inputs"])
+    return kept[::-1]
@@ -5,10 +5,48 @@ This file contains mathematical functions that work on Variable, or classical ty
 import flamb
 import math
 import numpy as np
+from flamb import runtime
+from flamb.autograd.operators import TensorOperator
+
+
+class ElementwiseOperator(TensorOperator):
+    """
+    Applies a function to each element of a tensor at once. name is the name of the function in flamb.runtime,
+    derivative returns the derivative given the input and the output values
+    """
+
+    derivatives = {
+        "exp": lambda x, y: y,
+        "cos": lambda x, y: -np.sin(x),
+        "sin": lambda x, y: np.cos(x),
+        "tan": lambda x, y: 1 + y ** 2,
+        "tanh": lambda x, y: 1 - y ** 2,
+        "relu": lambda x, y: (x > 0).astype(np.float64),
+    }
+
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+
+    def forward(self, x):
+        kernel, _ = runtime.KERNELS[self.name]
+        self.x = x
+        self.y = kernel(x)
+        return self.y
+
+    def backward(self, grad):
+        return grad * self.derivatives[self.name](self.x, self.y)
+
+    def release(self):
+        self.x = self.y = None
+
+    def export(self):
+        return self.name, []
+
 
 def exp(x):
     if isinstance(x, flamb.Tensor):
-        return np.vectorize(lambda x: x.exp())(x) # ALERT: this may cause a problem if tensors contain non-variable values
+        return ElementwiseOperator("exp")(x)
     elif isinstance(x, flamb.Variable):
         return x.exp()
     else:
@@ -17,7 +55,7 @@ def exp(x):
 
 def cos(x):
     if isinstance(x, flamb.Tensor):
-        return np.vectorize(lambda x: x.cos())(x)
+        return ElementwiseOperator("cos")(x)
     elif isinstance(x, flamb.Variable):
         return x.cos()
     else:
@@ -26,7 +64,7 @@ def cos(x):
 
 def sin(x):
     if isinstance(x, flamb.Tensor):
-        return np.vectorize(lambda x: x.sin())(x)
+        return ElementwiseOperator("sin")(x)
     elif isinstance(x, flamb.Variable):
         return x.sin()
     else:
@@ -35,7 +73,7 @@ def sin(x):
 
 def tan(x):
     if isinstance(x, flamb.Tensor):
-        return np.vectorize(lambda x: x.tan())(x)
+        return ElementwiseOperator("tan")(x)
     elif isinstance(x, flamb.Variable):
         return x.tan()
     else:
@@ -44,7 +82,7 @@ def tan(x):
 
 def tanh(x):
     if isinstance(x, flamb.Tensor):
-        return np.vectorize(lambda x: x.tanh())(x)
+        return ElementwiseOperator("tanh")(x)
     elif isinstance(x, flamb.Variable):
         return x.tanh()
     else:
@@ -53,7 +91,7 @@ def tanh(x):
 
 def ReLU(x):
     if isinstance(x, flamb.Tensor):
-        return np.vectorize(lambda x: x.ReLU())(x)
+        return ElementwiseOperator("relu")(x)
     elif isinstance(x, flamb.Variable):
         return x.ReLU()
     else:
@@ -3,4 +3,6 @@ from .module import Module
 from .losses import *
 from .optimizers import *
 
-__all__ = ["Module", "layers", "losses", "optimizers"]
+__all__ = ["Module", "layers", "losses", "optimizers", "init"]
+from . import utils
+from . import init
@@ -0,0 +1,166 @@
+"""
+This file defines the hooks of the modules and layers: functions called before and after their forward,
+and during the backward with the gradients of their outputs
+"""
+
+import functools
+import itertools
+import numpy as np
+from flamb.autograd.operators import TensorOperator, needs_grad
+
+_hook_ids = itertools.count()
+
+
+class RemovableHandle:
+    """Returned by the register methods, remove() unregisters the hook"""
+
+    def __init__(self, owner, kind, hook_id):
+        self.owner = owner
+        self.kind = kind
+        self.hook_id = hook_id
+
+    def remove(self):
+        self.owner._remove_hook(self.kind, self.hook_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.remove()
+
+
+class HookOperator(TensorOperator):
+    """
+    Returns its inputs unchanged, and calls fn(grads) during the backward with the gradients of its outputs
+    (a tuple of numpy arrays). fn can return a tuple of new gradients, which are propagated instead.
+    If force_grad is True, the operator requires grad even if its inputs do not, so that fn is called once
+    the gradient has gone through everything computed from the outputs
+    """
+
+    def __init__(self, fn, force_grad=False):
+        super().__init__()
+        self.fn = fn
+        self.has_hidden_parameters = force_grad
+
+    def __call__(self, *inputs):
+        self.inputs_need_grad = [needs_grad(x) for x in inputs]
+        return super().__call__(*inputs)
+
+    def forward(self, *values):
+        return values[0] if len(values) == 1 else values
+
+    def backward(self, *grads):
+        new_grads = self.fn(grads)
+        if new_grads is not None:
+            grads = new_grads
+        return [grad if need_grad else None for grad, need_grad in zip(grads, self.inputs_need_grad)]
+
+    def export(self):
+        if len(self.output_values) > 1:
+            raise Exception("A HookOperator with several inputs cannot be exported")
+        return "identity", []
+
+
+def is_tensor(x):
+    return isinstance(x, np.ndarray) and x.dtype == object
+
+
+def apply_hook_operator(x, fn, force_grad=False):
+    """
+    Passes the tensors of x (a tensor, or a tuple or list of values) which need a gradient through a HookOperator
+    calling fn (all of them if force_grad is True), and returns x with them replaced
+    """
+    values = list(x) if isinstance(x, (tuple, list)) else [x]
+    positions = [i for i, value in enumerate(values) if is_tensor(value) and (force_grad or needs_grad(value))]
+    if not positions:
+        return x
+    outputs = HookOperator(fn, force_grad)(*[values[i] for i in positions])
+    for i, output in zip(positions, outputs if len(positions) > 1 else [outputs]):
+        values[i] = output
+    return type(x)(values) if isinstance(x, (tuple, list)) else values[0]
+
+
+def call_with_hooks(owner, call, args, kwargs):
+    hooks = owner._hooks
+    # A __call__ calling the __call__ of its parent class only runs the hooks once
+    if owner.__dict__.get("_running_hooks"):
+        return call(owner, *args, **kwargs)
+    owner._running_hooks = True
+    try:
+        for hook in list(hooks["forward_pre"].values()):
+            result = hook(owner, args)
+            if result is not None:
+                args = result if isinstance(result, tuple) else (result,)
+        output = call(owner, *args, **kwargs)
+        for hook in list(hooks["forward"].values()):
+            result = hook(owner, args, output)
+            if result is not None:
+                output = result
+        if hooks["backward"]:
+            output = apply_hook_operator(output, functools.partial(run_backward_hooks, owner))
+    finally:
+        owner._running_hooks = False
+    return output
+
+
+def run_backward_hooks(owner, grads):
+    # The hooks removed since the forward are not called
+    for hook in list((owner._hooks or {}).get("backward", {}).values()):
+        result = hook(owner, grads)
+        if result is not None:
+            grads = tuple(result)
+    return grads
+
+
+def with_hooks(call):
+    """Wraps the __call__ of a module or a layer, so that it runs the hooks when some are registered"""
+    @functools.wraps(call)
+    def __call__(self, *args, **kwargs):
+        if self._hooks is None:
+            return call(self, *args, **kwargs)
+        return call_with_hooks(self, call, args, kwargs)
+    return __call__
+
+
+class Hookable:
+    """
+    Base class of the modules and layers, which can have hooks:
+    - forward pre hooks hook(module, args), called before __call__, can return new args (a tuple, or a single value)
+    - forward hooks hook(module, args, output), called after __call__, can return a new output
+    - backward hooks hook(module, grad_output), called during the backward once the gradients of the outputs
+      (a tuple of numpy arrays, one for each output tensor which needs a gradient) are known, can return new ones
+
+    The __call__ of each subclass is wrapped to run the hooks. Without hooks, the wrapper only checks
+    that _hooks is None before calling it
+    """
+
+    # dict kind: {hook_id: hook}, None if the module has no hooks
+    _hooks = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "__call__" in cls.__dict__:
+            cls.__call__ = with_hooks(cls.__dict__["__call__"])
+
+    def _register_hook(self, kind, hook):
+        if self._hooks is None:
+            self._hooks = {"forward_pre": {}, "forward": {}, "backward": {}}
+        hook_id = next(_hook_ids)
+        self._hooks[kind][hook_id] = hook
+        return RemovableHandle(self, kind, hook_id)
+
+    def _remove_hook(self, kind, hook_id):
+        if self._hooks is None:
+            return
+        self._hooks[kind].pop(hook_id, None)
+        if not any(self._hooks.values()):
+            self._hooks = None
+
+    def register_forward_pre_hook(self, hook):
+        return self._register_hook("forward_pre", hook)
+
+    def register_forward_hook(self, hook):
+        return self._register_hook("forward", hook)
+
+    def register_backward_hook(self, hook):
+        return self._register_hook("backward", hook)
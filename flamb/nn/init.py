@@ -0,0 +1,83 @@
+"""
+This file contains the initializations of the parameters of the layers. Each one fills a tensor of variables
+(or a Parameter) in place, with values drawn in one call from generator (the default generator if None)
+"""
+
+import math
+from flamb.autograd import Parameter
+from flamb.autograd.operators import flat_slice
+from flamb.random import get_generator
+
+
+def fill_(tensor, values):
+    """Sets the values of tensor (a tensor of variables or a Parameter) to those of a numpy array, returns tensor"""
+    if isinstance(tensor, Parameter):
+        tensor.data[...] = values
+        return tensor
+    stored = flat_slice(tensor)
+    if stored is not None:
+        storage, flat = stored
+        storage.values[flat] = values.ravel()
+    else:
+        for var, value in zip(tensor.flat, values.ravel().tolist()):
+            var.value = value
+    return tensor
+
+
+def calculate_gain(nonlinearity, param=None):
+    """Recommended gain for the initialization of a layer followed by nonlinearity"""
+    if nonlinearity in ("linear", "sigmoid"):
+        return 1.
+    if nonlinearity == "tanh":
+        return 5 / 3
+    if nonlinearity == "relu":
+        return math.sqrt(2.)
+    if nonlinearity == "leaky_relu":
+        negative_slope = 0.01 if param is None else param
+        return math.sqrt(2. / (1 + negative_slope ** 2))
+    raise Exception(f"Unknown nonlinearity {nonlinearity}")
+
+
+def calculate_fans(shape):
+    """
+    Returns (fan_in, fan_out) for weights of shape (input_size, output_size) (Linear layers),
+    or (out_channels, in_channels, *kernel_size) (convolutions)
+    """
+    assert len(shape) >= 2, f"The fans cannot be computed for a tensor with fewer than 2 dimensions, got {shape}"
+    if len(shape) == 2:
+        return shape[0], shape[1]
+    receptive_field = math.prod(shape[2:])
+    return shape[1] * receptive_field, shape[0] * receptive_field
+
+
+def uniform_(tensor, a=0., b=1., generator=None):
+    return fill_(tensor, get_generator(generator).uniform(a, b, tensor.shape))
+
+
+def normal_(tensor, mean=0., std=1., generator=None):
+    return fill_(tensor, get_generator(generator).normal(mean, std, tensor.shape))
+
+
+def xavier_uniform_(tensor, gain=1., generator=None):
+    fan_in, fan_out = calculate_fans(tensor.shape)
+    bound = gain * math.sqrt(6 / (fan_in + fan_out))
+    return uniform_(tensor, -bound, bound, generator)
+
+
+def xavier_normal_(tensor, gain=1., generator=None):
+    fan_in, fan_out = calculate_fans(tensor.shape)
+    return normal_(tensor, 0., gain * math.sqrt(2 / (fan_in + fan_out)), generator)
+
+
+def kaiming_uniform_(tensor, a=0., mode="fan_in", nonlinearity="leaky_relu", generator=None):
+    """mode is "fan_in" to preserve the scale of the activations in the forward, or "fan_out" for the gradients"""
+    assert mode in ("fan_in", "fan_out"), f"mode should be fan_in or fan_out, but got {mode}"
+    fan = calculate_fans(tensor.shape)[mode == "fan_out"]
+    bound = calculate_gain(nonlinearity, a) * math.sqrt(3 / fan)
+    return uniform_(tensor, -bound, bound, generator)
+
+
+def kaiming_normal_(tensor, a=0., mode="fan_in", nonlinearity="leaky_relu", generator=None):
+    assert mode in ("fan_in", "fan_out"), f"mode should be fan_in or fan_out, but got {mode}"
+    fan = calculate_fans(tensor.shape)[mode == "fan_out"]
+    return normal_(tensor, 0., calculate_gain(nonlinearity, a) / math.sqrt(fan), generator)
@@ -1,4 +1,12 @@
 from .linear import Linear
+from .conv import Conv1d, Conv2d
+from .pooling import MaxPool1d, MaxPool2d, AvgPool1d, AvgPool2d
+from .recurrent import RNN, GRU, LSTM
+from .embedding import Embedding
+from .normalization import LayerNorm, BatchNorm1d
+from .dropout import Dropout
+from .quantized import QuantizedLinear
+from .sparse import SparseLinear
 
-__all__ = ["Linear"]
+__all__ = ["Linear", "Conv1d", "Conv2d", "MaxPool1d", "MaxPool2d", "AvgPool1d", "AvgPool2d", "RNN", "GRU", "LSTM", "Embedding", "LayerNorm", "BatchNorm1d", "Dropout", "QuantizedLinear", "SparseLinear"]
 
@@ -1,4 +1,22 @@
-class LayerBase:
+from ..hooks import Hookable
+
+
+class LayerBase(Hookable):
+    # Layers behave differently during training and evaluation (dropout, batch normalization...)
+    training = True
+
+    def __call__(self, *args, **kwargs):
+        return self.forward(*args, **kwargs)
+
+    def train(self, mode=True):
+        """Sets the layer in training mode (or in evaluation mode if mode=False)"""
+        self.training = mode
+        return self
+
+    def eval(self):
+        """Sets the layer in evaluation mode"""
+        return self.train(False)
+
     def get_parameters(self):
         raise Exception("You need to implement get_parameters method") 
 
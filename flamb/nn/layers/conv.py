@@ -0,0 +1,161 @@
+import flamb
+import numpy as np
+from flamb.autograd.operators import TensorOperator
+from .base import LayerBase
+from .utils import Workspace, to_tuple, pad, unpad, sliding_windows, col2im
+
+
+class ConvOperator(TensorOperator):
+    """
+    Convolution computed with im2col: the windows of the input are copied in a matrix of columns,
+    and the output is obtained with one (batched over groups) matrix multiplication.
+    The gradient with respect to the input is obtained with col2im
+    """
+
+    def __init__(self, stride, padding, dilation, groups, workspace):
+        super().__init__()
+        self.stride = stride
+        self.padding = padding
+        self.dilation = dilation
+        self.groups = groups
+        self.workspace = workspace
+
+    def forward(self, x, weights, bias=None):
+        batch_size, in_channels = x.shape[:2]
+        out_channels = weights.shape[0]
+        kernel_size = weights.shape[2:]
+        groups = self.groups
+
+        padded = pad(x, self.padding, self.workspace)
+        windows = sliding_windows(padded, kernel_size, self.stride, self.dilation)
+        out_size = windows.shape[2 : 2 + len(kernel_size)]
+
+        # cols has shape (groups, B, *out_size, in_channels/groups, *kernel_size)
+        nb_dim = len(kernel_size)
+        windows = windows.reshape((batch_size, groups, in_channels // groups) + windows.shape[2:])
+        order = (1, 0) + tuple(range(3, 3 + nb_dim)) + (2,) + tuple(range(3 + nb_dim, 3 + 2 * nb_dim))
+        cols = self.workspace.get("cols", tuple(windows.shape[i] for i in order))
+        np.copyto(cols, windows.transpose(order))
+        if padded is not x:
+            self.workspace.release("padded", padded)
+
+        self.cols = cols
+        self.weights = weights
+        self.x_shape = x.shape
+        self.padded_shape = padded.shape
+        self.out_size = out_size
+        self.has_bias = bias is not None
+
+        # (groups, B*out, C_in/groups*K) @ (groups, C_in/groups*K, C_out/groups)
+        matrix = cols.reshape(groups, batch_size * int(np.prod(out_size)), -1)
+        kernel = weights.reshape(groups, out_channels // groups, -1).transpose(0, 2, 1)
+        out = np.matmul(matrix, kernel)
+
+        # (groups, B, *out_size, C_out/groups) -> (B, C_out, *out_size)
+        out = out.reshape((groups, batch_size) + out_size + (out_channels // groups,))
+        out = out.transpose((1, 0, 2 + nb_dim) + tuple(range(2, 2 + nb_dim)))
+        out = out.reshape((batch_size, out_channels) + out_size)
+        if bias is not None:
+            out += bias.reshape((1, out_channels) + (1,) * nb_dim)
+        return out
+
+    def backward(self, grad):
+        groups = self.groups
+        batch_size = self.x_shape[0]
+        out_channels = self.weights.shape[0]
+        kernel_size = self.weights.shape[2:]
+        nb_dim = len(kernel_size)
+        cols = self.cols
+
+        # grad has shape (B, C_out, *out_size), it is rearranged as (groups, B*out, C_out/groups)
+        grad_matrix = grad.reshape((batch_size, groups, out_channels // groups) + self.out_size)
+        grad_matrix = np.moveaxis(grad_matrix, 2, -1).swapaxes(0, 1).reshape(groups, -1, out_channels // groups)
+        matrix = cols.reshape(groups, grad_matrix.shape[1], -1)
+
+        grad_weights = np.matmul(matrix.transpose(0, 2, 1), grad_matrix)
+        grad_weights = grad_weights.transpose(0, 2, 1).reshape(self.weights.shape)
+
+        kernel = self.weights.reshape(groups, out_channels // groups, -1)
+        grad_cols = np.matmul(grad_matrix, kernel).reshape(cols.shape)
+        # (groups, B, *out_size, C_in/groups, *kernel_size) -> (B, C_in, *out_size, *kernel_size)
+        order = (1, 0, 2 + nb_dim) + tuple(range(2, 2 + nb_dim)) + tuple(range(3 + nb_dim, 3 + 2 * nb_dim))
+        grad_cols = grad_cols.transpose(order)
+        grad_cols = grad_cols.reshape((batch_size, self.x_shape[1]) + grad_cols.shape[3:])
+        grad_x = unpad(col2im(grad_cols, self.padded_shape, self.stride, self.dilation), self.padding)
+
+        grads = [grad_x, grad_weights]
+        if self.has_bias:
+            grads.append(grad.sum(axis=(0,) + tuple(range(2, 2 + nb_dim))))
+        return grads
+
+    def per_sample_backward(self, grad):
+        groups = self.groups
+        batch_size = self.x_shape[0]
+        out_channels = self.weights.shape[0]
+        nb_dim = len(self.out_size)
+        # (B, groups, out, C_in/groups*K) and (B, groups, C_out/groups, out)
+        matrix = self.cols.reshape(groups, batch_size, int(np.prod(self.out_size)), -1).swapaxes(0, 1)
+        grad_matrix = grad.reshape((batch_size, groups, out_channels // groups, -1))
+        grad_weights = np.matmul(grad_matrix, matrix)
+        grads = [None, grad_weights.reshape((batch_size,) + self.weights.shape)]
+        if self.has_bias:
+            grads.append(grad.sum(axis=tuple(range(2, 2 + nb_dim))))
+        return grads
+
+    def release(self):
+        if getattr(self, "cols", None) is not None:
+            self.workspace.release("cols", self.cols)
+            self.cols = None
+
+
+class ConvNd(LayerBase):
+    """
+    Convolution over the last nb_dim dimensions of an input of shape (batch_size, in_channels, *size).
+    The weights have shape (out_channels, in_channels // groups, *kernel_size), and are drawn from generator
+    (the default generator if None)
+    """
+
+    nb_dim = None
+
+    def __init__(self, in_channels, out_channels, kernel_size, stride=1, padding=0, dilation=1, groups=1, bias=True,
+                 generator=None):
+        super().__init__()
+        assert in_channels % groups == 0, "in_channels should be divisible by groups"
+        assert out_channels % groups == 0, "out_channels should be divisible by groups"
+        self.in_channels = in_channels
+        self.out_channels = out_channels
+        self.kernel_size = to_tuple(kernel_size, self.nb_dim)
+        self.stride = to_tuple(stride, self.nb_dim)
+        self.padding = to_tuple(padding, self.nb_dim)
+        self.dilation = to_tuple(dilation, self.nb_dim)
+        self.groups = groups
+        self.weights = flamb.rand(
+            (out_channels, in_channels // groups) + self.kernel_size, requires_grad=True, generator=generator
+        )
+        self.bias = flamb.rand((out_channels,), requires_grad=True, generator=generator) if bias else None
+        self.workspace = Workspace()
+
+    def forward(self, x):
+        assert len(x.shape) == self.nb_dim + 2, f"Input should have {self.nb_dim + 2} dimensions, but got {len(x.shape)}"
+        assert (x.shape[1] == self.in_channels), f"Number of channels of x should be {self.in_channels}, but got {x.shape[1]}"
+        operator = ConvOperator(self.stride, self.padding, self.dilation, self.groups, self.workspace)
+        if self.bias is None:
+            return operator(x, self.weights)
+        return operator(x, self.weights, self.bias)
+
+    def get_parameters(self):
+        if self.bias is None:
+            return self.weights.flatten()
+        return flamb.concatenate(self.weights.flatten(), self.bias)
+
+
+class Conv1d(ConvNd):
+    """1D convolution, on inputs of shape (batch_size, in_channels, length)"""
+
+    nb_dim = 1
+
+
+class Conv2d(ConvNd):
+    """2D convolution, on inputs of shape (batch_size, in_channels, height, width)"""
+
+    nb_dim = 2
@@ -0,0 +1,42 @@
+import flamb
+from flamb.autograd.operators import TensorOperator
+from flamb.random import Generator, get_generator
+from .base import LayerBase
+
+
+class DropoutOperator(TensorOperator):
+    """Multiplication of x by a constant mask"""
+
+    def __init__(self, mask):
+        super().__init__()
+        self.mask = mask
+
+    def forward(self, x):
+        return x * self.mask
+
+    def backward(self, grad):
+        return grad * self.mask
+
+
+class Dropout(LayerBase):
+    """
+    During training, each value of the input is set to 0 with probability p, and the other values
+    are multiplied by 1 / (1 - p). The mask is drawn in one call from generator (a flamb.Generator),
+    or from a new generator seeded with seed, or from the default generator if both are None.
+    In evaluation mode, the input is returned as it is, without adding anything to the graph
+    """
+
+    def __init__(self, p=0.5, seed=None, generator=None):
+        super().__init__()
+        assert 0 <= p < 1, f"p should be in [0, 1), but got {p}"
+        self.p = p
+        self.generator = Generator(seed) if generator is None and seed is not None else generator
+
+    def forward(self, x):
+        if not self.training or self.p == 0:
+            return x
+        mask = (get_generator(self.generator).random(x.shape) >= self.p) / (1 - self.p)
+        return DropoutOperator(mask)(x)
+
+    def get_parameters(self):
+        return flamb.to_tensor([])
@@ -0,0 +1,45 @@
+import flamb
+import numpy as np
+from flamb.autograd import Parameter, SparseGrad
+from flamb.autograd.operators import TensorOperator, get_value
+from flamb.random import get_generator
+from .base import LayerBase
+
+
+class EmbeddingOperator(TensorOperator):
+    """
+    Lookup of the rows of a table. The gradient of the table is a SparseGrad containing only the rows
+    which have been looked up, so its cost depends on the number of indices and not on the size of the table
+    """
+
+    def __init__(self, indices):
+        super().__init__()
+        self.indices = indices
+
+    def forward(self, weights):
+        return weights[self.indices]
+
+    def backward(self, grad):
+        return SparseGrad(self.indices.ravel(), grad.reshape(self.indices.size, -1))
+
+
+class Embedding(LayerBase):
+    """
+    Table of num_embeddings vectors of size embedding_dim.
+    Given indices of any shape, returns a tensor of shape (*indices.shape, embedding_dim).
+    The table is a Parameter: the optimizers only update the rows which received a gradient
+    """
+
+    def __init__(self, num_embeddings, embedding_dim, generator=None):
+        super().__init__()
+        self.num_embeddings = num_embeddings
+        self.embedding_dim = embedding_dim
+        self.weights = Parameter(get_generator(generator).normal(0, 1, (num_embeddings, embedding_dim)), sparse=True)
+
+    def forward(self, indices):
+        indices = get_value(indices).astype(np.int64)
+        assert (indices.size == 0 or (0 <= indices.min() and indices.max() < self.num_embeddings)), f"Indices should be between 0 and {self.num_embeddings - 1}"
+        return EmbeddingOperator(indices)(self.weights)
+
+    def get_parameters(self):
+        return flamb.to_tensor([self.weights])
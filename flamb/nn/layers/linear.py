@@ -1,19 +1,53 @@
 import flamb
+import numpy as np
+from flamb import runtime
+from flamb.autograd.operators import TensorOperator
 from .base import LayerBase
 
+
+class LinearOperator(TensorOperator):
+    """x @ weights + bias, for x of shape (..., input_size)"""
+
+    def forward(self, x, weights, bias):
+        self.x = x
+        self.weights = weights
+        return runtime.linear(x, weights, bias)
+
+    def backward(self, grad):
+        matrix = self.x.reshape(-1, self.x.shape[-1])
+        grad_matrix = grad.reshape(-1, grad.shape[-1])
+        return grad @ self.weights.T, matrix.T @ grad_matrix, grad_matrix.sum(axis=0)
+
+    def per_sample_backward(self, grad):
+        # The gradient of the weights for an example is the sum of the outer products x_i ⊗ grad_i of its rows
+        batch_size = grad.shape[0]
+        matrix = self.x.reshape(batch_size, -1, self.x.shape[-1])
+        grad_matrix = grad.reshape(batch_size, -1, grad.shape[-1])
+        return None, np.matmul(matrix.transpose(0, 2, 1), grad_matrix), grad_matrix.sum(axis=1)
+
+    def release(self):
+        self.x = None
+
+    def export(self):
+        return "linear", []
+
+
 class Linear(LayerBase):
-    def __init__(self, input_size, output_size):
+    """
+    x @ weights + bias, with weights of shape (input_size, output_size). The parameters are drawn uniformly
+    in [-1, 1] from generator (the default generator if None), see flamb.nn.init for other initializations
+    """
+
+    def __init__(self, input_size, output_size, generator=None):
         super().__init__()
         self.input_size = input_size
         self.output_size = output_size
-        self.weights = flamb.rand((input_size, output_size), requires_grad=True)
-        self.bias = flamb.rand((output_size,))
+        self.weights = flamb.rand((input_size, output_size), requires_grad=True, generator=generator)
+        self.bias = flamb.rand((output_size,), generator=generator)
 
     def __call__(self, x):
         assert (x.shape[-1] == self.input_size), f"Input size of x should be {self.input_size}, but got {x.shape[-1]}"
-        x = x.dot(self.weights)
-        x += self.bias
-        return x
+        return LinearOperator()(x, self.weights, self.bias)
 
     def get_parameters(self):
         return flamb.concatenate(self.weights.flatten(), self.bias)
@@ -0,0 +1,212 @@
+import flamb
+import numpy as np
+from flamb import runtime
+from flamb.autograd.operators import TensorOperator, get_value
+from .base import LayerBase
+from .utils import mean_var
+
+
+class NormalizationOperator(TensorOperator):
+    """
+    Normalization of a matrix (N, K) along one axis, followed by an affine transformation x_hat * weights + bias
+    with weights and bias of shape (K,). The statistics are computed in one pass, and the backward is analytic.
+    Subclasses define how the input is reshaped to a matrix
+    """
+
+    axis = None
+
+    def __init__(self, eps):
+        super().__init__()
+        self.eps = eps
+
+    def to_matrix(self, x):
+        raise Exception("This function needs to be implemented")
+
+    def from_matrix(self, matrix):
+        raise Exception("This function needs to be implemented")
+
+    def forward(self, x, weights, bias):
+        self.shape = x.shape
+        matrix = self.to_matrix(x)
+        self.mean, self.var = mean_var(matrix, self.axis)
+        self.inv_std = 1 / np.sqrt(self.var + self.eps)
+        self.x_hat = (matrix - self.mean) * self.inv_std
+        self.weights = weights
+        return self.from_matrix(self.x_hat * weights + bias)
+
+    def backward(self, grad):
+        grad = self.to_matrix(grad)
+        x_hat = self.x_hat
+        grad_x_hat = grad * self.weights
+        grad_x = self.inv_std * (
+            grad_x_hat
+            - grad_x_hat.mean(axis=self.axis, keepdims=True)
+            - x_hat * (grad_x_hat * x_hat).mean(axis=self.axis, keepdims=True)
+        )
+        return self.from_matrix(grad_x), (grad * x_hat).sum(axis=0), grad.sum(axis=0)
+
+    def release(self):
+        self.x_hat = None
+
+
+class LayerNormOperator(NormalizationOperator):
+    """The last dimensions of x are flattened, and each row is normalized"""
+
+    axis = 1
+
+    def __init__(self, eps, normalized_size):
+        super().__init__(eps)
+        self.normalized_size = normalized_size
+
+    def to_matrix(self, x):
+        return x.reshape(-1, self.normalized_size)
+
+    def from_matrix(self, matrix):
+        return matrix.reshape(self.shape)
+
+
+    def per_sample_backward(self, grad):
+        batch_size = self.shape[0]
+        grad = self.to_matrix(grad).reshape(batch_size, -1, self.normalized_size)
+        x_hat = self.x_hat.reshape(batch_size, -1, self.normalized_size)
+        return None, (grad * x_hat).sum(axis=1), grad.sum(axis=1)
+
+
+class BatchNormOperator(NormalizationOperator):
+    """x has shape (B, C) or (B, C, L), each channel is normalized over the batch (and the length)"""
+
+    axis = 0
+
+    def to_matrix(self, x):
+        if len(self.shape) == 2:
+            return x
+        return np.moveaxis(x, 1, -1).reshape(-1, self.shape[1])
+
+    def from_matrix(self, matrix):
+        if len(self.shape) == 2:
+            return matrix
+        batch_size, channels, length = self.shape
+        return np.moveaxis(matrix.reshape(batch_size, length, channels), -1, 1)
+
+
+class AffineOperator(TensorOperator):
+    """x * scale + shift, where scale and shift are constant arrays of shape (C,) applied on the channels of x"""
+
+    def __init__(self, scale, shift):
+        super().__init__()
+        self.scale = scale
+        self.shift = shift
+
+    def forward(self, x):
+        return runtime.affine(x, self.scale, self.shift)
+
+    def backward(self, grad):
+        return grad * runtime.expand_channels(self.scale, len(grad.shape))
+
+    def export(self):
+        return "affine", [self.scale, self.shift]
+
+
+class LayerNorm(LayerBase):
+    """
+    Normalizes the last dimensions of the input (given by normalized_shape), then applies
+    an elementwise affine transformation. It behaves the same way in training and evaluation mode
+    """
+
+    def __init__(self, normalized_shape, eps=1e-5, elementwise_affine=True):
+        super().__init__()
+        self.normalized_shape = (normalized_shape,) if isinstance(normalized_shape, int) else tuple(normalized_shape)
+        self.eps = eps
+        self.elementwise_affine = elementwise_affine
+        if elementwise_affine:
+            self.weights = flamb.ones(self.normalized_shape, requires_grad=True)
+            self.bias = flamb.zeros(self.normalized_shape, requires_grad=True)
+        else:
+            self.weights = np.ones(self.normalized_shape)
+            self.bias = np.zeros(self.normalized_shape)
+
+    def forward(self, x):
+        nb_dim = len(self.normalized_shape)
+        assert (tuple(x.shape[-nb_dim:]) == self.normalized_shape), f"The last dimensions of x should be {self.normalized_shape}, but got {x.shape[-nb_dim:]}"
+        operator = LayerNormOperator(self.eps, int(np.prod(self.normalized_shape)))
+        return operator(x, self.weights.reshape(-1), self.bias.reshape(-1))
+
+    def get_parameters(self):
+        if not self.elementwise_affine:
+            return flamb.to_tensor([])
+        return flamb.concatenate(self.weights.flatten(), self.bias.flatten())
+
+
+class BatchNorm1d(LayerBase):
+    """
+    Batch normalization of inputs of shape (batch_size, num_features) or (batch_size, num_features, length).
+
+    In training mode, each feature is normalized with the statistics of the batch, and running statistics are updated.
+    In evaluation mode, the running statistics and the affine parameters are folded into a scale and a shift,
+    computed when eval() is called, so the forward is a single multiply-add (weights and bias receive no gradient).
+    The layer can also be folded into the Linear layer preceding it, see fold_into.
+    """
+
+    def __init__(self, num_features, eps=1e-5, momentum=0.1):
+        super().__init__()
+        self.num_features = num_features
+        self.eps = eps
+        self.momentum = momentum
+        self.weights = flamb.ones((num_features,), requires_grad=True)
+        self.bias = flamb.zeros((num_features,), requires_grad=True)
+        self.running_mean = np.zeros(num_features)
+        self.running_var = np.ones(num_features)
+        self.scale = None
+        self.shift = None
+        self.folded = False
+
+    def train(self, mode=True):
+        assert not (mode and self.folded), "Cannot train a BatchNorm1d which has been folded into a Linear layer"
+        super().train(mode)
+        self.scale, self.shift = (None, None) if mode else self.fold_statistics()
+        return self
+
+    def fold_statistics(self):
+        """Returns the scale and the shift equivalent to the normalization with the running statistics"""
+        scale = get_value(self.weights) / np.sqrt(self.running_var + self.eps)
+        shift = get_value(self.bias) - self.running_mean * scale
+        return scale, shift
+
+    def forward(self, x):
+        assert len(x.shape) in (2, 3), f"Input should have 2 or 3 dimensions, but got {len(x.shape)}"
+        assert (x.shape[1] == self.num_features), f"Number of features of x should be {self.num_features}, but got {x.shape[1]}"
+        if not self.training:
+            if self.folded:
+                return x
+            if self.scale is None:
+                self.scale, self.shift = self.fold_statistics()
+            return AffineOperator(self.scale, self.shift)(x)
+
+        operator = BatchNormOperator(self.eps)
+        output = operator(x, self.weights, self.bias)
+        count = x.size // self.num_features
+        unbiased_var = operator.var.ravel() * count / max(count - 1, 1)
+        self.running_mean = (1 - self.momentum) * self.running_mean + self.momentum * operator.mean.ravel()
+        self.running_var = (1 - self.momentum) * self.running_var + self.momentum * unbiased_var
+        return output
+
+    def fold_into(self, linear):
+        """
+        Folds the normalization (in evaluation mode) into the Linear layer preceding it:
+        its weights and bias are modified inplace, and this layer then returns its input unchanged
+        """
+        assert not self.training, "The layer should be in evaluation mode to be folded"
+        if self.scale is None:
+            self.scale, self.shift = self.fold_statistics()
+        assert (linear.output_size == self.num_features), f"The output size of the Linear layer should be {self.num_features}"
+        weights, bias = get_value(linear.weights), get_value(linear.bias)
+        weights = weights * self.scale
+        bias = bias * self.scale + self.shift
+        for var, value in zip(linear.weights.flat, weights.ravel().tolist()):
+            var.value = value
+        for var, value in zip(linear.bias.flat, bias.tolist()):
+            var.value = value
+        self.folded = True
+
+    def get_parameters(self):
+        return flamb.concatenate(self.weights, self.bias)
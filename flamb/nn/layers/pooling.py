@@ -0,0 +1,127 @@
+import flamb
+import numpy as np
+from flamb.autograd.operators import TensorOperator
+from .base import LayerBase
+from .utils import Workspace, to_tuple, pad, unpad, sliding_windows, col2im
+
+
+class MaxPoolOperator(TensorOperator):
+    """
+    Max pooling: the windows are copied in a matrix of columns and the maximum of each window is kept.
+    The gradient is given to the position of the maximum, and put back in place with col2im
+    """
+
+    def __init__(self, kernel_size, stride, padding, workspace):
+        super().__init__()
+        self.kernel_size = kernel_size
+        self.stride = stride
+        self.padding = padding
+        self.workspace = workspace
+
+    def forward(self, x):
+        nb_dim = len(self.kernel_size)
+        padded = pad(x, self.padding, self.workspace, fill_value=-np.inf)
+        windows = sliding_windows(padded, self.kernel_size, self.stride, (1,) * nb_dim)
+        out_shape = windows.shape[: 2 + nb_dim]
+        cols = self.workspace.get("cols", out_shape + (int(np.prod(self.kernel_size)),))
+        np.copyto(cols.reshape(windows.shape), windows)
+        if padded is not x:
+            self.workspace.release("padded", padded)
+
+        self.argmax = np.argmax(cols, axis=-1)[..., None]
+        self.padded_shape = padded.shape
+        out = np.take_along_axis(cols, self.argmax, axis=-1)[..., 0]
+        self.workspace.release("cols", cols)
+        return out
+
+    def backward(self, grad):
+        grad_cols = np.zeros(grad.shape + (int(np.prod(self.kernel_size)),))
+        np.put_along_axis(grad_cols, self.argmax, grad[..., None], axis=-1)
+        grad_cols = grad_cols.reshape(grad.shape + self.kernel_size)
+        nb_dim = len(self.kernel_size)
+        return unpad(col2im(grad_cols, self.padded_shape, self.stride, (1,) * nb_dim), self.padding)
+
+    def release(self):
+        self.argmax = None
+
+
+class AvgPoolOperator(TensorOperator):
+    """
+    Average pooling, computed on a strided view of the input (no copy of the windows is made).
+    Padded values are counted in the average
+    """
+
+    def __init__(self, kernel_size, stride, padding, workspace):
+        super().__init__()
+        self.kernel_size = kernel_size
+        self.stride = stride
+        self.padding = padding
+        self.workspace = workspace
+
+    def forward(self, x):
+        nb_dim = len(self.kernel_size)
+        padded = pad(x, self.padding, self.workspace)
+        windows = sliding_windows(padded, self.kernel_size, self.stride, (1,) * nb_dim)
+        out = windows.mean(axis=tuple(range(2 + nb_dim, 2 + 2 * nb_dim)))
+        self.padded_shape = padded.shape
+        if padded is not x:
+            self.workspace.release("padded", padded)
+        return out
+
+    def backward(self, grad):
+        nb_dim = len(self.kernel_size)
+        grad = grad / np.prod(self.kernel_size)
+        grad_cols = np.broadcast_to(grad.reshape(grad.shape + (1,) * nb_dim), grad.shape + self.kernel_size)
+        return unpad(col2im(grad_cols, self.padded_shape, self.stride, (1,) * nb_dim), self.padding)
+
+
+class PoolNd(LayerBase):
+    """
+    Pooling over the last nb_dim dimensions of an input of shape (batch_size, channels, *size).
+    By default, the stride is equal to the kernel size
+    """
+
+    nb_dim = None
+    operator = None
+
+    def __init__(self, kernel_size, stride=None, padding=0):
+        super().__init__()
+        self.kernel_size = to_tuple(kernel_size, self.nb_dim)
+        self.stride = self.kernel_size if stride is None else to_tuple(stride, self.nb_dim)
+        self.padding = to_tuple(padding, self.nb_dim)
+        self.workspace = Workspace()
+
+    def forward(self, x):
+        assert len(x.shape) == self.nb_dim + 2, f"Input should have {self.nb_dim + 2} dimensions, but got {len(x.shape)}"
+        return self.operator(self.kernel_size, self.stride, self.padding, self.workspace)(x)
+
+    def get_parameters(self):
+        return flamb.to_tensor([])
+
+
+class MaxPool1d(PoolNd):
+    """1D max pooling, on inputs of shape (batch_size, channels, length)"""
+
+    nb_dim = 1
+    operator = MaxPoolOperator
+
+
+class MaxPool2d(PoolNd):
+    """2D max pooling, on inputs of shape (batch_size, channels, height, width)"""
+
+    nb_dim = 2
+    operator = MaxPoolOperator
+
+
+class AvgPool1d(PoolNd):
+    """1D average pooling, on inputs of shape (batch_size, channels, length)"""
+
+    nb_dim = 1
+    operator = AvgPoolOperator
+
+
+class AvgPool2d(PoolNd):
+    """2D average pooling, on inputs of shape (batch_size, channels, height, width)"""
+
+    nb_dim = 2
+    operator = AvgPoolOperator
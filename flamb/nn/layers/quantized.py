@@ -0,0 +1,61 @@
+import flamb
+import numpy as np
+from flamb import runtime
+from flamb.autograd.operators import TensorOperator, get_value
+from .base import LayerBase
+
+
+class QuantizedLinearOperator(TensorOperator):
+    """Forward of a QuantizedLinear layer, for inference only"""
+
+    def __init__(self, layer):
+        super().__init__()
+        self.layer = layer
+
+    def forward(self, x):
+        layer = self.layer
+        return runtime.quantized_linear(x, layer.compute_weights(), layer.weight_scales, layer.input_scale, layer.bias)
+
+    def backward(self, grad):
+        raise Exception("A QuantizedLinear layer cannot be trained")
+
+    def export(self):
+        layer = self.layer
+        return "quantized_linear", [layer.weights, layer.weight_scales, layer.input_scale, layer.bias]
+
+
+class QuantizedLinear(LayerBase):
+    """
+    Linear layer for inference, with int8 weights (symmetric, one scale per output channel) and an input quantized
+    to int8 with a scale calibrated beforehand (see flamb.nn.utils.quantize). The products are accumulated
+    as integers, then dequantized.
+    The weights are stored (and exported) as int8, and a float32 copy holding the same integers
+    is made for the matmul at the first forward
+    """
+
+    def __init__(self, linear, input_range):
+        super().__init__()
+        self.input_size = linear.input_size
+        self.output_size = linear.output_size
+        weights = get_value(linear.weights)
+        self.weight_scales = np.maximum(np.abs(weights).max(axis=0), 1e-12) / 127
+        self.weights = runtime.quantize(weights, self.weight_scales).astype(np.int8)
+        self.input_scale = np.array(max(input_range, 1e-12) / 127)
+        self.bias = np.array(get_value(linear.bias), dtype=np.float64)
+        self.float32_weights = None
+
+    def __call__(self, x):
+        assert (x.shape[-1] == self.input_size), f"Input size of x should be {self.input_size}, but got {x.shape[-1]}"
+        return QuantizedLinearOperator(self)(x)
+
+    def get_parameters(self):
+        return flamb.to_tensor([])
+
+    def compute_weights(self):
+        if self.float32_weights is None:
+            self.float32_weights = self.weights.astype(np.float32)
+        return self.float32_weights
+
+    def nbytes(self):
+        """Memory used by the int8 weights, the scales and the bias (without the float32 copy of the weights)"""
+        return self.weights.nbytes + self.weight_scales.nbytes + self.input_scale.nbytes + self.bias.nbytes
@@ -0,0 +1,246 @@
+import flamb
+import numpy as np
+from flamb.autograd.operators import TensorOperator
+from flamb.random import get_generator
+from flamb.tensor import from_values
+from .base import LayerBase
+from .utils import Workspace
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+class RecurrentOperator(TensorOperator):
+    """
+    Runs a recurrent cell over a whole sequence of shape (batch_size, seq_len, input_size).
+
+    The input projections of all the timesteps and all the gates are computed with a single matmul,
+    then each timestep does one matmul for all the gates of the hidden state.
+    The hidden states (and cell states), the gates and the gradients are stored in buffers of the workspace,
+    which are reused from one call to the next.
+
+    If bptt is not None, the sequence is split into windows of bptt timesteps,
+    and the gradient does not flow from one window to the previous one (truncated backpropagation through time).
+    """
+
+    mode = None
+    nb_gates = None
+
+    def __init__(self, bptt, workspace):
+        super().__init__()
+        self.bptt = bptt
+        self.workspace = workspace
+        self.buffers = {}
+
+    def buffer(self, name, shape):
+        buffer = self.workspace.get(name, shape)
+        self.buffers[name] = buffer
+        return buffer
+
+    def forward(self, x, h0, c0, weights_ih, weights_hh, bias_ih, bias_hh):
+        batch_size, seq_len, input_size = x.shape
+        hidden_size = weights_hh.shape[0]
+        self.x = x
+        self.weights_ih, self.weights_hh = weights_ih, weights_hh
+
+        # Input projections of all timesteps, in time-major order: (seq_len, batch_size, nb_gates * hidden_size)
+        projections = self.buffer("projections", (seq_len, batch_size, self.nb_gates * hidden_size))
+        np.matmul(x.transpose(1, 0, 2), weights_ih, out=projections)
+        projections += bias_ih
+
+        hidden = self.buffer("hidden", (seq_len + 1, batch_size, hidden_size))
+        hidden[0] = h0
+        gates = self.buffer("gates", (seq_len, batch_size, self.nb_gates * hidden_size))
+        cell = None
+        if self.mode == "LSTM":
+            cell = self.buffer("cell", (seq_len + 1, batch_size, hidden_size))
+            cell[0] = c0
+        elif self.mode == "GRU":
+            candidate = self.buffer("candidate", (seq_len, batch_size, hidden_size))
+
+        H = hidden_size
+        for t in range(seq_len):
+            recurrent = hidden[t] @ weights_hh
+            recurrent += bias_hh
+            gate = gates[t]
+            if self.mode == "RNN":
+                np.tanh(projections[t] + recurrent, out=gate)
+                hidden[t + 1] = gate
+
+            elif self.mode == "LSTM":
+                np.add(projections[t], recurrent, out=gate)
+                gate[:, : 2 * H] = sigmoid(gate[:, : 2 * H])
+                gate[:, 2 * H : 3 * H] = np.tanh(gate[:, 2 * H : 3 * H])
+                gate[:, 3 * H :] = sigmoid(gate[:, 3 * H :])
+                i, f, g, o = gate[:, :H], gate[:, H : 2 * H], gate[:, 2 * H : 3 * H], gate[:, 3 * H :]
+                cell[t + 1] = f * cell[t] + i * g
+                hidden[t + 1] = o * np.tanh(cell[t + 1])
+
+            elif self.mode == "GRU":
+                gate[:, : 2 * H] = sigmoid(projections[t, :, : 2 * H] + recurrent[:, : 2 * H])
+                r, z = gate[:, :H], gate[:, H : 2 * H]
+                candidate[t] = recurrent[:, 2 * H :]
+                gate[:, 2 * H :] = np.tanh(projections[t, :, 2 * H :] + r * candidate[t])
+                n = gate[:, 2 * H :]
+                hidden[t + 1] = (1 - z) * n + z * hidden[t]
+
+        output = hidden[1:].transpose(1, 0, 2).copy()
+        if self.mode == "LSTM":
+            return output, hidden[-1].copy(), cell[-1].copy()
+        return output, hidden[-1].copy()
+
+    def backward(self, grad_output, grad_hn, grad_cn=None):
+        seq_len, batch_size, hidden_size = self.buffers["hidden"][1:].shape
+        H = hidden_size
+        hidden = self.buffers["hidden"]
+        gates = self.buffers["gates"]
+        weights_hh = self.weights_hh
+
+        # Gradients with respect to the input projections and to the recurrent projections of each timestep
+        grad_projections = self.buffer("grad_projections", gates.shape)
+        grad_recurrent = grad_projections
+        if self.mode == "GRU":
+            grad_recurrent = self.buffer("grad_recurrent", gates.shape)
+
+        grad_hidden = grad_hn
+        grad_cell = grad_cn
+        for t in reversed(range(seq_len)):
+            grad_hidden = grad_hidden + grad_output[:, t]
+            gate = gates[t]
+            grad_gate = grad_projections[t]
+
+            if self.mode == "RNN":
+                np.multiply(grad_hidden, 1 - gate ** 2, out=grad_gate)
+                grad_previous = 0
+
+            elif self.mode == "LSTM":
+                cell = self.buffers["cell"]
+                i, f, g, o = gate[:, :H], gate[:, H : 2 * H], gate[:, 2 * H : 3 * H], gate[:, 3 * H :]
+                tanh_cell = np.tanh(cell[t + 1])
+                grad_cell = grad_cell + grad_hidden * o * (1 - tanh_cell ** 2)
+                grad_gate[:, :H] = grad_cell * g * i * (1 - i)
+                grad_gate[:, H : 2 * H] = grad_cell * cell[t] * f * (1 - f)
+                grad_gate[:, 2 * H : 3 * H] = grad_cell * i * (1 - g ** 2)
+                grad_gate[:, 3 * H :] = grad_hidden * tanh_cell * o * (1 - o)
+                grad_cell = grad_cell * f
+                grad_previous = 0
+
+            elif self.mode == "GRU":
+                r, z, n = gate[:, :H], gate[:, H : 2 * H], gate[:, 2 * H :]
+                grad_n = grad_hidden * (1 - z) * (1 - n ** 2)
+                grad_r = grad_n * self.buffers["candidate"][t] * r * (1 - r)
+                grad_z = grad_hidden * (hidden[t] - n) * z * (1 - z)
+                grad_gate[:, :H] = grad_r
+                grad_gate[:, H : 2 * H] = grad_z
+                grad_gate[:, 2 * H :] = grad_n
+                grad_recurrent[t, :, : 2 * H] = grad_gate[:, : 2 * H]
+                grad_recurrent[t, :, 2 * H :] = grad_n * r
+                grad_previous = grad_hidden * z
+
+            grad_hidden = grad_recurrent[t] @ weights_hh.T + grad_previous
+            if self.bptt is not None and t % self.bptt == 0 and t > 0:
+                # Truncation: the gradient does not go to the previous window
+                grad_hidden = np.zeros_like(grad_hidden)
+                if grad_cell is not None:
+                    grad_cell = np.zeros_like(grad_cell)
+
+        # The gradients of the weights are computed for all the timesteps with a single matmul
+        grad_projections_2d = grad_projections.reshape(seq_len * batch_size, -1)
+        grad_recurrent_2d = grad_recurrent.reshape(seq_len * batch_size, -1)
+        x = self.x.transpose(1, 0, 2).reshape(seq_len * batch_size, -1)
+        grad_x = (grad_projections_2d @ self.weights_ih.T).reshape(seq_len, batch_size, -1).transpose(1, 0, 2)
+        grad_weights_ih = x.T @ grad_projections_2d
+        grad_weights_hh = hidden[:-1].reshape(seq_len * batch_size, -1).T @ grad_recurrent_2d
+        grad_bias_ih = grad_projections_2d.sum(axis=0)
+        grad_bias_hh = grad_recurrent_2d.sum(axis=0)
+        return grad_x, grad_hidden, grad_cell, grad_weights_ih, grad_weights_hh, grad_bias_ih, grad_bias_hh
+
+    def release(self):
+        for name, buffer in self.buffers.items():
+            self.workspace.release(name, buffer)
+        self.buffers = {}
+
+
+class RNNOperator(RecurrentOperator):
+    mode = "RNN"
+    nb_gates = 1
+
+
+class LSTMOperator(RecurrentOperator):
+    mode = "LSTM"
+    nb_gates = 4
+
+
+class GRUOperator(RecurrentOperator):
+    mode = "GRU"
+    nb_gates = 3
+
+
+class RecurrentBase(LayerBase):
+    """
+    Recurrent layer working on inputs of shape (batch_size, seq_len, input_size).
+    The weights of all the gates are stored side by side: weights_ih has shape (input_size, nb_gates * hidden_size)
+    and weights_hh has shape (hidden_size, nb_gates * hidden_size).
+
+    bptt (int or None) : size of the windows of the truncated backpropagation through time (None for full backpropagation)
+    generator (flamb.Generator or None) : generator of the initial weights (the default generator if None)
+    """
+
+    operator = None
+
+    def __init__(self, input_size, hidden_size, bptt=None, generator=None):
+        super().__init__()
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.bptt = bptt
+        size = self.operator.nb_gates * hidden_size
+        bound = 1 / hidden_size ** (1 / 2)
+        generator = get_generator(generator)
+        self.weights_ih = from_values(generator.uniform(-bound, bound, (input_size, size)), requires_grad=True)
+        self.weights_hh = from_values(generator.uniform(-bound, bound, (hidden_size, size)), requires_grad=True)
+        self.bias_ih = from_values(generator.uniform(-bound, bound, (size,)), requires_grad=True)
+        self.bias_hh = from_values(generator.uniform(-bound, bound, (size,)), requires_grad=True)
+        self.workspace = Workspace()
+
+    def run(self, x, h0, c0):
+        assert len(x.shape) == 3, f"Input should have shape (batch_size, seq_len, input_size), but got {x.shape}"
+        assert (x.shape[-1] == self.input_size), f"Input size of x should be {self.input_size}, but got {x.shape[-1]}"
+        if h0 is None:
+            h0 = np.zeros((x.shape[0], self.hidden_size))
+        operator = self.operator(self.bptt, self.workspace)
+        return operator(x, h0, c0, self.weights_ih, self.weights_hh, self.bias_ih, self.bias_hh)
+
+    def forward(self, x, h0=None):
+        """Returns the output of shape (batch_size, seq_len, hidden_size) and the last hidden state"""
+        return self.run(x, h0, np.zeros(()))
+
+    def get_parameters(self):
+        parameters = flamb.concatenate(self.weights_ih.flatten(), self.weights_hh.flatten())
+        return flamb.concatenate(parameters, flamb.concatenate(self.bias_ih, self.bias_hh))
+
+
+class RNN(RecurrentBase):
+    """Elman RNN: h_t = tanh(x_t W_ih + b_ih + h_(t-1) W_hh + b_hh)"""
+
+    operator = RNNOperator
+
+
+class GRU(RecurrentBase):
+    """Gated recurrent unit, the gates are ordered as (reset, update, new)"""
+
+    operator = GRUOperator
+
+
+class LSTM(RecurrentBase):
+    """Long short-term memory, the gates are ordered as (input, forget, cell, output)"""
+
+    operator = LSTMOperator
+
+    def forward(self, x, state=None):
+        """Returns the output of shape (batch_size, seq_len, hidden_size) and the last state (h_n, c_n)"""
+        h0, c0 = (None, None) if state is None else state
+        if c0 is None:
+            c0 = np.zeros((x.shape[0], self.hidden_size))
+        output, h_n, c_n = self.run(x, h0, c0)
+        return output, (h_n, c_n)
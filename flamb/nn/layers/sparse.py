@@ -0,0 +1,74 @@
+import flamb
+import numpy as np
+from flamb import runtime
+from flamb.autograd.operators import TensorOperator, get_value
+from .base import LayerBase
+
+
+class SparseLinearOperator(TensorOperator):
+    """Forward of a SparseLinear layer, for inference only"""
+
+    def __init__(self, layer):
+        super().__init__()
+        self.layer = layer
+
+    def forward(self, x):
+        kernel, _ = runtime.KERNELS[self.layer.format + "_linear"]
+        return kernel(x, *self.layer.constants())
+
+    def backward(self, grad):
+        raise Exception("A SparseLinear layer cannot be trained")
+
+    def export(self):
+        return self.layer.format + "_linear", self.layer.constants()
+
+
+class SparseLinear(LayerBase):
+    """
+    Linear layer for inference, storing only the nonzero weights of a pruned Linear layer (see flamb.nn.utils.prune).
+    The inputs and outputs whose weights are all zero (structured pruning) are removed first. The remaining weights
+    are stored in the CSR format (format "csr") if their density is at most max_csr_density, otherwise as a smaller
+    dense matrix (format "compact"). The CSR products are computed without BLAS: they are faster than a dense matmul
+    for a few samples at a time (up to about 10% of weights left for a single sample, see the "sparse_linear"
+    benchmarks), while batches of many samples go through a dense matmul (see flamb.runtime.csr_linear)
+    """
+
+    def __init__(self, linear, max_csr_density=0.1):
+        super().__init__()
+        self.input_size = linear.input_size
+        self.output_size = linear.output_size
+        weights = get_value(linear.weights)
+        self.bias = np.array(get_value(linear.bias), dtype=np.float64)
+        self.nnz = np.count_nonzero(weights)
+        self.input_indices = np.flatnonzero(weights.any(axis=1))
+        self.output_indices = np.flatnonzero(weights.any(axis=0))
+        compact_size = len(self.input_indices) * len(self.output_indices)
+        if self.nnz <= max_csr_density * compact_size:
+            self.format = "csr"
+            transposed = weights.T
+            self.indptr = np.concatenate([[0], np.cumsum(np.count_nonzero(transposed, axis=1))])
+            self.indices = np.nonzero(transposed)[1]
+            self.data = transposed[transposed != 0]
+        else:
+            self.format = "compact"
+            self.weights = np.ascontiguousarray(weights[np.ix_(self.input_indices, self.output_indices)])
+
+    def __call__(self, x):
+        assert (x.shape[-1] == self.input_size), f"Input size of x should be {self.input_size}, but got {x.shape[-1]}"
+        return SparseLinearOperator(self)(x)
+
+    def constants(self):
+        """Arrays given to the kernel after the input"""
+        if self.format == "csr":
+            return [self.data, self.indices, self.indptr, self.bias]
+        return [self.weights, self.input_indices, self.output_indices, self.bias]
+
+    def get_parameters(self):
+        return flamb.to_tensor([])
+
+    def density(self):
+        """Fraction of the weights which are not zero"""
+        return self.nnz / (self.input_size * self.output_size)
+
+    def nbytes(self):
+        return sum(array.nbytes for array in self.constants())
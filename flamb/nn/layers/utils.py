@@ -0,0 +1,127 @@
+"""
+This file contains functions shared by the layers working on whole tensors (convolutions, poolings...)
+"""
+
+import itertools
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+def to_tuple(value, nb_dim):
+    """Converts an int (or a tuple) to a tuple of size nb_dim"""
+    if isinstance(value, int):
+        return (value,) * nb_dim
+    value = tuple(value)
+    assert len(value) == nb_dim, f"Expected {nb_dim} values but got {len(value)}"
+    return value
+
+
+def output_size(size, kernel_size, stride, padding, dilation):
+    """Computes the size of the output of a sliding window operation (like a convolution) along each dimension"""
+    return tuple(
+        (s + 2 * p - d * (k - 1) - 1) // st + 1
+        for s, k, st, p, d in zip(size, kernel_size, stride, padding, dilation)
+    )
+
+
+class Workspace:
+    """
+    Pool of numpy buffers reused between the calls of a layer, so that the large intermediate arrays
+    (padded inputs, columns of im2col...) are not allocated at each call.
+    A buffer is taken with `get` and given back with `release` once it is not used anymore.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+
+    def get(self, name, shape, fill_value=0):
+        """
+        Returns a buffer of the given shape. A new buffer is filled with fill_value,
+        a reused buffer contains the values written by its previous user
+        """
+        buffers = self.buffers.get((name, shape))
+        if buffers:
+            return buffers.pop()
+        return np.full(shape, fill_value, dtype=np.float64)
+
+    def release(self, name, buffer):
+        self.buffers.setdefault((name, buffer.shape), []).append(buffer)
+
+
+def pad(x, padding, workspace, fill_value=0):
+    """
+    Pads the spatial dimensions of x (the dimensions after the first two) with fill_value.
+    The padded array comes from the workspace (under the name "padded"): since only its center is written,
+    its borders keep the fill value it was created with. Without padding, x is returned
+    """
+    if not any(padding):
+        return x
+    shape = x.shape[:2] + tuple(s + 2 * p for s, p in zip(x.shape[2:], padding))
+    padded = workspace.get("padded", shape, fill_value)
+    center = (slice(None), slice(None)) + tuple(slice(p, p + s) for s, p in zip(x.shape[2:], padding))
+    padded[center] = x
+    return padded
+
+
+def unpad(x, padding):
+    """Removes the padding added by `pad`"""
+    center = (slice(None), slice(None)) + tuple(slice(p, s - p) for s, p in zip(x.shape[2:], padding))
+    return x[center]
+
+
+def sliding_windows(x, kernel_size, stride, dilation):
+    """
+    Returns a view (no copy is made) of shape (B, C, *out_size, *kernel_size) on x, of shape (B, C, *size),
+    containing the windows seen by a kernel sliding on the spatial dimensions of x
+    """
+    out_size = output_size(x.shape[2:], kernel_size, stride, (0,) * len(kernel_size), dilation)
+    spatial_strides = x.strides[2:]
+    shape = x.shape[:2] + out_size + tuple(kernel_size)
+    strides = (
+        x.strides[:2]
+        + tuple(s * st for s, st in zip(spatial_strides, stride))
+        + tuple(s * d for s, d in zip(spatial_strides, dilation))
+    )
+    return as_strided(x, shape=shape, strides=strides, writeable=False)
+
+
+def col2im(cols, shape, stride, dilation):
+    """
+    Inverse of `sliding_windows`: sums the values of cols, of shape (B, C, *out_size, *kernel_size),
+    at the positions of x (of the given shape) they were read from.
+    There is one vectorized addition per kernel position
+    """
+    nb_dim = len(shape) - 2
+    out_size = cols.shape[2 : 2 + nb_dim]
+    kernel_size = cols.shape[2 + nb_dim :]
+    x = np.zeros(shape)
+    for kernel_index in itertools.product(*[range(k) for k in kernel_size]):
+        window = (slice(None), slice(None)) + tuple(
+            slice(k * d, k * d + st * (o - 1) + 1, st)
+            for k, d, st, o in zip(kernel_index, dilation, stride, out_size)
+        )
+        x[window] += cols[(Ellipsis,) + kernel_index]
+    return x
+
+
+def mean_var(x, axis, chunk_size=256):
+    """
+    Computes the mean and the (biased) variance of x along axis in a single pass over x, with the parallel
+    version of Welford's algorithm: x is read by chunks small enough to stay in cache, and the statistics
+    of each chunk are merged with the statistics of the previous ones. The dimension of axis is kept
+    """
+    x = np.moveaxis(x, axis, 0)
+    count = 0
+    mean = np.zeros((1,) + x.shape[1:])
+    m2 = np.zeros((1,) + x.shape[1:])
+    for start in range(0, x.shape[0], chunk_size):
+        chunk = x[start : start + chunk_size]
+        chunk_count = chunk.shape[0]
+        chunk_mean = chunk.mean(axis=0, keepdims=True)
+        chunk_m2 = ((chunk - chunk_mean) ** 2).sum(axis=0, keepdims=True)
+        delta = chunk_mean - mean
+        total = count + chunk_count
+        mean += delta * (chunk_count / total)
+        m2 += chunk_m2 + delta ** 2 * (count * chunk_count / total)
+        count = total
+    return np.moveaxis(mean, 0, axis), np.moveaxis(m2 / count, 0, axis)
@@ -1,9 +1,14 @@
 import flamb
+from .hooks import Hookable
 from .layers.base import LayerBase
 
-class Module:
+class Module(Hookable):
+    # Modules behave differently during training and evaluation, see train and eval
+    training = True
+
     def __init__(self):
         self.parameters = None
+        self.training = True
 
     def initialize_parameters(self):
         self.parameters = flamb.to_tensor([])
@@ -11,5 +16,33 @@ class Module:
             if isinstance(param, LayerBase):
                 self.parameters = flamb.concatenate(self.parameters, param.get_parameters())
 
+    def named_layers(self, prefix=""):
+        """Yields the (name, layer) pairs of the layers of the module and, recursively, of its submodules"""
+        for name, attribute in self.__dict__.items():
+            if isinstance(attribute, LayerBase):
+                yield prefix + name, attribute
+            elif isinstance(attribute, Module):
+                yield from attribute.named_layers(prefix + name + ".")
+
+    def set_layer(self, name, layer):
+        """Replaces the layer called name (as given by named_layers) with layer"""
+        module = self
+        *path, name = name.split(".")
+        for attribute in path:
+            module = getattr(module, attribute)
+        setattr(module, name, layer)
+
+    def train(self, mode=True):
+        """Sets the module, and recursively its layers and submodules, in training mode (or in evaluation mode if mode=False)"""
+        self.training = mode
+        for attribute in self.__dict__.values():
+            if isinstance(attribute, (LayerBase, Module)):
+                attribute.train(mode)
+        return self
+
+    def eval(self):
+        """Sets the module, and recursively its layers and submodules, in evaluation mode"""
+        return self.train(False)
+
     def __call__(self, x):
         raise Exception("You need to implement the __call__ method")
@@ -0,0 +1,29 @@
+import numpy as np
+from .base import Optimizer
+
+class Adagrad(Optimizer):
+    """
+    Adagrad algorithm: the gradient is divided by the square root of the sum of its past squares
+    """
+    state_names = ("square_sum",)
+    hyperparameters = ("learning_rate", "eps", "weight_decay")
+
+    def __init__(self, params, learning_rate=1e-2, eps=1e-10, weight_decay=0):
+        super().__init__(params)
+        self.learning_rate = learning_rate
+        self.eps = eps
+        self.weight_decay = weight_decay
+
+    def update(self, values, grads, state):
+        if self.weight_decay:
+            grads = grads + self.weight_decay * values
+        square_sum = state["square_sum"]
+        temp = self.scratch(values)
+        np.multiply(grads, grads, out=temp)
+        square_sum += temp
+
+        np.sqrt(square_sum, out=temp)
+        temp += self.eps
+        np.divide(grads, temp, out=temp)
+        temp *= self.learning_rate
+        values -= temp
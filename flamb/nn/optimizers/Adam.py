@@ -1,25 +1,44 @@
-import flamb
+import numpy as np
 from .base import Optimizer
 
 class Adam(Optimizer):
     """
-    Adam algorithm
+    Adam algorithm, with a first and a second momentum for each parameter and bias correction.
+    weight_decay adds an L2 penalty to the gradient (see AdamW for decoupled weight decay)
     """
-    def __init__(self, params, learning_rate=1e-3, beta1=0.9, beta2=0.999, eps=1e-7):
-        self.params = params
-        self.nb_params = len(self.params)
+    state_names = ("first_momentum", "second_momentum")
+    hyperparameters = ("learning_rate", "beta1", "beta2", "eps", "weight_decay")
+    decoupled_weight_decay = False
+
+    def __init__(self, params, learning_rate=1e-3, beta1=0.9, beta2=0.999, eps=1e-7, weight_decay=0):
+        super().__init__(params)
         self.learning_rate = learning_rate
         self.beta1 = beta1
         self.beta2 = beta2
         self.eps = eps
-        self.first_momentum = flamb.zeros((self.nb_params,))
-        self.second_momentum = 0
+        self.weight_decay = weight_decay
+
+    def update(self, values, grads, state):
+        first_momentum, second_momentum = state["first_momentum"], state["second_momentum"]
+        if self.weight_decay and self.decoupled_weight_decay:
+            values *= 1 - self.learning_rate * self.weight_decay
+        elif self.weight_decay:
+            grads = grads + self.weight_decay * values
+
+        temp = self.scratch(values)
+        np.multiply(grads, 1 - self.beta1, out=temp)
+        first_momentum *= self.beta1
+        first_momentum += temp
+
+        np.multiply(grads, grads, out=temp)
+        temp *= 1 - self.beta2
+        second_momentum *= self.beta2
+        second_momentum += temp
 
-    def step(self):
-        with flamb.no_grad():
-            grads = flamb.to_tensor([param.grad for param in self.params])
-            self.first_momentum = self.beta1 * self.first_momentum + (1 - self.beta1) * grads
-            self.second_momentum = self.beta2 * self.second_momentum + (1 - self.beta2) * (grads.norm()**2)
-            for i in range(self.nb_params):
-                self.params[i] -= self.learning_rate * self.first_momentum[i] / (self.second_momentum**(1/2) + self.eps)
-                self.params[i].reset_state(requires_grad=True)
\ No newline at end of file
+        # values -= lr * m_hat / (sqrt(v_hat) + eps), with m_hat = m / (1 - beta1^t) and v_hat = v / (1 - beta2^t)
+        np.sqrt(second_momentum, out=temp)
+        temp /= (1 - self.beta2 ** self.step_count) ** (1/2)
+        temp += self.eps
+        np.divide(first_momentum, temp, out=temp)
+        temp *= self.learning_rate / (1 - self.beta1 ** self.step_count)
+        values -= temp
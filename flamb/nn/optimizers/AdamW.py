@@ -0,0 +1,11 @@
+from .Adam import Adam
+
+class AdamW(Adam):
+    """
+    Adam algorithm with decoupled weight decay: the values are multiplied by (1 - learning_rate * weight_decay)
+    at each step, instead of adding an L2 penalty to the gradient
+    """
+    decoupled_weight_decay = True
+
+    def __init__(self, params, learning_rate=1e-3, beta1=0.9, beta2=0.999, eps=1e-7, weight_decay=1e-2):
+        super().__init__(params, learning_rate=learning_rate, beta1=beta1, beta2=beta2, eps=eps, weight_decay=weight_decay)
@@ -0,0 +1,38 @@
+import numpy as np
+from .base import Optimizer
+
+class RMSprop(Optimizer):
+    """
+    RMSprop algorithm: the gradient is divided by a moving average of its square, with optional momentum
+    """
+    hyperparameters = ("learning_rate", "alpha", "eps", "momentum", "weight_decay")
+
+    def __init__(self, params, learning_rate=1e-2, alpha=0.99, eps=1e-8, momentum=0, weight_decay=0):
+        self.state_names = ("square_average", "momentum_buffer") if momentum else ("square_average",)
+        super().__init__(params)
+        self.learning_rate = learning_rate
+        self.alpha = alpha
+        self.eps = eps
+        self.momentum = momentum
+        self.weight_decay = weight_decay
+
+    def update(self, values, grads, state):
+        if self.weight_decay:
+            grads = grads + self.weight_decay * values
+        square_average = state["square_average"]
+        temp = self.scratch(values)
+        np.multiply(grads, grads, out=temp)
+        temp *= 1 - self.alpha
+        square_average *= self.alpha
+        square_average += temp
+
+        np.sqrt(square_average, out=temp)
+        temp += self.eps
+        np.divide(grads, temp, out=temp)
+        if self.momentum:
+            buffer = state["momentum_buffer"]
+            buffer *= self.momentum
+            buffer += temp
+            np.copyto(temp, buffer)
+        temp *= self.learning_rate
+        values -= temp
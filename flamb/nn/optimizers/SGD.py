@@ -1,17 +1,34 @@
-import flamb
+import numpy as np
 from .base import Optimizer
 
 class SGD(Optimizer):
     """
-    Performs the Stochastic Gradient Descent algorithm
+    Performs the Stochastic Gradient Descent algorithm, with optional momentum (classical or Nesterov)
+    and L2 weight decay
     """
-    def __init__(self, params, learning_rate=1e-3):
-        self.params = params
-        self.nb_params = len(self.params)
+    hyperparameters = ("learning_rate", "momentum", "nesterov", "weight_decay")
+
+    def __init__(self, params, learning_rate=1e-3, momentum=0, nesterov=False, weight_decay=0):
+        assert not nesterov or momentum > 0, "Nesterov momentum requires a momentum"
+        self.momentum = momentum
+        self.state_names = ("momentum_buffer",) if momentum else ()
+        super().__init__(params)
         self.learning_rate = learning_rate
+        self.nesterov = nesterov
+        self.weight_decay = weight_decay
 
-    def step(self):
-        with flamb.no_grad():
-            for i in range(self.nb_params):
-                self.params[i] -= self.learning_rate*self.params[i].grad
-                self.params[i].reset_state(requires_grad=True)
\ No newline at end of file
+    def update(self, values, grads, state):
+        direction = self.scratch(values)
+        np.copyto(direction, grads)
+        if self.weight_decay:
+            direction += self.weight_decay * values
+        if self.momentum:
+            buffer = state["momentum_buffer"]
+            buffer *= self.momentum
+            buffer += direction
+            if self.nesterov:
+                direction += self.momentum * buffer
+            else:
+                np.copyto(direction, buffer)
+        direction *= self.learning_rate
+        values -= direction
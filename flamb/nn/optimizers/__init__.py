@@ -1,4 +1,8 @@
 from .SGD import SGD
 from .Adam import Adam
+from .AdamW import AdamW
+from .RMSprop import RMSprop
+from .Adagrad import Adagrad
+from . import schedulers
 
-__all__ = ['SGD', 'Adam']
\ No newline at end of file
+__all__ = ['SGD', 'Adam', 'AdamW', 'RMSprop', 'Adagrad']
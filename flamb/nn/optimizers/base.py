@@ -1,6 +1,132 @@
+import numpy as np
+from flamb.autograd import FlatParameters, SparseGrad
+from flamb.autograd.operators import flat_slice
+
 class Optimizer:
+    """
+    The parameters (a tensor of Variables and Parameters) are stored once in a FlatParameters,
+    so that each step is made of a few inplace numpy operations on its flat arrays
+    self.storage.values and self.storage.grads. The gradients are set to 0 after each step.
+
+    Subclasses list in state_names the arrays they keep for each parameter (momentums...), which are
+    preallocated with the size of the flat arrays, and implement update(values, grads, state).
+    The same update is applied to the rows of the sparse parameters having a gradient (lazy update).
+
+    Schedulers (see flamb.nn.optimizers.schedulers) attached to the optimizer set its hyperparameters
+    at the beginning of each step.
+
+    The weights removed by pruning (see add_mask) are set back to 0 after each step
+    """
+    state_names = ()
+    hyperparameters = ("learning_rate",)
+
     def __init__(self, params):
         self.params = params
+        self.nb_params = len(self.params)
+        self.storage = FlatParameters(params)
+        self.step_count = 0
+        self.schedulers = []
+        # Positions, in the flat arrays, of the pruned weights
+        self.pruned = np.zeros(0, dtype=np.int64)
+        self.state = {name: np.zeros(len(self.storage)) for name in self.state_names}
+        self.sparse_state = [
+            {name: np.zeros(param.shape) for name in self.state_names} for param in self.storage.sparse_parameters
+        ]
+        # Preallocated array for the intermediate results of the steps
+        self.buffer = np.zeros(len(self.storage))
+
+        # The layers pruned before the optimizer is created keep their pruned weights at 0
+        from flamb.nn.utils.pruning import add_masks
+        add_masks(self)
+
+    def update(self, values, grads, state):
+        """Updates values (and the arrays of state) inplace, given the gradients grads"""
+        raise Exception("You need to implement the update method")
+
+    def step(self, zero_grad=True, chunk=None):
+        """
+        Updates the parameters with their gradients, which are then set to 0 unless zero_grad is False.
+        If chunk (a slice of the flat arrays) is given, only the dense parameters in chunk are updated, and the
+        gradients are kept (data-parallel workers each update their own chunk, see flamb.parallel.DataParallel)
+        """
+        for scheduler in self.schedulers:
+            scheduler.apply(self.step_count)
+        self.step_count += 1
+        if chunk is not None:
+            state = {name: array[chunk] for name, array in self.state.items()}
+            self.update(self.storage.values[chunk], self.storage.grads[chunk], state)
+            pruned = self.pruned[(self.pruned >= chunk.start) & (self.pruned < chunk.stop)]
+            self.storage.values[pruned] = 0
+            return
+        self.update(self.storage.values, self.storage.grads, self.state)
+        self.storage.values[self.pruned] = 0
+
+        for param, grad, state in self.sparse_grads():
+            rows = grad.indices
+            values = param.data[rows]
+            row_state = {name: array[rows] for name, array in state.items()}
+            self.update(values, grad.values, row_state)
+            param.data[rows] = values
+            for name, array in state.items():
+                array[rows] = row_state[name]
+        if zero_grad:
+            self.zero_grad()
+
+    def add_mask(self, tensor, mask):
+        """
+        Keeps the elements of tensor (a tensor of parameters of the optimizer, such as the weights of a layer)
+        where mask (a boolean array of the same shape) is False at 0 after each step
+        """
+        stored = flat_slice(tensor)
+        assert stored is not None and stored[0] is self.storage, "The tensor should be a parameter of the optimizer"
+        positions = stored[1].start + np.flatnonzero(~np.asarray(mask, dtype=bool))
+        self.pruned = np.union1d(self.pruned, positions)
+        self.storage.values[positions] = 0
+
+    def zero_grad(self):
+        """Sets the gradients of all the parameters to 0"""
+        self.storage.zero_grad()
+
+    def scratch(self, values):
+        """Returns an array with the shape of values, in which intermediate results can be written"""
+        if values.ndim == 1 and values.size <= self.buffer.size:
+            return self.buffer[:values.size]
+        return np.empty_like(values)
+
+    def sparse_grads(self):
+        """Yields the sparse parameters having a gradient, with their coalesced gradient and their state"""
+        for param, state in zip(self.storage.sparse_parameters, self.sparse_state):
+            if isinstance(param.grad, SparseGrad):
+                yield param, param.grad.coalesce(), state
+            elif param.grad is not None:
+                yield param, SparseGrad(np.arange(param.shape[0]), param.grad), state
+
+    def state_dict(self):
+        """Returns the state of the optimizer (hyperparameters, number of steps and arrays), which can be pickled"""
+        return {
+            "hyperparameters": {name: getattr(self, name) for name in self.hyperparameters},
+            "step_count": self.step_count,
+            "state": {name: array.copy() for name, array in self.state.items()},
+            "sparse_state": [{name: array.copy() for name, array in state.items()} for state in self.sparse_state],
+            "schedulers": [scheduler.state_dict() for scheduler in self.schedulers],
+            "pruned": self.pruned.copy(),
+        }
 
-    def step(self):
-        raise Exception("You need to implement the step method")
\ No newline at end of file
+    def load_state_dict(self, state_dict):
+        """
+        Restores a state returned by state_dict, for an optimizer built on the same parameters
+        (and to which the same schedulers are attached). The state arrays which the optimizer does not have
+        (the momentum buffer of an SGD built without momentum, for instance) are created
+        """
+        for name, value in state_dict["hyperparameters"].items():
+            setattr(self, name, value)
+        self.step_count = state_dict["step_count"]
+        for name, array in state_dict["state"].items():
+            self.state.setdefault(name, np.zeros(len(self.storage)))[...] = array
+        for state, param, saved in zip(self.sparse_state, self.storage.sparse_parameters, state_dict["sparse_state"]):
+            for name, array in saved.items():
+                state.setdefault(name, np.zeros(param.shape))[...] = array
+        for scheduler, saved in zip(self.schedulers, state_dict.get("schedulers", [])):
+            scheduler.load_state_dict(saved)
+        self.pruned = np.array(state_dict.get("pruned", []), dtype=np.int64)
+        self.storage.values[self.pruned] = 0
@@ -0,0 +1,16 @@
+import numpy as np
+from .base import Scheduler
+
+class CosineAnnealingLR(Scheduler):
+    """Decreases the hyperparameter from its base value to min_value along a half cosine, in total_steps steps"""
+    state_names = ("base_value", "total_steps", "min_value")
+
+    def __init__(self, optimizer, total_steps, min_value=0, hyperparameter="learning_rate"):
+        super().__init__(optimizer, hyperparameter)
+        self.total_steps = total_steps
+        self.min_value = min_value
+        self.attach()
+
+    def value(self, step):
+        progress = np.minimum(step, self.total_steps) / self.total_steps
+        return self.min_value + (self.base_value - self.min_value) * (1 + np.cos(np.pi * progress)) / 2
@@ -0,0 +1,43 @@
+import numpy as np
+from .base import Scheduler
+
+class LinearWarmupLR(Scheduler):
+    """
+    Increases the hyperparameter linearly from base_value / warmup_steps to base_value during warmup_steps steps
+(none if warmup_steps is 0).
+    Then, the hyperparameter is given by scheduler (whose steps start after the warmup) if it is not None,
+    otherwise it keeps its base value.
+    scheduler must be built on the same optimizer and hyperparameter, it is detached from the optimizer
+    """
+    state_names = ("base_value", "warmup_steps")
+
+    def __init__(self, optimizer, warmup_steps, scheduler=None, hyperparameter="learning_rate"):
+        assert warmup_steps >= 0, f"warmup_steps should be at least 0, but got {warmup_steps}"
+        super().__init__(optimizer, hyperparameter)
+        self.warmup_steps = warmup_steps
+        self.scheduler = scheduler
+        if scheduler is not None:
+            assert scheduler.optimizer is optimizer and scheduler.hyperparameter == hyperparameter, \
+                "The scheduler used after the warmup must be built on the same optimizer and hyperparameter"
+            scheduler.detach()
+            self.base_value = scheduler.base_value
+        self.attach()
+
+    def value(self, step):
+        warmup_steps = max(self.warmup_steps, 1)
+        warmup = self.base_value * np.minimum(step + 1, warmup_steps) / warmup_steps
+        if self.scheduler is None:
+            return warmup
+        return np.where(step < self.warmup_steps, warmup, self.scheduler.value(np.maximum(step - self.warmup_steps, 0)))
+
+    def state_dict(self):
+        state_dict = super().state_dict()
+        if self.scheduler is not None:
+            state_dict["scheduler"] = self.scheduler.state_dict()
+        return state_dict
+
+    def load_state_dict(self, state_dict):
+        state_dict = dict(state_dict)
+        if "scheduler" in state_dict:
+            self.scheduler.load_state_dict(state_dict.pop("scheduler"))
+        super().load_state_dict(state_dict)
@@ -0,0 +1,51 @@
+import numpy as np
+from .base import Scheduler
+
+class OneCycleLR(Scheduler):
+    """
+    One-cycle policy: the hyperparameter increases from base_value / div_factor to base_value during the first
+    pct_start * total_steps steps (at least 1), then decreases to base_value / (div_factor * final_div_factor), along cosines.
+
+    If momentum is a pair (base_momentum, max_momentum), the momentum of the optimizer (momentum, or beta1 for Adam)
+    follows the opposite cycle, from max_momentum to base_momentum and back to max_momentum
+    """
+    state_names = ("base_value", "total_steps", "pct_start", "div_factor", "final_div_factor", "momentum")
+
+    def __init__(self, optimizer, total_steps, pct_start=0.3, div_factor=25., final_div_factor=1e4,
+                 momentum=None, hyperparameter="learning_rate"):
+        assert total_steps >= 1, f"total_steps should be at least 1, but got {total_steps}"
+        assert 0 <= pct_start <= 1, f"pct_start should be in [0, 1], but got {pct_start}"
+        super().__init__(optimizer, hyperparameter)
+        self.total_steps = total_steps
+        self.pct_start = pct_start
+        self.div_factor = div_factor
+        self.final_div_factor = final_div_factor
+        self.momentum = momentum
+        if momentum is not None:
+            names = [name for name in ("momentum", "beta1") if name in optimizer.hyperparameters]
+            assert names and getattr(optimizer, names[0]), "Cycling the momentum requires an optimizer with a momentum"
+            self.momentum_name = names[0]
+        self.attach()
+
+    def cycle(self, step, start, peak, end):
+        """Goes from start to peak, then from peak to end, along cosines"""
+        # The warm-up and the annealing last at least one step, so that they do not divide by 0
+        peak_step = max(self.pct_start * self.total_steps, 1)
+        step = np.minimum(step, self.total_steps)
+        rising = np.minimum(step / peak_step, 1)
+        falling = np.maximum(step - peak_step, 0) / max(self.total_steps - peak_step, 1)
+        value = peak + (start - peak) * (1 + np.cos(np.pi * rising)) / 2
+        return np.where(step <= peak_step, value, end + (peak - end) * (1 + np.cos(np.pi * falling)) / 2)
+
+    def value(self, step):
+        initial_value = self.base_value / self.div_factor
+        return self.cycle(step, initial_value, self.base_value, initial_value / self.final_div_factor)
+
+    def momentum_value(self, step):
+        base_momentum, max_momentum = self.momentum
+        return self.cycle(step, max_momentum, base_momentum, max_momentum)
+
+    def apply(self, step):
+        super().apply(step)
+        if self.momentum is not None:
+            setattr(self.optimizer, self.momentum_name, float(self.momentum_value(step)))
@@ -0,0 +1,44 @@
+import math
+from .base import Scheduler
+
+class ReduceLROnPlateau(Scheduler):
+    """
+    Multiplies the hyperparameter by factor (without going below min_value) when the metric given to report
+    has not improved by more than threshold (relatively) for patience reports.
+    mode is "min" if the metric should decrease (a loss), "max" if it should increase (an accuracy)
+    """
+    state_names = ("base_value", "scale", "best", "nb_bad_reports")
+
+    def __init__(self, optimizer, factor=0.1, patience=10, mode="min", threshold=1e-4, min_value=0,
+                 hyperparameter="learning_rate"):
+        assert mode in ("min", "max"), f"mode should be min or max, not {mode}"
+        super().__init__(optimizer, hyperparameter)
+        self.factor = factor
+        self.patience = patience
+        self.mode = mode
+        self.threshold = threshold
+        self.min_value = min_value
+        self.scale = 1.
+        self.best = math.inf if mode == "min" else -math.inf
+        self.nb_bad_reports = 0
+        self.attach()
+
+    def value(self, step):
+        return max(self.base_value * self.scale, self.min_value)
+
+    def report(self, metric):
+        """Takes into account a new value of the metric (typically once per epoch)"""
+        if self.mode == "min":
+            improved = metric < self.best * (1 - math.copysign(self.threshold, self.best))
+        else:
+            improved = metric > self.best * (1 + math.copysign(self.threshold, self.best))
+        if improved:
+            self.best = metric
+            self.nb_bad_reports = 0
+            return
+
+        self.nb_bad_reports += 1
+        if self.nb_bad_reports > self.patience:
+            self.scale *= self.factor
+            self.nb_bad_reports = 0
+            self.apply(self.optimizer.step_count)
@@ -0,0 +1,14 @@
+from .base import Scheduler
+
+class StepLR(Scheduler):
+    """Multiplies the hyperparameter by gamma every step_size steps"""
+    state_names = ("base_value", "step_size", "gamma")
+
+    def __init__(self, optimizer, step_size, gamma=0.1, hyperparameter="learning_rate"):
+        super().__init__(optimizer, hyperparameter)
+        self.step_size = step_size
+        self.gamma = gamma
+        self.attach()
+
+    def value(self, step):
+        return self.base_value * self.gamma ** (step // self.step_size)
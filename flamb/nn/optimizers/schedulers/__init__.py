@@ -0,0 +1,8 @@
+from .base import Scheduler
+from .StepLR import StepLR
+from .CosineAnnealingLR import CosineAnnealingLR
+from .LinearWarmupLR import LinearWarmupLR
+from .OneCycleLR import OneCycleLR
+from .ReduceLROnPlateau import ReduceLROnPlateau
+
+__all__ = ['Scheduler', 'StepLR', 'CosineAnnealingLR', 'LinearWarmupLR', 'OneCycleLR', 'ReduceLROnPlateau']
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+class Scheduler:
+    """
+    Sets a hyperparameter of an optimizer (its learning rate by default) at the beginning of each optimizer step.
+    The scheduler is attached to the optimizer when it is created, and the hyperparameter given to the optimizer
+    is used as base_value.
+
+    Subclasses implement value(step), which returns the value of the hyperparameter at a given step in O(1).
+    It only uses numpy operations, so that it also accepts an array of steps (see schedule).
+    They list in state_names the attributes that are saved in the state_dict of the optimizer
+    """
+    state_names = ("base_value",)
+
+    def __init__(self, optimizer, hyperparameter="learning_rate"):
+        assert hyperparameter in optimizer.hyperparameters, f"The optimizer has no hyperparameter {hyperparameter}"
+        self.optimizer = optimizer
+        self.hyperparameter = hyperparameter
+        self.base_value = getattr(optimizer, hyperparameter)
+
+    def attach(self):
+        """Attaches the scheduler to its optimizer, and sets the hyperparameter for the next step"""
+        self.optimizer.schedulers.append(self)
+        self.apply(self.optimizer.step_count)
+
+    def detach(self):
+        """Detaches the scheduler from its optimizer, the hyperparameter keeps its last value"""
+        self.optimizer.schedulers.remove(self)
+
+    def value(self, step):
+        raise Exception("You need to implement the value method")
+
+    def apply(self, step):
+        """Sets the hyperparameter of the optimizer for the step step (starting at 0)"""
+        setattr(self.optimizer, self.hyperparameter, float(self.value(step)))
+
+    def schedule(self, nb_steps, start=0):
+        """Returns an array containing the values of the hyperparameter for nb_steps steps"""
+        steps = np.arange(start, start + nb_steps)
+        return np.broadcast_to(np.asarray(self.value(steps), dtype=np.float64), steps.shape).copy()
+
+    def state_dict(self):
+        return {name: getattr(self, name) for name in self.state_names}
+
+    def load_state_dict(self, state_dict):
+        for name, value in state_dict.items():
+            setattr(self, name, value)
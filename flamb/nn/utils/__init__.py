@@ -0,0 +1,7 @@
+from .clip_grad import clip_grad_norm_, clip_grad_value_
+from .grad_statistics import GradStatistics
+from .layer_statistics import LayerStatistics
+from .quantization import quantize, quantization_report
+from .pruning import prune, prune_module, sparsify
+
+__all__ = ["clip_grad_norm_", "clip_grad_value_", "GradStatistics", "LayerStatistics", "quantize", "quantization_report", "prune", "prune_module", "sparsify"]
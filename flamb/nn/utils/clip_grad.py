@@ -0,0 +1,77 @@
+"""
+This file contains functions clipping the gradients of parameters inplace
+"""
+
+import math
+import numpy as np
+from flamb.autograd import Variable, Parameter, SparseGrad, FlatParameters
+
+
+class Gradients:
+    """
+    The gradients of params (a tensor of Variables and Parameters, an optimizer or a FlatParameters), as numpy arrays.
+    When params are stored in a FlatParameters (ie they have been given to an optimizer),
+    the arrays are views of the flat gradient array, otherwise the gradients of the Variables are gathered in an array
+    and written back by write_back.
+    The norm of a SparseGrad is computed on its coalesced rows (an index can appear several times),
+    while the scaling is applied to its values directly
+    """
+
+    def __init__(self, params):
+        storage = FlatParameters.of(getattr(params, "storage", params))
+        self.variables = []
+        self.arrays = []
+        if storage is not None:
+            self.arrays.append(storage.grads)
+            parameters = storage.sparse_parameters
+        else:
+            self.variables = [param for param in params if isinstance(param, Variable)]
+            self.arrays.append(np.array([var.grad for var in self.variables], dtype=np.float64))
+            parameters = [param for param in params if isinstance(param, Parameter)]
+
+        # Arrays whose squared values sum to the squared norm
+        self.norm_arrays = list(self.arrays)
+        for param in parameters:
+            if isinstance(param.grad, SparseGrad):
+                self.arrays.append(param.grad.values)
+                self.norm_arrays.append(param.grad.coalesce().values)
+            elif param.grad is not None:
+                self.arrays.append(param.grad)
+                self.norm_arrays.append(param.grad)
+
+    def squared_norm(self):
+        return sum(float(np.dot(array.ravel(), array.ravel())) for array in self.norm_arrays)
+
+    def write_back(self):
+        if self.variables:
+            for var, grad in zip(self.variables, self.arrays[0].tolist()):
+                var.grad = grad
+
+
+def clip_grad_norm_(params, max_norm, error_if_nonfinite=False):
+    """
+    Scales the gradients of params so that their global L2 norm is at most max_norm.
+    The norm is computed in a single pass over the gradients, and the scaling is done inplace.
+    Returns the norm of the gradients before clipping
+    """
+    gradients = Gradients(params)
+    norm = math.sqrt(gradients.squared_norm())
+    if not math.isfinite(norm):
+        if error_if_nonfinite:
+            raise Exception(f"The norm of the gradients is {norm}, so they cannot be clipped")
+        return norm
+
+    coefficient = max_norm / (norm + 1e-6)
+    if coefficient < 1:
+        for array in gradients.arrays:
+            array *= coefficient
+        gradients.write_back()
+    return norm
+
+
+def clip_grad_value_(params, clip_value):
+    """Clips each gradient of params to [-clip_value, clip_value] inplace"""
+    gradients = Gradients(params)
+    for array in gradients.arrays:
+        np.clip(array, -clip_value, clip_value, out=array)
+    gradients.write_back()
@@ -0,0 +1,70 @@
+"""
+This file defines a GradStatistics class, which reports the norms of the gradients of a module, layer by layer
+"""
+
+import math
+import numpy as np
+from flamb.autograd import Parameter, FlatParameters, SparseGrad
+from flamb.autograd.flat_parameters import FlatVariable
+from .clip_grad import Gradients
+
+
+class GradStatistics:
+    """
+    Computes, after a backward pass, the global L2 norm of the gradients of a module, the norm of each of its layers,
+    and the layers whose gradients contain NaN or Inf values.
+
+    When the parameters of the module are stored in flat arrays (ie they have been given to an optimizer),
+    each layer is mapped once to its positions in the flat gradient array, and all the norms are computed
+    with a single pass over that array
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.names = [name for name, _ in module.named_layers()]
+        self.layers = [layer for _, layer in module.named_layers()]
+        self.storage = None
+
+    def build_layout(self, storage):
+        """Maps each position of the flat gradient array of storage to the index of its layer"""
+        self.storage = storage
+        # Positions that belong to no layer are mapped to len(self.layers)
+        self.segments = np.full(len(storage), len(self.layers))
+        self.sparse_parameters = []
+        slices = {id(param): s for param, s in zip(storage.parameters, storage.slices)}
+        for i, layer in enumerate(self.layers):
+            for param in layer.get_parameters():
+                if isinstance(param, FlatVariable) and param.storage is storage:
+                    self.segments[param.index] = i
+                elif isinstance(param, Parameter) and id(param) in slices:
+                    self.segments[slices[id(param)]] = i
+                elif isinstance(param, Parameter) and param.sparse:
+                    self.sparse_parameters.append((i, param))
+
+    def squared_norms(self):
+        """Returns the squared norm of the gradients of each layer, and the squared global norm"""
+        storage = FlatParameters.of(self.module.parameters) if self.module.parameters is not None else None
+        if storage is None:
+            squared_norms = np.array([Gradients(layer.get_parameters()).squared_norm() for layer in self.layers])
+            return squared_norms, float(squared_norms.sum())
+
+        if storage is not self.storage:
+            self.build_layout(storage)
+        grads = storage.grads
+        squared_norms = np.bincount(self.segments, weights=grads * grads, minlength=len(self.layers) + 1)
+        for i, param in self.sparse_parameters:
+            if param.grad is not None:
+                # The rows of a SparseGrad are summed first, since an index can appear several times
+                grad = param.grad.coalesce().values if isinstance(param.grad, SparseGrad) else param.grad
+                squared_norms[i] += float(np.dot(grad.ravel(), grad.ravel()))
+        return squared_norms[:len(self.layers)], float(squared_norms.sum())
+
+    def __call__(self):
+        """Returns a report with the keys global_norm, layer_norms and nonfinite_layers"""
+        squared_norms, squared_global_norm = self.squared_norms()
+        layer_norms = np.sqrt(squared_norms)
+        return {
+            "global_norm": math.sqrt(squared_global_norm),
+            "layer_norms": dict(zip(self.names, layer_norms.tolist())),
+            "nonfinite_layers": [name for name, norm in zip(self.names, layer_norms) if not np.isfinite(norm)],
+        }
@@ -0,0 +1,130 @@
+"""
+This file defines a LayerStatistics class, which records the time, the activations and the gradients
+of each layer of a module with hooks
+"""
+
+import functools
+import math
+import time
+import flamb
+import numpy as np
+from flamb.autograd.operators import get_value
+from ..hooks import apply_hook_operator, is_tensor
+from ..module import Module
+
+
+def tensors_of(x):
+    return [value for value in (x if isinstance(x, (tuple, list)) else [x]) if is_tensor(value)]
+
+
+class LayerStatistics:
+    """
+    Records with hooks, for each layer of module (a Module, or a single layer), a dict with:
+    - calls : number of calls of the layer
+    - forward_time : total wall time (in seconds) of its forwards
+    - backward_time : total wall time of their backwards, if backward_time is True (0 otherwise)
+    - activation_norm : L2 norm of its last output (of all its output tensors)
+    - grad_norm : L2 norm of the gradient of its last output which received one
+    - output_shape, output_size : shape (list of shapes if there are several) and number of values of its last output
+
+    The gradients of the outputs are recorded by a hook on the outputs, which does not change the computation.
+    Measuring the backward time is more intrusive, so it is only done if backward_time is True: the backward
+    of a call of a layer runs from the moment the gradients of its outputs are known to the moment they reach
+    its inputs, so the inputs are given to the layer through a HookOperator which requires grad. The layer then
+    also computes the gradients of inputs which do not need one, which is included in the measured times.
+    A layer whose inputs never receive a gradient (an Embedding) has no backward time.
+
+    Use it as a context manager, or call remove to unregister the hooks
+
+        with LayerStatistics(model) as statistics:
+            loss_fn(model(x), y).backward()
+        print(statistics.table())
+    """
+
+    def __init__(self, module, backward_time=False):
+        self.backward_time = backward_time
+        layers = list(module.named_layers()) if isinstance(module, Module) else [(type(module).__name__, module)]
+        self.names = [name for name, _ in layers]
+        # Calls whose forward is running, for each layer
+        self.running_calls = {}
+        self.handles = []
+        for name, layer in layers:
+            self.handles.append(layer.register_forward_pre_hook(functools.partial(self.before_forward, name)))
+            self.handles.append(layer.register_forward_hook(functools.partial(self.after_forward, name)))
+        self.reset()
+
+    def reset(self):
+        self.statistics = {
+            name: {
+                "calls": 0,
+                "forward_time": 0.,
+                "backward_time": 0.,
+                "activation_norm": None,
+                "grad_norm": None,
+                "output_shape": None,
+                "output_size": None,
+            }
+            for name in self.names
+        }
+
+    def before_forward(self, name, layer, args):
+        call = {"backward_start": None, "backward_done": False}
+        self.running_calls[name] = call
+        if self.backward_time and flamb.is_grad_enabled():
+            args = apply_hook_operator(args, functools.partial(self.end_backward, name, call), force_grad=True)
+        call["forward_start"] = time.perf_counter()
+        return args
+
+    def after_forward(self, name, layer, args, output):
+        end = time.perf_counter()
+        call = self.running_calls.pop(name)
+        statistics = self.statistics[name]
+        statistics["calls"] += 1
+        statistics["forward_time"] += end - call["forward_start"]
+        values = [get_value(x) for x in tensors_of(output)]
+        if values:
+            statistics["activation_norm"] = math.sqrt(sum(float(np.sum(value * value)) for value in values))
+            statistics["output_shape"] = values[0].shape if len(values) == 1 else [value.shape for value in values]
+            statistics["output_size"] = sum(value.size for value in values)
+        return apply_hook_operator(output, functools.partial(self.start_backward, name, call))
+
+    def start_backward(self, name, call, grads):
+        call["backward_start"] = time.perf_counter()
+        self.statistics[name]["grad_norm"] = math.sqrt(sum(float(np.sum(grad * grad)) for grad in grads))
+
+    def end_backward(self, name, call, grads):
+        if call["backward_start"] is not None and not call["backward_done"]:
+            call["backward_done"] = True
+            self.statistics[name]["backward_time"] += time.perf_counter() - call["backward_start"]
+
+    def report(self):
+        """Returns the dict name: statistics of the layers"""
+        return {name: dict(statistics) for name, statistics in self.statistics.items()}
+
+    def table(self):
+        """Returns the statistics as a table, the slowest layers first"""
+        lines = [
+            f"{'layer':<24} {'calls':>6} {'forward (ms)':>13} {'backward (ms)':>14} {'activation':>11} {'grad':>11} {'size':>9}"
+        ]
+        rows = sorted(self.statistics.items(), key=lambda item: -(item[1]["forward_time"] + item[1]["backward_time"]))
+        for name, statistics in rows:
+            norms = [
+                f"{norm:>11.4g}" if norm is not None else f"{'-':>11}"
+                for norm in (statistics["activation_norm"], statistics["grad_norm"])
+            ]
+            lines.append(
+                f"{name:<24} {statistics['calls']:>6} {statistics['forward_time'] * 1e3:>13.3f} "
+                f"{statistics['backward_time'] * 1e3:>14.3f} {norms[0]} {norms[1]} {statistics['output_size'] or 0:>9}"
+            )
+        return "\n".join(lines)
+
+    def remove(self):
+        for handle in self.handles:
+            handle.remove()
+        self.handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.remove()
@@ -0,0 +1,92 @@
+"""
+This file contains the magnitude pruning of the Linear layers of a module, and their conversion to SparseLinear layers
+"""
+
+import copy
+import weakref
+import numpy as np
+from flamb.autograd.operators import flat_slice, get_value
+from ..layers.linear import Linear
+from ..layers.sparse import SparseLinear
+
+# Layers pruned by prune, whose masks are applied by the optimizers created afterwards (see add_masks)
+pruned_layers = weakref.WeakSet()
+
+
+def magnitude_mask(weights, amount, structured=None):
+    """
+    Returns the boolean mask of the weights (an array of shape (input_size, output_size)) which are kept when
+    the fraction amount of them with the smallest magnitude is pruned. If structured is "rows" (or "columns"),
+    whole rows (inputs) or columns (outputs) are pruned, those with the smallest L2 norm
+    """
+    assert 0 <= amount <= 1, f"amount should be between 0 and 1, but got {amount}"
+    assert structured in (None, "rows", "columns"), f"structured should be None, 'rows' or 'columns', but got {structured}"
+    magnitudes = np.abs(weights)
+    if structured == "rows":
+        magnitudes = np.linalg.norm(weights, axis=1)
+    elif structured == "columns":
+        magnitudes = np.linalg.norm(weights, axis=0)
+    nb_pruned = int(round(amount * magnitudes.size))
+    keep = np.ones(magnitudes.size, dtype=bool)
+    keep[np.argsort(magnitudes, axis=None, kind="stable")[:nb_pruned]] = False
+    if structured == "rows":
+        return np.repeat(keep[:, None], weights.shape[1], axis=1)
+    if structured == "columns":
+        return np.repeat(keep[None, :], weights.shape[0], axis=0)
+    return keep.reshape(weights.shape)
+
+
+def prune(layer, amount, structured=None, optimizer=None):
+    """
+    Sets to 0 the fraction amount of the weights of layer (a Linear layer) with the smallest magnitude
+    (see magnitude_mask), and returns the mask of the kept weights, which is also stored in layer.weight_mask.
+    amount counts the weights already pruned, so pruning a layer again with a larger amount prunes more weights.
+    The pruned weights stay at 0 during the steps of optimizer (whose parameters include the weights of layer)
+    if it is given, and of the optimizers created afterwards, for the fine-tuning
+    """
+    assert isinstance(layer, Linear), f"Only Linear layers can be pruned, but got {type(layer).__name__}"
+    weights = get_value(layer.weights)
+    mask = magnitude_mask(weights, amount, structured)
+    mask &= getattr(layer, "weight_mask", True)
+    stored = flat_slice(layer.weights)
+    if stored is not None:
+        storage, flat = stored
+        storage.values[flat][~mask.ravel()] = 0
+    else:
+        for var, keep in zip(layer.weights.flat, mask.ravel().tolist()):
+            if not keep:
+                var.value = 0.
+    layer.weight_mask = mask
+    pruned_layers.add(layer)
+    if optimizer is not None:
+        optimizer.add_mask(layer.weights, mask)
+    return mask
+
+
+def add_masks(optimizer):
+    """Keeps at 0, during the steps of optimizer, the pruned weights of the pruned layers whose weights it updates"""
+    for layer in list(pruned_layers):
+        stored = flat_slice(layer.weights)
+        if stored is not None and stored[0] is optimizer.storage:
+            optimizer.add_mask(layer.weights, layer.weight_mask)
+
+
+def prune_module(module, amount, structured=None, optimizer=None):
+    """Prunes each Linear layer of module (see prune), and returns the dict name: mask of the kept weights"""
+    return {
+        name: prune(layer, amount, structured, optimizer)
+        for name, layer in module.named_layers() if isinstance(layer, Linear)
+    }
+
+
+def sparsify(module, inplace=False, max_csr_density=0.1):
+    """
+    Replaces the Linear layers of module by SparseLinear layers (for inference), which only compute the products
+    by the nonzero weights (see SparseLinear for max_csr_density). Returns the converted module (a copy of module, unless inplace is True)
+    """
+    if not inplace:
+        module = copy.deepcopy(module)
+    for name, layer in list(module.named_layers()):
+        if isinstance(layer, Linear):
+            module.set_layer(name, SparseLinear(layer, max_csr_density))
+    return module
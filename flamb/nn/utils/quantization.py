@@ -0,0 +1,98 @@
+"""
+This file contains the post-training quantization of the Linear layers of a module
+"""
+
+import copy
+import time
+import numpy as np
+import flamb
+from flamb.autograd.operators import get_value
+from ..layers.linear import Linear
+from ..layers.quantized import QuantizedLinear
+
+
+class RangeObserver:
+    """Replaces a layer during the calibration: records the maximum absolute value of its inputs"""
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.input_range = 0.
+
+    def __call__(self, x):
+        self.input_range = max(self.input_range, float(np.abs(get_value(x)).max()))
+        return self.layer(x)
+
+
+def quantize(module, calibration_batches, inplace=False):
+    """
+    Post-training quantization: replaces the Linear layers of module with QuantizedLinear layers.
+    The range of the inputs of each layer is calibrated by running the module (in evaluation mode,
+    without gradients) on calibration_batches, a list of inputs of the module.
+    Returns the quantized module (a copy of module, unless inplace is True)
+    """
+    if not inplace:
+        module = copy.deepcopy(module)
+    observers = {name: RangeObserver(layer) for name, layer in module.named_layers() if isinstance(layer, Linear)}
+    for name, observer in observers.items():
+        module.set_layer(name, observer)
+
+    training = module.training
+    module.eval()
+    try:
+        with flamb.no_grad():
+            for batch in calibration_batches:
+                module(batch)
+    finally:
+        module.train(training)
+        for name, observer in observers.items():
+            module.set_layer(name, observer.layer)
+
+    for name, observer in observers.items():
+        module.set_layer(name, QuantizedLinear(observer.layer, observer.input_range))
+    return module
+
+
+def linear_nbytes(module):
+    """Memory used by the weights and biases of the Linear and QuantizedLinear layers of module, in float64 for Linear"""
+    nbytes = 0
+    for _, layer in module.named_layers():
+        if isinstance(layer, QuantizedLinear):
+            nbytes += layer.nbytes()
+        elif isinstance(layer, Linear):
+            nbytes += 8 * (layer.weights.size + layer.bias.size)
+    return nbytes
+
+
+def quantization_report(module, quantized_module, batches, nb_repeats=3):
+    """
+    Compares a module with its quantized version on batches (a list of inputs), both in evaluation mode:
+    error of the outputs (max and mean absolute error, relative error of the norm), time of the forward passes
+    (best of nb_repeats) and memory used by the Linear layers
+    """
+    def run(model):
+        model.eval()
+        outputs, best_time = None, float("inf")
+        with flamb.no_grad():
+            for _ in range(nb_repeats):
+                start = time.perf_counter()
+                outputs = [get_value(model(batch)) for batch in batches]
+                best_time = min(best_time, time.perf_counter() - start)
+        return np.concatenate([output.reshape(len(output), -1) for output in outputs]), best_time
+
+    training = module.training
+    outputs, float_time = run(module)
+    quantized_outputs, quantized_time = run(quantized_module)
+    module.train(training)
+    errors = np.abs(quantized_outputs - outputs)
+    float_nbytes, quantized_nbytes = linear_nbytes(module), linear_nbytes(quantized_module)
+    return {
+        "max_abs_error": float(errors.max()),
+        "mean_abs_error": float(errors.mean()),
+        "relative_error": float(np.linalg.norm(quantized_outputs - outputs) / np.linalg.norm(outputs)),
+        "float_time": float_time,
+        "quantized_time": quantized_time,
+        "speedup": float_time / quantized_time,
+        "float_nbytes": float_nbytes,
+        "quantized_nbytes": quantized_nbytes,
+        "memory_ratio": float_nbytes / quantized_nbytes,
+    }
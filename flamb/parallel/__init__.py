@@ -0,0 +1,5 @@
+from .shared import SharedArrays
+from .data_parallel import DataParallel
+from .hogwild import Hogwild
+
+__all__ = ["SharedArrays", "DataParallel", "Hogwild"]
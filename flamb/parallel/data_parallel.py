@@ -0,0 +1,128 @@
+"""
+This file defines a DataParallel class, which trains a model with several processes on one machine
+"""
+
+import multiprocessing
+import traceback
+import numpy as np
+from flamb.random import default_generator, seed_worker
+from flamb.train.trainer import default_prepare_batch
+from .shared import SharedArrays
+
+
+class DataParallel:
+    """
+    Synchronous data-parallel training with nb_workers forked processes, each holding a replica of the model.
+
+    The values of the parameters and the state of the optimizer are moved to shared memory, and each worker
+    accumulates its gradients in its own row of a shared (nb_workers, nb_params) array. For each batch:
+    - each worker runs the forward and the backward on its shard of the batch
+    - the gradients are all-reduced: worker r sums the rows of the gradient array on its chunk r of the columns
+    - worker r applies the step of its optimizer on chunk r of the parameters (see Optimizer.step)
+    so that the reduction and the optimizer step are split between the workers, and the replicas stay identical.
+
+    The parameters must be dense (sparse Parameters are not supported). Requires the fork start method.
+    Use it as a context manager, or call close to stop the workers and release the shared memory
+    """
+
+    def __init__(self, model, loss_fn, optimizer, nb_workers, prepare_batch=default_prepare_batch):
+        storage = optimizer.storage
+        assert not storage.sparse_parameters, "DataParallel does not support sparse parameters"
+        self.model = model
+        self.loss_fn = loss_fn
+        self.optimizer = optimizer
+        self.nb_workers = nb_workers
+        self.prepare_batch = prepare_batch
+
+        n = len(storage)
+        names = list(optimizer.state)
+        self.shared = SharedArrays([(n,), (nb_workers, n)] + [(n,)] * len(names))
+        values, self.grads, *states = self.shared.arrays
+        storage.move_to(values=values)
+        for name, array in zip(names, states):
+            array[...] = optimizer.state[name]
+            optimizer.state[name] = array
+        bounds = np.linspace(0, n, nb_workers + 1).astype(int)
+        self.chunks = [slice(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+
+        # Each worker draws its random numbers (dropout masks...) from its own stream
+        self.generators = default_generator.spawn(nb_workers)
+        context = multiprocessing.get_context("fork")
+        self.barrier = context.Barrier(nb_workers)
+        self.connections = []
+        self.workers = []
+        for rank in range(nb_workers):
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(target=self.run_worker, args=(rank, worker_connection), daemon=True)
+            worker.start()
+            self.connections.append(connection)
+            self.workers.append(worker)
+
+    def run_worker(self, rank, connection):
+        seed_worker(self.generators[rank])
+        storage = self.optimizer.storage
+        storage.move_to(grads=self.grads[rank])
+        chunk = self.chunks[rank]
+        while True:
+            message = connection.recv()
+            if message is None:
+                return
+            shard, weight = message
+            try:
+                storage.zero_grad()
+                loss = 0.
+                if weight > 0:
+                    inputs, targets = self.prepare_batch(shard)
+                    loss = self.loss_fn(self.model(inputs), targets)
+                    loss.backward(weight)
+                    loss = loss.value
+                self.barrier.wait()
+                np.sum(self.grads[:, chunk], axis=0, out=storage.grads[chunk])
+                self.optimizer.step(zero_grad=False, chunk=chunk)
+                connection.send(loss)
+            except Exception:
+                self.barrier.abort()
+                connection.send(Exception(traceback.format_exc()))
+
+    def train_batch(self, batch):
+        """Runs a training step on batch (a tuple of arrays), split between the workers, returns the mean loss"""
+        size = len(batch[0])
+        bounds = np.linspace(0, size, self.nb_workers + 1).astype(int)
+        for connection, start, end in zip(self.connections, bounds[:-1], bounds[1:]):
+            shard = tuple(array[start:end] for array in batch)
+            connection.send((shard, (end - start) / size))
+
+        results = [connection.recv() for connection in self.connections]
+        # The optimizer of the main process follows the steps of the workers
+        for scheduler in self.optimizer.schedulers:
+            scheduler.apply(self.optimizer.step_count)
+        self.optimizer.step_count += 1
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise Exception(f"A DataParallel worker failed:\n{errors[0]}")
+        return sum(loss * (end - start) / size for loss, start, end in zip(results, bounds[:-1], bounds[1:]))
+
+    def fit(self, loader, epochs=1):
+        """Trains the model for epochs epochs on the batches of loader, returns the mean loss of each epoch"""
+        return [float(np.mean([self.train_batch(batch) for batch in loader])) for _ in range(epochs)]
+
+    def close(self):
+        """Stops the workers, and moves the parameters and the state of the optimizer back to private memory"""
+        if self.shared is None:
+            return
+        for connection, worker in zip(self.connections, self.workers):
+            connection.send(None)
+            worker.join()
+        storage = self.optimizer.storage
+        storage.move_to(values=np.empty(len(storage)))
+        for name, array in self.optimizer.state.items():
+            self.optimizer.state[name] = array.copy()
+        self.grads = None
+        self.shared.close()
+        self.shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
@@ -0,0 +1,111 @@
+"""
+This file defines a Hogwild class, which trains a model with asynchronous lock-free SGD in several processes
+"""
+
+import multiprocessing
+import time
+import traceback
+import numpy as np
+from flamb.data import DataLoader, Subset
+from flamb.random import default_generator, seed_worker
+from flamb.train.trainer import default_prepare_batch
+from .shared import SharedArrays
+
+
+class Hogwild:
+    """
+    Hogwild training: the values of the parameters (dense and sparse) are moved to shared memory, and nb_workers
+    forked processes each run their own loop of forward, backward and optimizer.step on their shard of the dataset,
+    writing their updates to the shared values without any lock.
+    Each worker keeps private gradients and a private optimizer state.
+
+    It works best when the updates rarely overlap, for instance with sparse (embedding) parameters.
+    Requires the fork start method. Use it as a context manager, or call close to release the shared memory
+    """
+
+    def __init__(self, model, loss_fn, optimizer, nb_workers, prepare_batch=default_prepare_batch):
+        self.model = model
+        self.loss_fn = loss_fn
+        self.optimizer = optimizer
+        self.nb_workers = nb_workers
+        self.prepare_batch = prepare_batch
+
+        storage = optimizer.storage
+        shapes = [(len(storage),)] + [param.shape for param in storage.sparse_parameters]
+        self.shared = SharedArrays(shapes)
+        values, *sparse_values = self.shared.arrays
+        storage.move_to(values=values)
+        for param, array in zip(storage.sparse_parameters, sparse_values):
+            array[...] = param.data
+            param.data = array
+
+    def run_worker(self, rank, dataset, batch_size, epochs, shuffle, seed, generator, results):
+        try:
+            seed_worker(generator)
+            indices = np.arange(rank, len(dataset), self.nb_workers)
+            loader = DataLoader(Subset(dataset, indices), batch_size, shuffle=shuffle, seed=seed + rank)
+            nb_samples, losses = 0, []
+            start = time.perf_counter()
+            for _ in range(epochs):
+                losses = []
+                for batch in loader:
+                    inputs, targets = self.prepare_batch(batch)
+                    loss = self.loss_fn(self.model(inputs), targets)
+                    loss.backward()
+                    self.optimizer.step()
+                    losses.append(loss.value)
+                    nb_samples += len(batch[0])
+            duration = time.perf_counter() - start
+            results.put({
+                "rank": rank,
+                "samples": nb_samples,
+                "time": duration,
+                "samples_per_second": nb_samples / duration,
+                "loss": float(np.mean(losses)),
+            })
+        except Exception:
+            results.put(Exception(traceback.format_exc()))
+
+    def fit(self, dataset, batch_size, epochs=1, shuffle=True, seed=0):
+        """
+        Trains the model on dataset (a Dataset), whose samples are split between the workers.
+        Returns a list with the statistics of each worker (number of samples, time, samples_per_second,
+        mean loss of its last epoch)
+        """
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        generators = default_generator.spawn(self.nb_workers)
+        workers = [
+            context.Process(
+                target=self.run_worker,
+                args=(rank, dataset, batch_size, epochs, shuffle, seed, generators[rank], results),
+            )
+            for rank in range(self.nb_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        statistics = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        errors = [result for result in statistics if isinstance(result, Exception)]
+        if errors:
+            raise Exception(f"A Hogwild worker failed:\n{errors[0]}")
+        return sorted(statistics, key=lambda result: result["rank"])
+
+    def close(self):
+        """Moves the parameters back to private memory and releases the shared memory"""
+        if self.shared is None:
+            return
+        storage = self.optimizer.storage
+        storage.move_to(values=np.empty(len(storage)))
+        for param in storage.sparse_parameters:
+            param.data = param.data.copy()
+        self.shared.close()
+        self.shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
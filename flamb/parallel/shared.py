@@ -0,0 +1,31 @@
+"""
+This file defines a SharedArrays class, which allocates numpy arrays in shared memory
+"""
+
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedArrays:
+    """
+    Allocates float64 arrays in a single block of shared memory. The processes forked after the allocation
+    share the arrays. close releases the block
+    """
+
+    def __init__(self, shapes):
+        sizes = [int(np.prod(shape)) for shape in shapes]
+        self.memory = shared_memory.SharedMemory(create=True, size=max(8 * sum(sizes), 8))
+        self.arrays = []
+        offset = 0
+        for shape, size in zip(shapes, sizes):
+            self.arrays.append(np.ndarray(shape, dtype=np.float64, buffer=self.memory.buf, offset=8 * offset))
+            offset += size
+
+    def close(self):
+        """Releases the block, it stays mapped until the process exits if views of the arrays are still used"""
+        self.arrays = []
+        try:
+            self.memory.close()
+        except BufferError:
+            pass
+        self.memory.unlink()
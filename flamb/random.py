@@ -0,0 +1,101 @@
+"""
+This file defines the random number generators of flamb, which draw whole arrays at once from a numpy Generator
+"""
+
+import numpy as np
+
+# Dicts {generator: state} of the active record_states contexts
+_recordings = []
+
+
+class record_states:
+    """
+    Context recording, in the dict it returns, the state of each Generator before the first numbers it draws
+    inside the context, so that the same numbers can be drawn again (used by flamb.utils.checkpoint)
+    """
+
+    def __enter__(self):
+        self.states = {}
+        _recordings.append(self.states)
+        return self.states
+
+    def __exit__(self, type, value, traceback):
+        _recordings.pop()
+
+
+class Generator:
+    """
+    Random number generator backed by a np.random.Generator, created from a np.random.SeedSequence.
+    If seed is None, the generator is seeded with fresh entropy from the operating system.
+
+    The generators given to workers should come from spawn, which derives independent streams from the seed
+    sequence: copying a generator (when a process is forked for instance) gives the same numbers in each copy
+    """
+
+    def __init__(self, seed=None):
+        self.manual_seed(seed)
+
+    def manual_seed(self, seed):
+        """Restarts the generator from seed (an int, a SeedSequence, or None for fresh entropy), returns it"""
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        return self
+
+    def initial_seed(self):
+        return self.seed_sequence.entropy
+
+    def get_state(self):
+        return self.rng.bit_generator.state
+
+    def set_state(self, state):
+        self.rng.bit_generator.state = state
+
+    def spawn(self, n):
+        """Returns n new generators, whose streams are independent from each other and from this generator"""
+        return [Generator(seed_sequence) for seed_sequence in self.seed_sequence.spawn(n)]
+
+    def record(self):
+        """Called before each draw, records the state of the generator in the active record_states contexts"""
+        for states in _recordings:
+            if self not in states:
+                states[self] = self.get_state()
+
+    def random(self, shape=None):
+        """Values drawn uniformly in [0, 1)"""
+        self.record()
+        return self.rng.random(shape)
+
+    def uniform(self, low=0., high=1., shape=None):
+        self.record()
+        return self.rng.uniform(low, high, shape)
+
+    def normal(self, mean=0., std=1., shape=None):
+        self.record()
+        return self.rng.normal(mean, std, shape)
+
+    def permutation(self, n):
+        self.record()
+        return self.rng.permutation(n)
+
+
+# Generator used when no generator is given (see manual_seed)
+default_generator = Generator()
+
+
+def manual_seed(seed):
+    """Seeds the default generator (used by flamb.rand and the initializations of the layers), returns it"""
+    return default_generator.manual_seed(seed)
+
+
+def get_generator(generator=None):
+    """Returns generator, or the default generator if it is None"""
+    return default_generator if generator is None else generator
+
+
+def seed_worker(generator):
+    """
+    Makes the default generator of a worker process draw the numbers of generator (one of the generators
+    returned by default_generator.spawn(nb_workers) in the main process before the workers are started),
+    so that each worker has its own stream, and the runs are reproducible after manual_seed
+    """
+    default_generator.manual_seed(generator.seed_sequence)
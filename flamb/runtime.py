@@ -0,0 +1,228 @@
+"""
+Minimal runtime executing the models exported with flamb.export, without Variables, operators or grad mode.
+
+This module only imports numpy (and the standard library): it can be copied next to an exported model
+and used without flamb. The kernels below are also the ones used by the eager forward of flamb's
+operators, so that the results of the runtime are bit-identical to the eager forward.
+
+    program = runtime.load("model.npz")
+    outputs = program(inputs)
+"""
+
+import json
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def linear(x, weights, bias, out=None):
+    """x @ weights + bias"""
+    out = np.matmul(x, weights, out=out)
+    out += bias
+    return out
+
+
+def quantize(x, scale):
+    """Symmetric int8 quantization of x with scale (returns the rounded values as floats, between -127 and 127)"""
+    return np.clip(np.rint(x / scale), -127, 127)
+
+
+# Number of int8 products whose sum is exact in float32 (127 * 127 * 1024 < 2 ** 24)
+QUANTIZED_BLOCK_SIZE = 1024
+
+
+def quantized_linear(x, weights, weight_scales, input_scale, bias, out=None):
+    """
+    Linear with int8 weights (of shape (input_size, output_size), with one scale per output) on the input quantized
+    to int8 with input_scale. The integer products are accumulated exactly, then dequantized and added to bias.
+    numpy's integer matmul does not use BLAS, so the accumulation is made by float32 matmuls on blocks of
+    QUANTIZED_BLOCK_SIZE inputs, which are exact (like an int32 accumulation), and the sums of the blocks are
+    accumulated in float64. The weights can be given as int8, or as float32 holding their int8 values,
+    which avoids a conversion
+    """
+    quantized_x = np.multiply(x, 1 / input_scale, dtype=np.float32)
+    np.rint(quantized_x, out=quantized_x)
+    np.clip(quantized_x, -127, 127, out=quantized_x)
+    weights = weights.astype(np.float32, copy=False)
+    accumulation = None
+    for start in range(0, x.shape[-1], QUANTIZED_BLOCK_SIZE):
+        block = np.matmul(quantized_x[..., start:start + QUANTIZED_BLOCK_SIZE], weights[start:start + QUANTIZED_BLOCK_SIZE])
+        if accumulation is None:
+            accumulation = block
+        elif accumulation.dtype == np.float32:
+            accumulation = accumulation + block.astype(np.float64)
+        else:
+            accumulation += block
+    out = np.multiply(accumulation, input_scale * weight_scales, out=out)
+    out += bias
+    return out
+
+
+def compact_linear(x, weights, input_indices, output_indices, bias, out=None):
+    """
+    Linear whose weights are zero outside of the rows input_indices and the columns output_indices
+    (structured pruning): weights only holds the block of the kept rows and columns
+    """
+    if out is None:
+        out = np.empty(x.shape[:-1] + bias.shape)
+    out[...] = bias
+    out[..., output_indices] += np.matmul(x[..., input_indices], weights)
+    return out
+
+
+# Maximum number of products computed at once by csr_linear
+CSR_BLOCK_SIZE = 1 << 16
+# csr_linear only multiplies the nonzero weights one by one when (number of rows of x) * (density of the weights)
+# is at most this, otherwise the weights are expanded to a dense matrix for a BLAS matmul (see the benchmarks)
+CSR_MAX_ROWS_DENSITY = 0.5
+
+
+def csr_linear(x, data, indices, indptr, bias, out=None):
+    """
+    Linear whose transposed weights (of shape (output_size, input_size)) are given in the CSR format:
+    the nonzero weights of the output j are data[indptr[j]:indptr[j + 1]], for the inputs indices[indptr[j]:indptr[j + 1]].
+    The products are computed for blocks of outputs, and summed for each output with np.add.reduceat.
+    For many rows of x, a dense matmul is faster (numpy's products by element are much slower than BLAS):
+    the weights are then expanded to a temporary dense matrix
+    """
+    if x.size * len(data) > CSR_MAX_ROWS_DENSITY * len(bias) * x.shape[-1] ** 2:
+        weights = np.zeros((len(bias), x.shape[-1]))
+        weights[np.repeat(np.arange(len(bias)), np.diff(indptr)), indices] = data
+        return linear(x, weights.T, bias, out)
+
+    matrix = x.reshape(-1, x.shape[-1]).T
+    result = np.empty((len(bias), matrix.shape[1]))
+    result[...] = bias[:, None]
+    block = max(1, CSR_BLOCK_SIZE // max(1, matrix.shape[1]))
+    for start in range(0, len(bias), block):
+        starts = indptr[start:start + block + 1]
+        if starts[-1] == starts[0]:
+            continue
+        products = matrix[indices[starts[0]:starts[-1]]]
+        products *= data[starts[0]:starts[-1], None]
+        # reduceat does not return 0 for the empty segments, which are skipped
+        nonempty = np.flatnonzero(starts[1:] > starts[:-1])
+        result[start + nonempty] += np.add.reduceat(products, starts[nonempty] - starts[0], axis=0)
+    if out is None:
+        return result.T.reshape(x.shape[:-1] + bias.shape)
+    out.reshape(-1, len(bias))[...] = result.T
+    return out
+
+
+def identity(x, out=None):
+    if out is None:
+        return x.copy()
+    np.copyto(out, x)
+    return out
+
+
+def relu(x, out=None):
+    return np.maximum(x, 0., out=out)
+
+
+def expand_channels(value, nb_dim):
+    """Reshapes an array of shape (C,) so that it applies on the axis 1 of an array with nb_dim dimensions"""
+    return value.reshape((1, -1) + (1,) * (nb_dim - 2))
+
+
+def affine(x, scale, shift, out=None):
+    """x * scale + shift, where scale and shift apply on the channels (axis 1) of x"""
+    out = np.multiply(x, expand_channels(scale, x.ndim), out=out)
+    out += expand_channels(shift, x.ndim)
+    return out
+
+
+def same_shape(x_shape, *constant_shapes):
+    return x_shape
+
+
+KERNELS = {
+    # name: (kernel, function returning the shape of the output given the shapes of the inputs)
+    "linear": (linear, lambda x_shape, weights_shape, bias_shape: x_shape[:-1] + weights_shape[-1:]),
+    "quantized_linear": (quantized_linear, lambda x_shape, weights_shape, *scales_and_bias: x_shape[:-1] + weights_shape[-1:]),
+    "compact_linear": (compact_linear, lambda x_shape, *constant_shapes: x_shape[:-1] + constant_shapes[-1]),
+    "csr_linear": (csr_linear, lambda x_shape, *constant_shapes: x_shape[:-1] + constant_shapes[-1]),
+    "identity": (identity, same_shape),
+    "relu": (relu, same_shape),
+    "exp": (np.exp, same_shape),
+    "cos": (np.cos, same_shape),
+    "sin": (np.sin, same_shape),
+    "tan": (np.tan, same_shape),
+    "tanh": (np.tanh, same_shape),
+    "affine": (affine, same_shape),
+}
+
+
+class Program:
+    """
+    Exported model: a list of operations on named values. The value "input" is the input of the model,
+    the constants (weights) are loaded once, and the other values are the outputs of the operations.
+
+    For each input shape, the execution is planned once: the shapes of the values are inferred, and each value
+    is assigned a buffer, reused by other values once it is not needed anymore
+    """
+
+    def __init__(self, graph, constants):
+        assert graph["version"] == FORMAT_VERSION, f"Unsupported format version {graph['version']}"
+        self.operations = graph["operations"]
+        self.output = graph["output"]
+        # int8 constants (quantized weights) are expanded once to float32, the type used by the kernels
+        self.constants = {
+            name: constant.astype(np.float32) if constant.dtype == np.int8 else constant
+            for name, constant in constants.items()
+        }
+        self.plans = {}
+
+    def plan(self, input_shape):
+        """Returns the list of the buffers of the outputs of the operations, for an input of shape input_shape"""
+        shapes = {"input": input_shape}
+        shapes.update({name: constant.shape for name, constant in self.constants.items()})
+        last_uses = {}
+        for i, operation in enumerate(self.operations):
+            for name in operation["inputs"]:
+                last_uses[name] = i
+
+        free_buffers = {}
+        value_buffers = {}
+        buffers = []
+        for i, operation in enumerate(self.operations):
+            _, shape_function = KERNELS[operation["type"]]
+            shape = tuple(shape_function(*[shapes[name] for name in operation["inputs"]]))
+            shapes[operation["output"]] = shape
+            candidates = free_buffers.get(shape, [])
+            buffer = candidates.pop() if candidates else np.empty(shape)
+            buffers.append(buffer)
+            value_buffers[operation["output"]] = buffer
+            # The buffers of the values used for the last time can be reused by the next operations
+            for name in set(operation["inputs"]):
+                if last_uses[name] == i and name in value_buffers and name != self.output:
+                    free_buffers.setdefault(shapes[name], []).append(value_buffers.pop(name))
+        return buffers
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        buffers = self.plans.get(x.shape)
+        if buffers is None:
+            buffers = self.plans[x.shape] = self.plan(x.shape)
+
+        values = dict(self.constants)
+        values["input"] = x
+        for operation, buffer in zip(self.operations, buffers):
+            kernel, _ = KERNELS[operation["type"]]
+            values[operation["output"]] = kernel(*[values[name] for name in operation["inputs"]], out=buffer)
+        return values[self.output].copy()
+
+
+def save(path, graph, constants):
+    """Writes the graph (a dict) and the constants (a dict name: array) in the .npz file path"""
+    graph = dict(graph, version=FORMAT_VERSION)
+    encoded_graph = np.frombuffer(json.dumps(graph).encode(), dtype=np.uint8)
+    np.savez(path, __graph__=encoded_graph, **constants)
+
+
+def load(path):
+    """Loads a Program written by flamb.export"""
+    with np.load(path, allow_pickle=False) as data:
+        graph = json.loads(data["__graph__"].tobytes().decode())
+        constants = {name: data[name] for name in data.files if name != "__graph__"}
+    return Program(graph, constants)
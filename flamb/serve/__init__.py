@@ -0,0 +1,5 @@
+from .statistics import ServingStatistics
+from .batcher import DynamicBatcher
+from .server import Server, generate_load
+
+__all__ = ["ServingStatistics", "DynamicBatcher", "Server", "generate_load"]
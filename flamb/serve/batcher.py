@@ -0,0 +1,135 @@
+"""
+This file defines a DynamicBatcher class, which merges concurrent inference requests into batches
+"""
+
+import asyncio
+import concurrent.futures
+import time
+import numpy as np
+import flamb
+from flamb.autograd.operators import get_value
+from .statistics import ServingStatistics
+
+
+# Model of the current worker process (see DynamicBatcher with worker_type="process")
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def infer(model, batch):
+    """
+    Returns the numeric output of model on batch, without computing gradients. The batch is given to the model
+    as a float numpy array, which the operators read directly, instead of a tensor of Variables
+    """
+    with flamb.no_grad():
+        return get_value(model(batch))
+
+
+def _infer_worker(batch):
+    return infer(_worker_model, batch)
+
+
+class DynamicBatcher:
+    """
+    Answers inference requests (one sample each) with the output of a model, computed on batches:
+    the requests waiting in the queue are merged into a batch of at most max_batch_size samples, waiting at most
+    max_wait seconds after the first request for others to arrive. Each batch goes through a single call
+    of the model (in evaluation mode, without gradients, on the batch as a float numpy array), on a worker thread
+    or process, so that the event loop keeps receiving requests.
+
+    With worker_type="process", the model must be picklable.
+    The latencies and the batch sizes are recorded in self.statistics
+    """
+
+    def __init__(self, model, max_batch_size=32, max_wait=0.005, worker_type="thread"):
+        assert worker_type in ("thread", "process"), f"worker_type should be thread or process, not {worker_type}"
+        if hasattr(model, "eval"):
+            model.eval()
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.worker_type = worker_type
+        self.statistics = ServingStatistics()
+        self.queue = None
+        self.task = None
+        self.executor = None
+
+    async def start(self):
+        """Starts the task merging the requests, must be called from the event loop"""
+        self.queue = asyncio.Queue()
+        if self.worker_type == "thread":
+            self.executor = concurrent.futures.ThreadPoolExecutor(1)
+        else:
+            self.executor = concurrent.futures.ProcessPoolExecutor(1, initializer=_init_worker, initargs=(self.model,))
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        self.task.cancel()
+        try:
+            await self.task
+        except (asyncio.CancelledError, Exception):
+            # The executor is shut down even if the task failed
+            pass
+        self.executor.shutdown(wait=True)
+
+    async def predict(self, sample):
+        """Returns the output of the model for a single sample (an array-like), as a numpy array"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((np.asarray(sample, dtype=np.float64), future, time.perf_counter()))
+        return await future
+
+    async def next_requests(self):
+        """Waits for a request, then returns it with the ones arriving before max_batch_size or max_wait is reached"""
+        requests = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(requests) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if not self.queue.empty():
+                requests.append(self.queue.get_nowait())
+            elif timeout <= 0:
+                break
+            else:
+                try:
+                    requests.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        return requests
+
+    async def run(self):
+        while True:
+            requests = await self.next_requests()
+            # The samples can only be stacked with samples of the same shape: a malformed request
+            # does not make the others fail
+            groups = {}
+            for request in requests:
+                groups.setdefault(request[0].shape, []).append(request)
+            for group in groups.values():
+                await self.run_batch(group)
+
+    async def run_batch(self, requests):
+        """Answers requests (whose samples have the same shape) with a single call of the model"""
+        loop = asyncio.get_running_loop()
+        try:
+            batch = np.stack([sample for sample, _, _ in requests])
+            if self.worker_type == "thread":
+                outputs = await loop.run_in_executor(self.executor, infer, self.model, batch)
+            else:
+                outputs = await loop.run_in_executor(self.executor, _infer_worker, batch)
+            if len(outputs) != len(requests):
+                raise Exception(f"The model returned {len(outputs)} outputs for a batch of {len(requests)} samples")
+        except Exception as e:
+            for _, future, _ in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.statistics.add_batch(len(requests))
+        end = time.perf_counter()
+        for (_, future, arrival), output in zip(requests, outputs):
+            if not future.done():
+                future.set_result(output)
+            self.statistics.add_latency(end - arrival)
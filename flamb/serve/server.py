@@ -0,0 +1,78 @@
+"""
+This file defines a Server answering inference requests on a socket, and a load generator
+"""
+
+import asyncio
+import json
+import time
+import numpy as np
+from .statistics import ServingStatistics
+
+
+class Server:
+    """
+    Serves a DynamicBatcher on a TCP socket. The protocol is line-based JSON: each request is a line
+    {"inputs": sample}, answered by a line {"outputs": output} (or {"error": message}).
+    A connection can send several requests, they are answered in order
+    """
+
+    def __init__(self, batcher, host="127.0.0.1", port=0):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        """Starts the batcher and the server, self.port is then the port actually used"""
+        await self.batcher.start()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.batcher.stop()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    output = await self.batcher.predict(json.loads(line)["inputs"])
+                    response = {"outputs": output.tolist()}
+                except Exception as e:
+                    response = {"error": repr(e)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def generate_load(host, port, samples, nb_clients=8):
+    """
+    Sends the samples (a list of array-likes) to a Server from nb_clients concurrent connections, each sending
+    its requests one after the other. Returns the outputs (in the order of samples) and the statistics of the
+    latencies measured by the clients
+    """
+    statistics = ServingStatistics()
+    outputs = [None] * len(samples)
+
+    async def client(indices):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for index in indices:
+                start = time.perf_counter()
+                writer.write(json.dumps({"inputs": np.asarray(samples[index]).tolist()}).encode() + b"\n")
+                await writer.drain()
+                response = json.loads(await reader.readline())
+                statistics.add_latency(time.perf_counter() - start)
+                if "error" in response:
+                    raise Exception(f"The server failed: {response['error']}")
+                outputs[index] = np.array(response["outputs"])
+        finally:
+            writer.close()
+
+    await asyncio.gather(*[client(range(i, len(samples), nb_clients)) for i in range(nb_clients)])
+    return outputs, statistics
@@ -0,0 +1,34 @@
+"""
+This file defines a ServingStatistics class, which records the latencies of requests and the sizes of batches
+"""
+
+import collections
+import numpy as np
+
+
+class ServingStatistics:
+    """Records the latency (in seconds) of each request and the size of each batch"""
+
+    def __init__(self):
+        self.latencies = []
+        self.batch_sizes = collections.Counter()
+
+    def add_batch(self, size):
+        self.batch_sizes[size] += 1
+
+    def add_latency(self, latency):
+        self.latencies.append(latency)
+
+    def report(self, percentiles=(50, 90, 99)):
+        """
+        Returns a dict with the number of requests and batches, the mean and the percentiles of the latencies
+        (in milliseconds, as "p50"...), and the histogram of the batch sizes (a dict size: number of batches)
+        """
+        report = {"requests": len(self.latencies), "batches": sum(self.batch_sizes.values())}
+        if self.latencies:
+            latencies = np.array(self.latencies) * 1e3
+            report["mean_ms"] = float(latencies.mean())
+            for percentile, value in zip(percentiles, np.percentile(latencies, percentiles)):
+                report[f"p{percentile}_ms"] = float(value)
+        report["batch_sizes"] = dict(sorted(self.batch_sizes.items()))
+        return report
@@ -2,5 +2,5 @@ from .tensor import Tensor
 from ._functions import *
 from .utils import *
 
-__all__ = ["Tensor", "zeros", "ones", "rand", "to_tensor", "matmul", "dot", "concatenate"]
+__all__ = ["Tensor", "zeros", "ones", "rand", "randn", "to_tensor", "matmul", "dot", "concatenate"]
 
@@ -1,8 +1,16 @@
 import numpy as np
 import flamb
-import random
+from flamb.random import get_generator
 from .utils import *
 
+
+def from_values(values, requires_grad=False):
+    """Creates a tensor of new variables holding the values of a numeric numpy array, in one pass"""
+    tensor = flamb.Tensor(values.shape, dtype=object)
+    tensor.reshape(-1)[:] = [flamb.Variable(value, requires_grad=requires_grad) for value in values.ravel().tolist()]
+    return tensor
+
+
 def zeros(shape, dtype=object, requires_grad=False):
     """Creates a tensor composed of zeros"""
     tensor = flamb.Tensor(shape, dtype=dtype)
@@ -19,21 +27,29 @@ def ones(shape, dtype=object, requires_grad=False):
     return tensor
 
 
-def rand(shape, dtype=object, requires_grad=False):
-    """Creates a tensor composed of random values between -1 and 1"""
-    tensor = flamb.Tensor(shape, dtype=dtype)
-    for index in loop_on_indicies(shape):
-        tensor[index] = flamb.Variable(random.uniform(-1, 1), requires_grad=requires_grad)
-    return tensor
+def rand(shape, dtype=object, requires_grad=False, generator=None):
+    """
+    Creates a tensor composed of random values between -1 and 1, drawn in one call from generator
+    (a flamb.Generator, the default generator if None)
+    """
+    return from_values(get_generator(generator).uniform(-1, 1, shape), requires_grad)
+
+
+def randn(shape, dtype=object, requires_grad=False, generator=None):
+    """Creates a tensor composed of random values drawn from the standard normal distribution (see rand)"""
+    return from_values(get_generator(generator).normal(0, 1, shape), requires_grad)
 
 
 def to_tensor(l, dtype=object, requires_grad=False):
-    """Convert an array-like object (a list or a numpy array) to a tensor"""
+    """
+    Convert an array-like object (a list or a numpy array) to a tensor.
+    Variables and Parameters are kept as they are, other values are converted to variables
+    """
     l = np.array(l, dtype=dtype)
     shape = l.shape
     tensor = flamb.Tensor(shape, dtype=dtype)
     for index in loop_on_indicies(shape):
-        if not isinstance(l[index], flamb.Variable):
+        if not isinstance(l[index], (flamb.Variable, flamb.Parameter)):
             tensor[index] = flamb.Variable(l[index], requires_grad=requires_grad)
         else:
             tensor[index] = l[index]
@@ -5,6 +5,9 @@ import numpy as np
 class Tensor(np.ndarray):
     # For the moment, Tensor can only contain flamb.Variable values
 
+    # TensorOperator that returned the tensor as a whole (a convolution for instance), None otherwise
+    last_operation = None
+
     def sum(self):
         """Computes the sum of the values of a tensor"""
         shape = self.shape
@@ -0,0 +1,4 @@
+from .trainer import Trainer
+from .callbacks import Callback, Evaluation, Checkpoint
+
+__all__ = ["Trainer", "Callback", "Evaluation", "Checkpoint"]
@@ -0,0 +1,55 @@
+"""
+This file defines the callbacks called by a Trainer during the training
+"""
+
+import pickle
+
+
+class Callback:
+    """Base class of the callbacks, whose methods are called by the Trainer with itself as first argument"""
+
+    def on_train_begin(self, trainer):
+        pass
+
+    def on_epoch_begin(self, trainer):
+        pass
+
+    def on_step_end(self, trainer):
+        """Called after each optimizer step, before the gradients are set to 0"""
+        pass
+
+    def on_epoch_end(self, trainer, metrics):
+        """Called after each epoch, metrics (a dict) can be completed"""
+        pass
+
+    def on_train_end(self, trainer):
+        pass
+
+
+class Evaluation(Callback):
+    """Adds the loss of the model on loader to the metrics, as name + "_loss", every every epochs"""
+
+    def __init__(self, loader, every=1, name="validation"):
+        self.loader = loader
+        self.every = every
+        self.name = name
+
+    def on_epoch_end(self, trainer, metrics):
+        if (trainer.epoch + 1) % self.every == 0:
+            metrics[self.name + "_loss"] = trainer.evaluate(self.loader)
+
+
+class Checkpoint(Callback):
+    """
+    Pickles the state of the trainer (see Trainer.state_dict) every every epochs, in path
+    (which can contain {epoch}, replaced with the number of the epoch)
+    """
+
+    def __init__(self, path, every=1):
+        self.path = path
+        self.every = every
+
+    def on_epoch_end(self, trainer, metrics):
+        if (trainer.epoch + 1) % self.every == 0:
+            with open(self.path.format(epoch=trainer.epoch), "wb") as file:
+                pickle.dump(trainer.state_dict(), file)
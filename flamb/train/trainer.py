@@ -0,0 +1,180 @@
+"""
+This file defines a Trainer class, which runs the training loop of a model
+"""
+
+import time
+import numpy as np
+import flamb
+from flamb.nn.utils.clip_grad import Gradients
+
+
+def default_prepare_batch(batch):
+    """Converts a batch (inputs, targets) of numpy arrays into flamb tensors"""
+    inputs, targets = batch
+    return flamb.to_tensor(inputs), flamb.to_tensor(targets)
+
+
+def split_batch(batch, micro_batch_size):
+    """Splits a batch (a tuple of arrays having the same first dimension) into micro-batches"""
+    size = len(batch[0])
+    return [tuple(array[start:start + micro_batch_size] for array in batch) for start in range(0, size, micro_batch_size)]
+
+
+class Trainer:
+    """
+    Runs the training loop of a model: forward, loss, backward and optimizer step.
+
+    Parameters:
+    - model (callable) : usually a flamb.nn.Module, whose parameters are those of the optimizer
+    - loss_fn (callable) : returns the loss (a Variable) given the output of the model and the targets
+    - optimizer (flamb.nn.optimizers.Optimizer)
+    - accumulation_steps (int) : number of batches whose gradients are accumulated before each optimizer step
+    - micro_batch_size (int) : if not None, each batch is split into micro-batches of this size, which go through
+      the forward and the backward one at a time, so that only the graph of a micro-batch is kept in memory
+    - callbacks (list of flamb.train.Callback)
+    - prepare_batch (callable) : converts a batch of the loader into a pair (inputs, targets)
+
+    The losses are weighted so that the accumulated gradients are those of the mean loss over the effective batch.
+    The time spent in each phase (data, forward, backward, optimizer) is measured, and reported in the metrics
+    of each epoch with the mean loss
+    """
+    phases = ("data", "forward", "backward", "optimizer")
+
+    def __init__(self, model, loss_fn, optimizer, accumulation_steps=1, micro_batch_size=None, callbacks=(),
+                 prepare_batch=default_prepare_batch):
+        self.model = model
+        self.loss_fn = loss_fn
+        self.optimizer = optimizer
+        self.accumulation_steps = accumulation_steps
+        self.micro_batch_size = micro_batch_size
+        self.callbacks = list(callbacks)
+        self.prepare_batch = prepare_batch
+        self.epoch = 0
+        self.step_count = 0
+        self.timings = dict.fromkeys(self.phases, 0.)
+        self.history = []
+
+    def zero_grad(self):
+        self.optimizer.zero_grad()
+
+    def call_callbacks(self, event, *args):
+        for callback in self.callbacks:
+            getattr(callback, event)(self, *args)
+
+    def set_training(self, mode):
+        if hasattr(self.model, "train"):
+            self.model.train(mode)
+
+    def forward_backward(self, batch, weight):
+        """Accumulates the gradients of weight * loss on batch, returns the loss"""
+        start = time.perf_counter()
+        inputs, targets = self.prepare_batch(batch)
+        loss = self.loss_fn(self.model(inputs), targets)
+        middle = time.perf_counter()
+        loss.backward(weight)
+        self.timings["forward"] += middle - start
+        self.timings["backward"] += time.perf_counter() - middle
+        return loss.value
+
+    def train_batch(self, batch):
+        """Accumulates the gradients of a batch of the loader, split into micro-batches if needed, returns its loss"""
+        if self.micro_batch_size is None or len(batch[0]) <= self.micro_batch_size:
+            return self.forward_backward(batch, 1 / self.accumulation_steps)
+
+        size = len(batch[0])
+        loss = 0
+        for micro_batch in split_batch(batch, self.micro_batch_size):
+            weight = len(micro_batch[0]) / size
+            loss += weight * self.forward_backward(micro_batch, weight / self.accumulation_steps)
+        return loss
+
+    def optimizer_step(self):
+        start = time.perf_counter()
+        self.optimizer.step(zero_grad=False)
+        self.step_count += 1
+        self.timings["optimizer"] += time.perf_counter() - start
+        self.call_callbacks("on_step_end")
+        self.zero_grad()
+
+    def train_epoch(self, loader):
+        """Trains the model on the batches of loader, returns the metrics of the epoch"""
+        self.timings = dict.fromkeys(self.phases, 0.)
+        losses = []
+        nb_batches = 0
+        self.set_training(True)
+        self.zero_grad()
+
+        batches = iter(loader)
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            self.timings["data"] += time.perf_counter() - start
+            if batch is None:
+                break
+            losses.append(self.train_batch(batch))
+            nb_batches += 1
+            if nb_batches % self.accumulation_steps == 0:
+                self.optimizer_step()
+
+        # The gradients of the last batches are used even if there are less than accumulation_steps of them,
+        # their losses being weighted by 1 / accumulation_steps instead of 1 / (number of batches)
+        remainder = nb_batches % self.accumulation_steps
+        if remainder:
+            gradients = Gradients(self.optimizer)
+            for array in gradients.arrays:
+                array *= self.accumulation_steps / remainder
+            self.optimizer_step()
+
+        metrics = {"epoch": self.epoch, "loss": float(np.mean(losses)) if losses else float("nan")}
+        metrics.update({f"time_{phase}": duration for phase, duration in self.timings.items()})
+        return metrics
+
+    def fit(self, loader, epochs=1):
+        """Trains the model for epochs epochs, returns the list of the metrics of each epoch"""
+        self.call_callbacks("on_train_begin")
+        for _ in range(epochs):
+            self.call_callbacks("on_epoch_begin")
+            metrics = self.train_epoch(loader)
+            self.call_callbacks("on_epoch_end", metrics)
+            self.history.append(metrics)
+            self.epoch += 1
+        self.call_callbacks("on_train_end")
+        return self.history
+
+    def evaluate(self, loader):
+        """
+        Returns the mean loss of the model on the batches of loader (nan if it is empty), without computing gradients.
+        The model is evaluated in evaluation mode, then put back in the mode it was in
+        """
+        training = getattr(self.model, "training", True)
+        self.set_training(False)
+        total, size = 0., 0
+        try:
+            with flamb.no_grad():
+                for batch in loader:
+                    inputs, targets = self.prepare_batch(batch)
+                    total += self.loss_fn(self.model(inputs), targets).value * len(batch[0])
+                    size += len(batch[0])
+        finally:
+            self.set_training(training)
+        return total / size if size else float("nan")
+
+    def state_dict(self):
+        """Returns the values of the parameters, the state of the optimizer and the progress of the training"""
+        storage = self.optimizer.storage
+        return {
+            "epoch": self.epoch,
+            "step_count": self.step_count,
+            "values": storage.values.copy(),
+            "sparse_values": [param.data.copy() for param in storage.sparse_parameters],
+            "optimizer": self.optimizer.state_dict(),
+        }
+
+    def load_state_dict(self, state_dict):
+        storage = self.optimizer.storage
+        self.epoch = state_dict["epoch"]
+        self.step_count = state_dict["step_count"]
+        storage.values[...] = state_dict["values"]
+        for param, values in zip(storage.sparse_parameters, state_dict["sparse_values"]):
+            param.data[...] = values
+        self.optimizer.load_state_dict(state_dict["optimizer"])
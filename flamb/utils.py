@@ -1,5 +1,9 @@
 import flamb
 
+# The autograd modules import these helpers with `from flamb.utils import *`:
+# checkpoint and checkpoint_sequential are imported explicitly
+__all__ = ["convert_variable", "convert_variable_list"]
+
 
 def convert_variable(var):
     """
@@ -21,3 +25,41 @@ def convert_variable_list(l):
     Works the same way as convert_variable but for a list of variables
     """
     return [convert_variable(var) for var in l]
+
+
+def checkpoint(fn, *inputs):
+    """
+    Returns fn(*inputs) (a tensor) without keeping the intermediate values of fn for the backward:
+    they are computed again during the backward, which costs one more forward of fn but saves memory.
+    The states of the generators which draw numbers in fn are recorded when they draw, and restored before fn
+    is run again, so that a Dropout layer in training mode draws the same mask, whichever generator it uses
+    """
+    from flamb.autograd.checkpoint import CheckpointOperator
+
+    if not flamb.is_grad_enabled():
+        return fn(*inputs)
+    return CheckpointOperator(fn)(*inputs)
+
+
+def checkpoint_sequential(functions, segments, x):
+    """
+    Applies the functions (layers, modules...) one after the other on x, in segments groups of consecutive functions.
+    Only the inputs of the segments are kept for the backward: the activations inside a segment are recomputed
+    (see checkpoint), except in the last segment, whose backward comes first.
+    With segments close to sqrt(len(functions)), the memory of the activations grows with the square root of the depth
+    """
+    functions = list(functions)
+    size = -(-len(functions) // segments)
+
+    def run_segment(segment):
+        def run(x):
+            for function in segment:
+                x = function(x)
+            return x
+        return run
+
+    starts = range(0, len(functions), size)
+    for start in starts:
+        segment = functions[start:start + size]
+        x = checkpoint(run_segment(segment), x) if start != starts[-1] else run_segment(segment)(x)
+    return x
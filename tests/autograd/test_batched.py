@@ -0,0 +1,60 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb import functional as F
+from flamb.autograd import per_sample_grad, jacobian
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.conv = nn.Conv1d(2, 4, kernel_size=3, groups=2)
+        self.norm = nn.LayerNorm(12)
+        self.linear = nn.Linear(12, 5)
+        self.linear2 = nn.Linear(5, 2)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        x = self.norm(self.conv(x).reshape(-1, 12))
+        return self.linear2(F.tanh(self.linear(x)))
+
+
+def mean_squared_error(output, target):
+    diff = (output - target) ** 2
+    return diff.sum() / diff.size
+
+
+def grads_of(layer, attribute):
+    return np.array([var.grad for var in getattr(layer, attribute).flat]).reshape(getattr(layer, attribute).shape)
+
+
+def test_per_sample_grad():
+    """The per-example gradients are those of separate backward passes, and the parameters get no gradient"""
+    model = Model()
+    optimizer = nn.optimizers.SGD(model.parameters)
+    x, y = np.random.normal(size=(6, 2, 5)), np.random.normal(size=(6, 2))
+    grads = per_sample_grad(model, mean_squared_error, (flamb.to_tensor(x), y))
+    assert set(grads) == {f"{layer}.{attribute}" for layer in ["conv", "norm", "linear", "linear2"] for attribute in ["weights", "bias"]}
+    assert np.all(optimizer.storage.grads == 0)
+
+    for i in range(len(x)):
+        optimizer.zero_grad()
+        mean_squared_error(model(flamb.to_tensor(x[i:i + 1])), y[i:i + 1]).backward()
+        for name, layer in model.named_layers():
+            for attribute in ["weights", "bias"]:
+                assert np.allclose(grads[f"{name}.{attribute}"][i], grads_of(layer, attribute)), f"{name}.{attribute}"
+
+
+def test_jacobian():
+    linear = nn.Linear(3, 4)
+    weights, bias = flamb.autograd.operators.get_value(linear.weights), flamb.autograd.operators.get_value(linear.bias)
+    x = np.random.normal(size=(5, 3))
+    result = jacobian(lambda inputs: F.tanh(linear(inputs)), x)
+    assert result.shape == (5, 4, 3)
+    derivatives = 1 - np.tanh(x @ weights + bias) ** 2
+    assert np.allclose(result, derivatives[:, :, None] * weights.T[None])
+
+
+if __name__ == '__main__':
+    test_per_sample_grad()
+    test_jacobian()
@@ -0,0 +1,101 @@
+import flamb
+from flamb import Variable, Parameter
+from flamb.autograd import FlatParameters
+import numpy as np
+import copy
+import pickle
+
+
+def test_variables():
+    """The variables keep their identity, and their value and gradient are stored in the flat arrays"""
+    x = Variable(4)
+    y = Variable(2)
+    first_id = id(x)
+    storage = FlatParameters(flamb.to_tensor([x, y]))
+    assert id(x) == first_id and isinstance(x, Variable)
+    assert storage.values.tolist() == [4, 2]
+
+    loss = x**2 + 3 * y
+    loss.backward()
+    assert storage.grads.tolist() == [8, 3]
+    assert x.grad == 8
+
+    storage.values -= 1
+    assert x == 3 and y == 1
+
+    storage.zero_grad()
+    assert x.grad == 0
+
+
+def test_parameters():
+    """The data and the gradient of the Parameters are views of the flat arrays"""
+    x = Variable(1)
+    param = Parameter(np.array([[1, 2], [3, 4]]))
+    storage = FlatParameters(flamb.to_tensor([x, param]))
+    assert storage.values.tolist() == [1, 1, 2, 3, 4]
+
+    param.add_grad(np.ones((2, 2)))
+    assert storage.grads.tolist() == [0, 1, 1, 1, 1]
+    storage.values *= 2
+    assert param.data.tolist() == [[2, 4], [6, 8]]
+
+    storage.zero_grad()
+    assert param.grad is None and not storage.grads.any()
+
+
+def test_sparse_parameters():
+    """Sparse Parameters are not stored in the flat arrays"""
+    param = Parameter(np.zeros((1000, 4)), sparse=True)
+    storage = FlatParameters(flamb.to_tensor([Variable(1), param]))
+    assert len(storage) == 1
+    assert storage.sparse_parameters == [param]
+
+
+def test_copy():
+    """The copies of the stored variables hold their own storage"""
+    x = Variable(4)
+    storage = FlatParameters(flamb.to_tensor([x, Variable(2)]))
+    y = copy.deepcopy(x)
+    assert not hasattr(x, "__dict__")
+    storage.values += 1
+    assert x == 5 and y == 4
+    z = pickle.loads(pickle.dumps(x))
+    assert z == 5 and z.grad == 0
+
+
+def test_second_storage():
+    """A variable already stored cannot be given to a second FlatParameters"""
+    x = Variable(4)
+    FlatParameters(flamb.to_tensor([x]))
+    try:
+        FlatParameters(flamb.to_tensor([x, Variable(2)]))
+    except Exception:
+        pass
+    else:
+        raise AssertionError("A variable should not be stored twice")
+
+
+def test_frozen_variables():
+    """The gradients of a whole tensor of stored variables are not added to the frozen ones"""
+    linear = flamb.nn.Linear(3, 2)
+    storage = FlatParameters(linear.get_parameters())
+    linear.weights.flat[0].requires_grad = False
+    linear.weights.flat[1].requires_grad = False
+    linear(flamb.to_tensor(np.ones((4, 3)))).sum().backward()
+    grads = np.array([var.grad for var in linear.weights.flat])
+    assert grads[0] == 0 and grads[1] == 0 and np.all(grads[2:] != 0)
+
+    storage.zero_grad()
+    for var in linear.weights.flat:
+        var.requires_grad = False
+    linear(flamb.to_tensor(np.ones((4, 3)))).sum().backward()
+    assert all(var.grad == 0 for var in linear.weights.flat)
+
+
+if __name__ == "__main__":
+    test_variables()
+    test_parameters()
+    test_sparse_parameters()
+    test_copy()
+    test_second_storage()
+    test_frozen_variables()
@@ -0,0 +1,57 @@
+import numpy as np
+import flamb
+from flamb.autograd import Function
+from flamb.autograd.operators import get_value
+
+
+class Softplus(Function):
+    @staticmethod
+    def forward(ctx, x, beta):
+        ctx.beta = float(beta)
+        ctx.save_for_backward(x)
+        return np.logaddexp(0, beta * x) / beta
+
+    @staticmethod
+    def backward(ctx, grad):
+        x, = ctx.saved_tensors
+        assert ctx.needs_input_grad == (True, False)
+        return grad / (1 + np.exp(-ctx.beta * x)), None
+
+
+class MatmulAndSum(Function):
+    """Two outputs: a @ b and the sum of a"""
+
+    @staticmethod
+    def forward(ctx, a, b):
+        ctx.save_for_backward(a, b)
+        return a @ b, a.sum().reshape(1)
+
+    @staticmethod
+    def backward(ctx, grad_product, grad_sum):
+        a, b = ctx.saved_tensors
+        return grad_product @ b.T + grad_sum, a.T @ grad_product
+
+
+def test_function():
+    x = flamb.to_tensor(np.random.normal(size=(3, 4)), requires_grad=True)
+    y = Softplus.apply(x, 2)
+    assert isinstance(y, flamb.Tensor) and y.shape == (3, 4)
+    assert np.allclose(get_value(y), np.log(1 + np.exp(2 * get_value(x))) / 2)
+    y.sum().backward()
+    grads = np.array([var.grad for var in x.flat]).reshape(x.shape)
+    assert np.allclose(grads, 1 / (1 + np.exp(-2 * get_value(x))))
+
+
+def test_several_outputs():
+    """The outputs can be used by other operations, and the Function composes with Variables"""
+    a_values, b_values = np.random.normal(size=(2, 3)), np.random.normal(size=(3, 2))
+    a, b = flamb.to_tensor(a_values, requires_grad=True), flamb.to_tensor(b_values, requires_grad=True)
+    product, total = MatmulAndSum.apply(a, b)
+    (product.sum() * 2 + total.sum() * 3).backward()
+    assert np.allclose([var.grad for var in a.flat], (2 * np.ones((2, 2)) @ b_values.T + 3).ravel())
+    assert np.allclose([var.grad for var in b.flat], (a_values.T @ (2 * np.ones((2, 2)))).ravel())
+
+
+if __name__ == '__main__':
+    test_function()
+    test_several_outputs()
@@ -14,5 +14,19 @@ def test_no_grad():
     ), "flamb.environ['is_grad_enabled'] should has turned back to True"
 
 
+def test_environ():
+    """Setting flamb.environ directly changes the mode of the Variables and of the TensorOperators"""
+    x = flamb.to_tensor([1., 2.], requires_grad=True)
+    flamb.environ["is_grad_enabled"] = False
+    try:
+        assert not flamb.is_grad_enabled()
+        assert not (Variable(2) * 3).requires_grad
+        assert not flamb.nn.Linear(2, 1)(x).flat[0].requires_grad
+    finally:
+        flamb.environ["is_grad_enabled"] = True
+    assert (Variable(2) * 3).requires_grad and flamb.is_grad_enabled()
+
+
 if __name__ == "__main__":
     test_no_grad()
+    test_environ()
@@ -1,5 +1,6 @@
 from flamb.autograd.operators import *
 from flamb import Variable
+import flamb
 
 import math
 
@@ -99,6 +100,29 @@ def test_ReLU():
     assert operator.gradient() == [0], "Gradient is not correct"
 
 
+class SquareOperator(TensorOperator):
+    def forward(self, x):
+        self.x = x
+        return x ** 2
+
+    def backward(self, grad):
+        return 2 * self.x * grad
+
+
+def test_tensor_operator():
+    """Test that the gradient of a TensorOperator is computed once for all its outputs"""
+    x = flamb.to_tensor([1, 2, 3], requires_grad=True)
+    y = SquareOperator()(x)
+    assert y.last_operation is not None
+    assert [var.value for var in y] == [1, 4, 9]
+
+    # The output is used by scalar operations and by another TensorOperator
+    z = SquareOperator()(y)
+    loss = y[0] * 3 + z.sum()
+    loss.backward()
+    assert [var.grad for var in x] == [2 * 1 * (3 + 2 * 1), 2 * 2 * (2 * 4), 2 * 3 * (2 * 9)]
+
+
 if __name__ == "__main__":
     test_sum()
     test_product()
@@ -109,4 +133,5 @@ if __name__ == "__main__":
     test_sin()
     test_tan()
     test_tanh()
-    test_ReLU()
\ No newline at end of file
+    test_ReLU()
+    test_tensor_operator()
\ No newline at end of file
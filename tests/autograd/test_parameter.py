@@ -0,0 +1,45 @@
+import flamb
+from flamb import Parameter
+from flamb.autograd import SparseGrad
+import numpy as np
+
+
+def test_coalesce():
+    """Test that the rows of a SparseGrad with the same index are summed"""
+    grad = SparseGrad([3, 1, 3], [[1, 2], [3, 4], [5, 6]]).coalesce()
+    assert grad.indices.tolist() == [1, 3]
+    assert grad.values.tolist() == [[3, 4], [6, 8]]
+    assert grad.to_dense((4, 2)).tolist() == [[0, 0], [3, 4], [0, 0], [6, 8]]
+
+
+def test_add_grad():
+    param = Parameter(np.zeros((4, 2)))
+    assert param.grad is None
+    param.add_grad(SparseGrad([1], [[1, 1]]))
+    param.add_grad(SparseGrad([1, 2], [[1, 1], [2, 2]]))
+    assert isinstance(param.grad, SparseGrad)
+    assert param.dense_grad().tolist() == [[0, 0], [2, 2], [2, 2], [0, 0]]
+
+    param.add_grad(np.ones((4, 2)))
+    assert param.grad.tolist() == [[1, 1], [3, 3], [3, 3], [1, 1]]
+
+    # A SparseGrad added to a dense gradient
+    param.add_grad(SparseGrad([0, 0], [[1, 1], [1, 1]]))
+    assert param.grad.tolist() == [[3, 3], [3, 3], [3, 3], [1, 1]]
+    assert (np.zeros((4, 2)) + SparseGrad([3], [[1, 2]])).tolist() == [[0, 0], [0, 0], [0, 0], [1, 2]]
+
+    param.reset_state(requires_grad=True)
+    assert param.grad is None
+
+
+def test_to_tensor():
+    """A Parameter is not converted to a variable when put in a tensor"""
+    param = Parameter(np.zeros(3))
+    tensor = flamb.to_tensor([param])
+    assert tensor[0] is param
+
+
+if __name__ == "__main__":
+    test_coalesce()
+    test_add_grad()
+    test_to_tensor()
@@ -1,6 +1,8 @@
 import flamb
 from flamb import Variable
 from flamb import functional as F
+from flamb.autograd.operators import ProductOperator
+from flamb.autograd.variable import arena
 import math
 
 
@@ -201,6 +203,49 @@ def test_inplace():
     assert first_id == current_id
 
 
+def test_slots():
+    """Variables have no __dict__, and the operators of the scalar operations are built when they are read"""
+    x = Variable(2)
+    y = x * 3
+    assert not hasattr(x, "__dict__")
+    assert y.parents == (x, 3) and y.op is not None
+    assert isinstance(y.last_operation, ProductOperator) and y.last_operation.gradient() == [3, 2]
+    assert y.dtype is int and Variable(2, dtype=float).value == 2.0
+
+
+def test_dtype():
+    """The value is converted to the dtype given, and the dtype of a Variable is the type of its value"""
+    assert Variable(2).dtype is int and Variable(2.5).dtype is float
+    x = Variable(2, dtype=float)
+    assert x.dtype is float and isinstance(x.value, float)
+    y = Variable(2.7, dtype=int)
+    assert y.dtype is int and y.value == 2
+    assert (x * 3).dtype is float
+
+
+def test_arena():
+    """The results of the operations made in an arena are reused by the next operations"""
+    x = Variable(3, requires_grad=True)
+    with arena():
+        y = x * x + 1
+        y.backward()
+        recycled = {id(y)}
+    assert x.grad == 6
+    z = x * 2
+    assert id(z) in recycled or id(z) == id(y), "The result should reuse a recycled variable"
+    assert z.value == 6 and z.grad == 0
+    z.backward()
+    assert x.grad == 8
+
+
+def test_nested_no_grad():
+    with flamb.no_grad():
+        with flamb.no_grad():
+            pass
+        assert not (Variable(1) * 2).requires_grad
+    assert (Variable(1) * 2).requires_grad
+
+
 if __name__ == "__main__":
     test_equality_operators()
     test_operators()
@@ -209,3 +254,7 @@ if __name__ == "__main__":
     test_difficult_gradients()
     test_reset_state()
     test_inplace()
+    test_slots()
+    test_dtype()
+    test_arena()
+    test_nested_no_grad()
@@ -0,0 +1,64 @@
+import numpy as np
+from flamb.data import DataLoader, TensorDataset, IterableDataset
+
+
+def collect(loader):
+    return [batch[0] for batch in loader]
+
+
+def test_batching():
+    dataset = TensorDataset(np.arange(10), np.arange(10) * 2)
+    batches = collect(DataLoader(dataset, batch_size=4))
+    assert [batch.tolist() for batch in batches] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+    loader = DataLoader(dataset, batch_size=4, drop_last=True)
+    assert len(loader) == 2 and len(collect(loader)) == 2
+
+    loader = DataLoader(dataset, batch_size=4, collate_fn=lambda samples: (np.array([x for x, _ in samples]),))
+    assert [batch.tolist() for batch in collect(loader)] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_shuffle():
+    dataset = TensorDataset(np.arange(100), np.arange(100) * 2)
+    loader = DataLoader(dataset, batch_size=16, shuffle=True, seed=0)
+    first_epoch = np.concatenate(collect(loader))
+    second_epoch = np.concatenate(collect(loader))
+    assert sorted(first_epoch) == list(range(100)) and sorted(second_epoch) == list(range(100))
+    assert not np.all(first_epoch == second_epoch), "Each epoch should visit the samples in a new order"
+    for x, y in loader:
+        assert np.all(y == 2 * x), "The arrays should be shuffled together"
+
+
+def test_workers():
+    """The batches prepared by workers are the same, in the same order"""
+    dataset = TensorDataset(np.arange(50.).reshape(25, 2))
+    expected = collect(DataLoader(dataset, batch_size=3, shuffle=True, seed=1))
+    for worker_type in ["thread", "process"]:
+        loader = DataLoader(dataset, batch_size=3, shuffle=True, seed=1, num_workers=2, worker_type=worker_type)
+        batches = collect(loader)
+        assert len(batches) == len(expected)
+        assert all(np.all(batch == reference) for batch, reference in zip(batches, expected)), worker_type
+
+    # Stopping the iteration early releases the workers
+    for batch in DataLoader(dataset, batch_size=3, num_workers=2):
+        break
+
+
+def test_iterable_dataset():
+    class Stream(IterableDataset):
+        def __iter__(self):
+            for i in range(7):
+                yield np.array([i, -i])
+
+    for num_workers in [0, 1]:
+        batches = list(DataLoader(Stream(), batch_size=3, num_workers=num_workers))
+        assert [batch.shape for batch in batches] == [(3, 2), (3, 2), (1, 2)]
+        assert np.all(batches[1][:, 0] == [3, 4, 5])
+        assert len(list(DataLoader(Stream(), batch_size=3, drop_last=True, num_workers=num_workers))) == 2
+
+
+if __name__ == '__main__':
+    test_batching()
+    test_shuffle()
+    test_workers()
+    test_iterable_dataset()
@@ -0,0 +1,34 @@
+import numpy as np
+from flamb.data import Dataset, TensorDataset, default_collate
+
+
+def test_tensor_dataset():
+    x, y = np.arange(12.).reshape(6, 2), np.arange(6)
+    dataset = TensorDataset(x, y)
+    assert len(dataset) == 6
+    sample = dataset[2]
+    assert np.all(sample[0] == x[2]) and sample[1] == 2
+
+    batch_x, batch_y = dataset.get_batch(np.array([4, 1]))
+    assert np.all(batch_x == x[[4, 1]]) and np.all(batch_y == [4, 1])
+
+
+def test_default_collate():
+    class Squares(Dataset):
+        def __len__(self):
+            return 4
+
+        def __getitem__(self, index):
+            return {"x": np.full(3, index, dtype=np.float32), "y": index ** 2}
+
+    batch = Squares().get_batch(np.array([1, 3]))
+    assert batch["x"].shape == (2, 3) and batch["x"].dtype == np.float32
+    assert np.all(batch["y"] == [1, 9])
+
+    x, y = default_collate([(np.zeros(2), 1.), (np.ones(2), 2.)])
+    assert np.all(x == [[0, 0], [1, 1]]) and np.all(y == [1., 2.])
+
+
+if __name__ == '__main__':
+    test_tensor_dataset()
+    test_default_collate()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import numpy as np
+from flamb.data import DataLoader, NpyDataset, BinaryDataset, CSVDataset
+
+
+def test_npy_dataset():
+    with tempfile.TemporaryDirectory() as directory:
+        x, y = np.arange(20.).reshape(10, 2), np.arange(10)
+        np.save(os.path.join(directory, "x.npy"), x)
+        np.save(os.path.join(directory, "y.npy"), y)
+        dataset = NpyDataset(os.path.join(directory, "x.npy"), os.path.join(directory, "y.npy"))
+        assert isinstance(dataset.arrays[0], np.memmap) and len(dataset) == 10
+
+        batch_x, batch_y = dataset.get_batch(np.arange(4, 8))
+        assert np.shares_memory(batch_x, dataset.arrays[0]), "Consecutive indices should give a view"
+        assert np.all(batch_x == x[4:8]) and np.all(batch_y == y[4:8])
+
+        batches = list(DataLoader(dataset, batch_size=4, shuffle=True, seed=0))
+        assert sorted(np.concatenate([batch_y for _, batch_y in batches])) == list(range(10))
+        del dataset, batches, batch_x, batch_y
+
+
+def test_binary_dataset():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.bin")
+        data = np.arange(24, dtype=np.float32).reshape(4, 2, 3)
+        with open(path, "wb") as file:
+            file.write(b"head")
+            file.write(data.tobytes())
+        dataset = BinaryDataset(path, np.float32, sample_shape=(2, 3), offset=4)
+        assert len(dataset) == 4 and np.all(dataset[2][0] == data[2])
+        del dataset
+
+
+def test_csv_dataset():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.csv")
+        rows = np.arange(33.).reshape(11, 3)
+        np.savetxt(path, rows, delimiter=",", header="a,b,target", comments="")
+
+        # Batches overlap the chunks of 4 rows
+        dataset = CSVDataset(path, target_columns=[2], chunk_size=4)
+        batches = list(DataLoader(dataset, batch_size=3))
+        assert [len(features) for features, _ in batches] == [3, 3, 3, 2]
+        assert np.all(np.concatenate([features for features, _ in batches]) == rows[:, :2])
+        assert np.all(np.concatenate([targets for _, targets in batches]) == rows[:, 2:])
+
+        batches = list(DataLoader(CSVDataset(path, chunk_size=2), batch_size=5, drop_last=True, num_workers=1))
+        assert np.all(np.concatenate(batches) == rows[:10])
+
+        samples = list(CSVDataset(path, chunk_size=4))
+        assert len(samples) == 11 and np.all(samples[5] == rows[5])
+
+
+if __name__ == '__main__':
+    test_npy_dataset()
+    test_binary_dataset()
+    test_csv_dataset()
@@ -14,7 +14,7 @@ def test_exp():
 
     l = flamb.to_tensor([[1, 2, 3], [4, 5, 6]])
     l = F.exp(l)
-    assert l[0][0] == math.exp(1)
+    assert math.isclose(l[0][0].value, math.exp(1))
 
 
 def test_cos():
@@ -26,7 +26,7 @@ def test_cos():
 
     l = flamb.to_tensor([[1, 2, 3], [4, 5, 6]])
     l = F.cos(l)
-    assert l[0][0] == math.cos(1)
+    assert math.isclose(l[0][0].value, math.cos(1))
 
 
 def test_sin():
@@ -38,7 +38,7 @@ def test_sin():
 
     l = flamb.to_tensor([[1, 2, 3], [4, 5, 6]])
     l = F.sin(l)
-    assert l[0][0] == math.sin(1)
+    assert math.isclose(l[0][0].value, math.sin(1))
 
 
 def test_tan():
@@ -50,7 +50,7 @@ def test_tan():
 
     l = flamb.to_tensor([[1, 2, 3], [4, 5, 6]])
     l = F.tan(l)
-    assert l[0][0] == math.tan(1)
+    assert math.isclose(l[0][0].value, math.tan(1))
 
 
 def test_tanh():
@@ -62,7 +62,7 @@ def test_tanh():
 
     l = flamb.to_tensor([[1, 2, 3], [4, 5, 6]])
     l = F.tanh(l)
-    assert l[0][0] == math.tanh(1)
+    assert math.isclose(l[0][0].value, math.tanh(1))
 
 
 def test_inplace():
@@ -72,10 +72,22 @@ def test_inplace():
     assert l[0][0] != math.tanh(1)
 
 
+def test_tensor_gradient():
+    """The gradients of the functions applied on tensors are the ones of the scalar functions"""
+    for function in [F.exp, F.cos, F.sin, F.tan, F.tanh, F.ReLU]:
+        l = flamb.to_tensor([[0.5, -1.], [2., 0.1]], requires_grad=True)
+        function(l).sum().backward()
+        for var in l.flat:
+            x = Variable(var.value)
+            function(x).backward()
+            assert abs(var.grad - x.grad) < 1e-12, f"Wrong gradient for {function.__name__}"
+
+
 if __name__ == "__main__":
     test_exp()
     test_cos()
     test_sin()
     test_tan()
     test_tanh()
-    test_inplace()
\ No newline at end of file
+    test_inplace()
+    test_tensor_gradient()
\ No newline at end of file
@@ -0,0 +1,128 @@
+import flamb
+from flamb import nn
+import numpy as np
+
+
+def values(tensor):
+    return np.array([var.value for var in tensor.flat]).reshape(tensor.shape)
+
+
+def grads(tensor):
+    return np.array([var.grad for var in tensor.flat]).reshape(tensor.shape)
+
+
+def naive_conv(x, weights, bias, stride, padding, dilation, groups):
+    """Convolution computed with loops on the output positions and on the kernel positions"""
+    nb_dim = len(weights.shape) - 2
+    x = np.pad(x, ((0, 0), (0, 0)) + tuple((p, p) for p in padding))
+    kernel_size = weights.shape[2:]
+    out_size = tuple(
+        (x.shape[2 + i] - dilation[i] * (kernel_size[i] - 1) - 1) // stride[i] + 1 for i in range(nb_dim)
+    )
+    out_channels = weights.shape[0]
+    in_group, out_group = x.shape[1] // groups, out_channels // groups
+    out = np.zeros((x.shape[0], out_channels) + out_size)
+    for position in np.ndindex(*out_size):
+        for kernel_index in np.ndindex(*kernel_size):
+            index = tuple(position[i] * stride[i] + kernel_index[i] * dilation[i] for i in range(nb_dim))
+            for g in range(groups):
+                inputs = x[(slice(None), slice(g * in_group, (g + 1) * in_group)) + index]
+                kernel = weights[(slice(g * out_group, (g + 1) * out_group), slice(None)) + kernel_index]
+                out[(slice(None), slice(g * out_group, (g + 1) * out_group)) + position] += inputs @ kernel.T
+    return out + bias.reshape((1, out_channels) + (1,) * nb_dim)
+
+
+def test_shape():
+    x = flamb.zeros((2, 4, 10))
+    layer = nn.Conv1d(4, 6, 3, stride=2, padding=1)
+    assert layer(x).shape == (2, 6, 5)
+    assert layer.weights.shape == (6, 4, 3)
+    assert layer.get_parameters().shape == (6 * 4 * 3 + 6,)
+
+    x = flamb.zeros((2, 4, 8, 9))
+    layer = nn.Conv2d(4, 6, (3, 2), dilation=2, groups=2, bias=False)
+    assert layer(x).shape == (2, 6, 4, 7)
+    assert layer.weights.shape == (6, 2, 3, 2)
+    assert layer.get_parameters().shape == (6 * 2 * 3 * 2,)
+
+
+def test_values():
+    """Test that the convolutions give the same values as a naive implementation"""
+    x = np.random.randn(2, 4, 7)
+    layer = nn.Conv1d(4, 6, 3, stride=2, padding=1, dilation=2, groups=2)
+    output = layer(flamb.to_tensor(x))
+    target = naive_conv(x, values(layer.weights), values(layer.bias), (2,), (1,), (2,), 2)
+    assert np.allclose(values(output), target)
+
+    x = np.random.randn(2, 4, 6, 5)
+    layer = nn.Conv2d(4, 6, (3, 2), stride=(2, 1), padding=1, dilation=(1, 2), groups=2)
+    output = layer(flamb.to_tensor(x))
+    target = naive_conv(x, values(layer.weights), values(layer.bias), (2, 1), (1, 1), (1, 2), 2)
+    assert np.allclose(values(output), target)
+
+
+def test_gradients():
+    """Test that the gradients are the same as with finite differences"""
+    layer = nn.Conv2d(4, 2, 3, stride=2, padding=1, groups=2)
+    x = np.random.randn(2, 4, 5, 5)
+    coefficients = np.random.randn(2, 2, 3, 3)
+
+    def loss(x):
+        with flamb.no_grad():
+            return (values(layer(flamb.to_tensor(x))) * coefficients).sum()
+
+    inputs = flamb.to_tensor(x, requires_grad=True)
+    (layer(inputs) * coefficients).sum().backward()
+
+    eps = 1e-6
+    for index in [(0, 0, 0, 0), (1, 3, 2, 4), (0, 2, 4, 1)]:
+        shift = np.zeros(x.shape)
+        shift[index] = eps
+        expected = (loss(x + shift) - loss(x - shift)) / (2 * eps)
+        assert abs(inputs[index].grad - expected) < 1e-5
+
+    for param in [layer.weights[1, 0, 2, 1], layer.bias[0]]:
+        value = param.value
+        param.value = value + eps
+        up = loss(x)
+        param.value = value - eps
+        down = loss(x)
+        param.value = value
+        assert abs(param.grad - (up - down) / (2 * eps)) < 1e-5
+
+
+def test_chained_layers():
+    """Test that the gradient goes through several convolutions"""
+    layer1 = nn.Conv1d(2, 3, 3, padding=1)
+    layer2 = nn.Conv1d(3, 1, 3)
+    x = np.random.randn(1, 2, 6)
+
+    def loss(x):
+        with flamb.no_grad():
+            return values(layer2(layer1(flamb.to_tensor(x)))).sum()
+
+    inputs = flamb.to_tensor(x, requires_grad=True)
+    layer2(layer1(inputs)).sum().backward()
+
+    eps = 1e-6
+    for index in np.ndindex(*x.shape):
+        shift = np.zeros(x.shape)
+        shift[index] = eps
+        expected = (loss(x + shift) - loss(x - shift)) / (2 * eps)
+        assert abs(inputs[index].grad - expected) < 1e-5
+
+
+def test_no_grad():
+    layer = nn.Conv1d(2, 3, 3)
+    with flamb.no_grad():
+        output = layer(flamb.ones((1, 2, 5)))
+    assert not output[0, 0, 0].requires_grad
+    assert output[0, 0, 0].last_operation is None
+
+
+if __name__ == '__main__':
+    test_shape()
+    test_values()
+    test_gradients()
+    test_chained_layers()
+    test_no_grad()
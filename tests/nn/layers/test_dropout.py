@@ -0,0 +1,43 @@
+import flamb
+from flamb import nn
+import numpy as np
+
+
+def values(tensor):
+    return np.array([var.value for var in tensor.flat]).reshape(tensor.shape)
+
+
+def test_training():
+    layer = nn.Dropout(p=0.25, seed=0)
+    inputs = flamb.ones((40, 50), requires_grad=True)
+    output = values(layer(inputs))
+    assert set(np.unique(output)) == {0, 1 / 0.75}
+    assert abs((output == 0).mean() - 0.25) < 0.05
+
+
+def test_gradient():
+    layer = nn.Dropout(p=0.5, seed=1)
+    inputs = flamb.ones((4, 5), requires_grad=True)
+    output = layer(inputs)
+    output.sum().backward()
+    assert np.array_equal([var.grad for var in inputs.flat], values(output).ravel())
+
+
+def test_seed():
+    """Two layers with the same seed draw the same masks"""
+    x = flamb.ones((10, 10))
+    assert np.array_equal(values(nn.Dropout(seed=3)(x)), values(nn.Dropout(seed=3)(x)))
+
+
+def test_eval():
+    """In evaluation mode, the input is returned without any operation"""
+    layer = nn.Dropout(p=0.5).eval()
+    x = flamb.ones((3, 3))
+    assert layer(x) is x
+
+
+if __name__ == '__main__':
+    test_training()
+    test_gradient()
+    test_seed()
+    test_eval()
@@ -0,0 +1,45 @@
+import flamb
+from flamb import nn
+from flamb.autograd import SparseGrad
+import numpy as np
+
+
+def values(tensor):
+    return np.array([var.value for var in tensor.flat]).reshape(tensor.shape)
+
+
+def test_lookup():
+    layer = nn.Embedding(10, 3)
+    output = layer([[1, 2], [1, 9]])
+    assert output.shape == (2, 2, 3)
+    assert np.array_equal(values(output), layer.weights.data[[[1, 2], [1, 9]]])
+    assert layer.get_parameters()[0] is layer.weights
+
+
+def test_sparse_gradient():
+    """The gradient of the table only contains the rows which have been looked up"""
+    layer = nn.Embedding(1000, 2)
+    output = layer(flamb.to_tensor([4, 7, 4]))
+    (output * np.array([[1, 2], [3, 4], [5, 6]])).sum().backward()
+
+    grad = layer.weights.grad
+    assert isinstance(grad, SparseGrad)
+    grad = grad.coalesce()
+    assert grad.indices.tolist() == [4, 7]
+    assert np.allclose(grad.values, [[6, 8], [3, 4]])
+
+
+def test_gradient_through_layers():
+    """The gradient of the table flows through the layers using the embeddings"""
+    embedding = nn.Embedding(5, 4)
+    conv = nn.Conv1d(4, 2, 2)
+    output = conv(embedding([[0, 3, 3]]).transpose(0, 2, 1))
+    output.sum().backward()
+    assert np.allclose(embedding.weights.dense_grad()[[1, 2, 4]], 0)
+    assert not np.allclose(embedding.weights.dense_grad()[3], 0)
+
+
+if __name__ == '__main__':
+    test_lookup()
+    test_sparse_gradient()
+    test_gradient_through_layers()
@@ -1,5 +1,7 @@
+import numpy as np
 import flamb
 from flamb import nn
+from flamb.autograd.operators import get_value
 
 
 def test_shape():
@@ -47,7 +49,24 @@ def test_get_parameters():
     assert parameters[5] == 0
 
 
+def test_gradient():
+    """The gradients of the vectorized layer are the ones of the sum of its outputs"""
+    x = flamb.to_tensor(np.random.normal(size=(2, 4, 3)), requires_grad=True)
+    layer = nn.Linear(3, 5)
+    for var in layer.bias:
+        var.requires_grad = True
+    output = layer(x)
+    output.sum().backward()
+
+    weights, bias = get_value(layer.weights), get_value(layer.bias)
+    assert np.allclose(get_value(output), get_value(x) @ weights + bias)
+    assert np.allclose([[[var.grad for var in row] for row in matrix] for matrix in x], np.tile(weights.sum(axis=1), (2, 4, 1)))
+    assert np.allclose([[var.grad for var in row] for row in layer.weights], np.tile(get_value(x).sum(axis=(0, 1))[:, None], (1, 5)))
+    assert np.allclose([var.grad for var in layer.bias], 8)
+
+
 if __name__ == '__main__':
     test_shape()
     test_values()
-    test_get_parameters()
\ No newline at end of file
+    test_get_parameters()
+    test_gradient()
\ No newline at end of file
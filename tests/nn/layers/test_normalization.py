@@ -0,0 +1,107 @@
+import flamb
+from flamb import nn
+from flamb.nn.layers.utils import mean_var
+import numpy as np
+
+
+def values(tensor):
+    return np.array([var.value for var in tensor.flat]).reshape(tensor.shape)
+
+
+def grads(tensor):
+    return np.array([var.grad for var in tensor.flat]).reshape(tensor.shape)
+
+
+def test_mean_var():
+    """The one pass statistics are the same as the two pass ones, even with a large offset"""
+    x = np.random.randn(1000, 3) + 1e6
+    mean, var = mean_var(x, axis=0, chunk_size=64)
+    assert mean.shape == (1, 3)
+    assert np.allclose(mean, x.mean(axis=0))
+    assert np.allclose(var, x.var(axis=0))
+
+    mean, var = mean_var(x, axis=1)
+    assert mean.shape == (1000, 1)
+    assert np.allclose(var[:, 0], x.var(axis=1))
+
+
+def test_layer_norm():
+    x = np.random.randn(2, 3, 4)
+    layer = nn.LayerNorm(4)
+    inputs = flamb.to_tensor(x, requires_grad=True)
+    output = layer(inputs)
+    expected = (x - x.mean(axis=-1, keepdims=True)) / np.sqrt(x.var(axis=-1, keepdims=True) + 1e-5)
+    assert np.allclose(values(output), expected)
+
+    coefficients = np.random.randn(2, 3, 4)
+    (output * coefficients).sum().backward()
+
+    def loss(x):
+        return (layer(flamb.to_tensor(x)) * coefficients).sum().value
+
+    eps = 1e-6
+    for index in [(0, 0, 0), (1, 2, 3)]:
+        shift = np.zeros(x.shape)
+        shift[index] = eps
+        assert abs(inputs[index].grad - (loss(x + shift) - loss(x - shift)) / (2 * eps)) < 1e-5
+    assert np.allclose(grads(layer.bias), coefficients.sum(axis=(0, 1)))
+
+
+def test_batch_norm_training():
+    x = np.random.randn(8, 3, 5) * 2 + 1
+    layer = nn.BatchNorm1d(3, momentum=0.5)
+    inputs = flamb.to_tensor(x, requires_grad=True)
+    output = layer(inputs)
+    mean = x.mean(axis=(0, 2), keepdims=True)
+    var = x.var(axis=(0, 2), keepdims=True)
+    assert np.allclose(values(output), (x - mean) / np.sqrt(var + 1e-5))
+    assert np.allclose(layer.running_mean, 0.5 * mean.ravel())
+    assert np.allclose(layer.running_var, 0.5 + 0.5 * x.var(axis=(0, 2), ddof=1))
+
+    coefficients = np.random.randn(8, 3, 5)
+    (output * coefficients).sum().backward()
+
+    def loss(x):
+        layer = nn.BatchNorm1d(3)
+        return (layer(flamb.to_tensor(x)) * coefficients).sum().value
+
+    eps = 1e-6
+    for index in [(0, 0, 0), (7, 2, 4)]:
+        shift = np.zeros(x.shape)
+        shift[index] = eps
+        assert abs(inputs[index].grad - (loss(x + shift) - loss(x - shift)) / (2 * eps)) < 1e-5
+
+
+def test_batch_norm_eval():
+    """In evaluation mode, the running statistics are used"""
+    layer = nn.BatchNorm1d(2)
+    layer.running_mean = np.array([1.0, -1.0])
+    layer.running_var = np.array([4.0, 9.0])
+    layer.weights[0].value = 2
+    layer.eval()
+    assert not layer.training
+    output = layer(flamb.to_tensor([[3, 2]]))
+    assert np.allclose(values(output), [[2 * 2 / np.sqrt(4 + 1e-5), 3 / np.sqrt(9 + 1e-5)]])
+
+    layer.train()
+    assert layer.training and layer.scale is None
+
+
+def test_fold_into_linear():
+    linear = nn.Linear(4, 3)
+    batch_norm = nn.BatchNorm1d(3)
+    x = flamb.to_tensor(np.random.randn(6, 4))
+    batch_norm(linear(x))
+    batch_norm.eval()
+    expected = values(batch_norm(linear(x)))
+
+    batch_norm.fold_into(linear)
+    assert np.allclose(values(batch_norm(linear(x))), expected)
+
+
+if __name__ == '__main__':
+    test_mean_var()
+    test_layer_norm()
+    test_batch_norm_training()
+    test_batch_norm_eval()
+    test_fold_into_linear()
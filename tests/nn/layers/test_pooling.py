@@ -0,0 +1,58 @@
+import flamb
+from flamb import nn
+import numpy as np
+
+
+def values(tensor):
+    return np.array([var.value for var in tensor.flat]).reshape(tensor.shape)
+
+
+def grads(tensor):
+    return np.array([var.grad for var in tensor.flat]).reshape(tensor.shape)
+
+
+def test_shape():
+    assert nn.MaxPool1d(2)(flamb.zeros((2, 3, 9))).shape == (2, 3, 4)
+    assert nn.AvgPool1d(3, stride=1, padding=1)(flamb.zeros((2, 3, 9))).shape == (2, 3, 9)
+    assert nn.MaxPool2d(2)(flamb.zeros((2, 3, 6, 5))).shape == (2, 3, 3, 2)
+    assert nn.AvgPool2d((2, 3), stride=1)(flamb.zeros((2, 3, 6, 5))).shape == (2, 3, 5, 3)
+
+
+def test_max_pool():
+    x = np.random.randn(2, 3, 6, 4)
+    layer = nn.MaxPool2d(2)
+    inputs = flamb.to_tensor(x, requires_grad=True)
+    output = layer(inputs)
+    expected = x.reshape(2, 3, 3, 2, 2, 2).max(axis=(3, 5))
+    assert np.allclose(values(output), expected)
+
+    output.sum().backward()
+    expected_grad = (x == expected.repeat(2, axis=2).repeat(2, axis=3)).astype(float)
+    assert np.allclose(grads(inputs), expected_grad)
+
+
+def test_max_pool_padding():
+    """Padded values are never selected by the max pooling"""
+    x = -np.ones((1, 1, 3))
+    output = nn.MaxPool1d(2, padding=1)(flamb.to_tensor(x))
+    assert np.allclose(values(output), [[[-1, -1]]])
+
+
+def test_avg_pool():
+    x = np.random.randn(2, 3, 5)
+    layer = nn.AvgPool1d(3, stride=1, padding=1)
+    inputs = flamb.to_tensor(x, requires_grad=True)
+    output = layer(inputs)
+    padded = np.pad(x, ((0, 0), (0, 0), (1, 1)))
+    expected = (padded[:, :, :-2] + padded[:, :, 1:-1] + padded[:, :, 2:]) / 3
+    assert np.allclose(values(output), expected)
+
+    output.sum().backward()
+    assert np.allclose(grads(inputs), [[[2 / 3, 1, 1, 1, 2 / 3]] * 3] * 2)
+
+
+if __name__ == '__main__':
+    test_shape()
+    test_max_pool()
+    test_max_pool_padding()
+    test_avg_pool()
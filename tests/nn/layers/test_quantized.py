@@ -0,0 +1,23 @@
+import numpy as np
+from flamb import nn, runtime
+from flamb.autograd.operators import get_value
+
+
+def test_quantized_linear():
+    """The int8 products are accumulated exactly, including when the input size needs several blocks"""
+    for input_size in [7, runtime.QUANTIZED_BLOCK_SIZE + 300]:
+        linear = nn.Linear(input_size, 4)
+        x = np.random.normal(size=(5, input_size))
+        layer = nn.QuantizedLinear(linear, input_range=np.abs(x).max())
+        assert layer.weights.dtype == np.int8 and layer.weight_scales.shape == (4,)
+
+        quantized_x = np.clip(np.rint(x * np.float32(1 / layer.input_scale)), -127, 127).astype(np.int64)
+        accumulation = quantized_x @ layer.weights.astype(np.int64)
+        expected = accumulation * (layer.input_scale * layer.weight_scales) + layer.bias
+        output = get_value(layer(x))
+        assert np.allclose(output, expected, rtol=0, atol=1e-12)
+        assert np.allclose(output, get_value(linear(x)), atol=0.05 * np.abs(expected).max())
+
+
+if __name__ == '__main__':
+    test_quantized_linear()
@@ -0,0 +1,120 @@
+import flamb
+from flamb import nn
+import numpy as np
+
+
+def values(tensor):
+    return np.array([var.value for var in tensor.flat]).reshape(tensor.shape)
+
+
+def grads(tensor):
+    return np.array([var.grad for var in tensor.flat]).reshape(tensor.shape)
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def naive_forward(layer, x, h, c=None):
+    """Runs the layer timestep by timestep, with a separate computation for each gate"""
+    weights_ih, weights_hh = values(layer.weights_ih), values(layer.weights_hh)
+    bias_ih, bias_hh = values(layer.bias_ih), values(layer.bias_hh)
+    H = layer.hidden_size
+    outputs = []
+    for t in range(x.shape[1]):
+        a = x[:, t] @ weights_ih + bias_ih
+        b = h @ weights_hh + bias_hh
+        if isinstance(layer, nn.RNN):
+            h = np.tanh(a + b)
+        elif isinstance(layer, nn.LSTM):
+            i, f = sigmoid(a[:, :H] + b[:, :H]), sigmoid(a[:, H:2 * H] + b[:, H:2 * H])
+            g, o = np.tanh(a[:, 2 * H:3 * H] + b[:, 2 * H:3 * H]), sigmoid(a[:, 3 * H:] + b[:, 3 * H:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+        else:
+            r, z = sigmoid(a[:, :H] + b[:, :H]), sigmoid(a[:, H:2 * H] + b[:, H:2 * H])
+            n = np.tanh(a[:, 2 * H:] + r * b[:, 2 * H:])
+            h = (1 - z) * n + z * h
+        outputs.append(h)
+    return np.stack(outputs, axis=1), c
+
+
+def test_shape():
+    x = flamb.zeros((2, 7, 3))
+    for layer in [nn.RNN(3, 5), nn.GRU(3, 5)]:
+        output, h_n = layer(x)
+        assert output.shape == (2, 7, 5) and h_n.shape == (2, 5)
+    output, (h_n, c_n) = nn.LSTM(3, 5)(x)
+    assert output.shape == (2, 7, 5) and h_n.shape == (2, 5) and c_n.shape == (2, 5)
+    assert nn.GRU(3, 5).get_parameters().shape == (3 * 15 + 5 * 15 + 2 * 15,)
+
+
+def test_values_and_gradients():
+    """Test the values and the gradients of the layers against a naive implementation and finite differences"""
+    for layer_class in [nn.RNN, nn.GRU, nn.LSTM]:
+        layer = layer_class(3, 4)
+        x, h, c = np.random.randn(2, 5, 3), np.random.randn(2, 4), np.random.randn(2, 4)
+        coefficients = np.random.randn(2, 5, 4)
+
+        def loss(x, h):
+            output, c_n = naive_forward(layer, x, h, c)
+            loss = (output * coefficients).sum() + output[:, -1].sum()
+            return loss + c_n.sum() if c_n is not None else loss
+
+        inputs, h0 = flamb.to_tensor(x, requires_grad=True), flamb.to_tensor(h, requires_grad=True)
+        if layer_class is nn.LSTM:
+            output, (h_n, c_n) = layer(inputs, (h0, flamb.to_tensor(c)))
+            total = (output * coefficients).sum() + h_n.sum() + c_n.sum()
+        else:
+            output, h_n = layer(inputs, h0)
+            total = (output * coefficients).sum() + h_n.sum()
+        assert np.allclose(values(output), naive_forward(layer, x, h, c)[0])
+
+        total.backward()
+        eps = 1e-6
+        for index in [(0, 0, 0), (1, 2, 1), (0, 4, 2)]:
+            shift = np.zeros(x.shape)
+            shift[index] = eps
+            expected = (loss(x + shift, h) - loss(x - shift, h)) / (2 * eps)
+            assert abs(inputs[index].grad - expected) < 1e-5
+
+        shift = np.zeros(h.shape)
+        shift[1, 2] = eps
+        expected = (loss(x, h + shift) - loss(x, h - shift)) / (2 * eps)
+        assert abs(h0[1, 2].grad - expected) < 1e-5
+
+        for param in [layer.weights_ih[2, 3], layer.weights_hh[1, 3], layer.bias_hh[2]]:
+            value = param.value
+            param.value = value + eps
+            up = loss(x, h)
+            param.value = value - eps
+            down = loss(x, h)
+            param.value = value
+            assert abs(param.grad - (up - down) / (2 * eps)) < 1e-5
+
+
+def test_truncated_bptt():
+    """With windows of 2 timesteps, the last output has no gradient with respect to the first inputs"""
+    layer = nn.LSTM(2, 3, bptt=2)
+    inputs = flamb.to_tensor(np.random.randn(1, 6, 2), requires_grad=True)
+    output, _ = layer(inputs)
+    output[0, -1].sum().backward()
+    gradients = grads(inputs)
+    assert np.all(gradients[0, :4] == 0)
+    assert np.any(gradients[0, 4:] != 0)
+
+
+def test_long_sequence():
+    """The backward pass goes through long sequences without reaching the recursion limit"""
+    layer = nn.RNN(2, 3)
+    inputs = flamb.to_tensor(np.random.randn(1, 3000, 2), requires_grad=True)
+    _, h_n = layer(inputs)
+    h_n.sum().backward()
+    assert inputs[0, -1, 0].grad != 0
+
+
+if __name__ == '__main__':
+    test_shape()
+    test_values_and_gradients()
+    test_truncated_bptt()
+    test_long_sequence()
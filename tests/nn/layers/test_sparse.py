@@ -0,0 +1,26 @@
+import numpy as np
+from flamb import nn
+from flamb.autograd.operators import get_value
+
+
+def test_sparse_linear():
+    for max_csr_density, format in [(0.001, "compact"), (1, "csr")]:
+        linear = nn.Linear(30, 20)
+        weights = get_value(linear.weights)
+        mask = np.random.uniform(size=weights.shape) < 0.05
+        mask[3] = False
+        mask[:, 5] = False
+        for var, keep in zip(linear.weights.flat, mask.ravel().tolist()):
+            if not keep:
+                var.value = 0.
+        layer = nn.SparseLinear(linear, max_csr_density)
+        assert layer.format == format and layer.nnz == mask.sum()
+        assert 3 not in layer.input_indices and 5 not in layer.output_indices
+        # A single sample (products of the nonzero weights) and a batch (dense matmul for the CSR format)
+        for shape in [(30,), (4, 7, 30)]:
+            x = np.random.normal(size=shape)
+            assert np.allclose(get_value(layer(x)), x @ (weights * mask) + get_value(linear.bias))
+
+
+if __name__ == '__main__':
+    test_sparse_linear()
@@ -0,0 +1,19 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.nn.optimizers.schedulers import CosineAnnealingLR
+
+
+def test_value():
+    optimizer = nn.optimizers.SGD(flamb.to_tensor([flamb.Variable(1.)]), learning_rate=1.)
+    scheduler = CosineAnnealingLR(optimizer, total_steps=4, min_value=0.2)
+    schedule = scheduler.schedule(6)
+    expected = 0.2 + 0.8 * (1 + np.cos(np.pi * np.minimum(np.arange(6), 4) / 4)) / 2
+    assert np.allclose(schedule, expected), f"Wrong schedule {schedule}"
+    for value in schedule:
+        optimizer.step()
+        assert np.isclose(optimizer.learning_rate, value)
+
+
+if __name__ == '__main__':
+    test_value()
@@ -0,0 +1,28 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.nn.optimizers.schedulers import LinearWarmupLR, StepLR
+
+
+def test_value():
+    optimizer = nn.optimizers.SGD(flamb.to_tensor([flamb.Variable(1.)]), learning_rate=1.)
+    scheduler = LinearWarmupLR(optimizer, warmup_steps=4, scheduler=StepLR(optimizer, step_size=2, gamma=0.5))
+    assert optimizer.schedulers == [scheduler], "The scheduler used after the warmup should be detached"
+    assert optimizer.learning_rate == 0.25, "The learning rate of the first step should be set when attaching"
+
+    expected = [0.25, 0.5, 0.75, 1., 1., 1., 0.5]
+    assert np.allclose(scheduler.schedule(7), expected)
+    for value in expected:
+        optimizer.step()
+        assert np.isclose(optimizer.learning_rate, value)
+
+
+def test_no_warmup():
+    optimizer = nn.optimizers.SGD(flamb.to_tensor([flamb.Variable(1.)]), learning_rate=1.)
+    scheduler = LinearWarmupLR(optimizer, warmup_steps=0, scheduler=StepLR(optimizer, step_size=2, gamma=0.5))
+    assert np.allclose(scheduler.schedule(4), [1., 1., 0.5, 0.5])
+
+
+if __name__ == '__main__':
+    test_value()
+    test_no_warmup()
@@ -0,0 +1,33 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.nn.optimizers.schedulers import OneCycleLR
+
+
+def test_value():
+    optimizer = nn.optimizers.Adam(flamb.to_tensor([flamb.Variable(1.)]), learning_rate=1.)
+    scheduler = OneCycleLR(optimizer, total_steps=10, pct_start=0.3, momentum=(0.85, 0.95))
+    schedule = scheduler.schedule(11)
+    assert np.isclose(schedule[0], 1 / 25) and np.isclose(schedule[3], 1.) and np.isclose(schedule[10], 1 / 25 / 1e4)
+    assert np.all(np.diff(schedule[:4]) > 0) and np.all(np.diff(schedule[3:]) < 0)
+
+    momentums = []
+    for _ in range(11):
+        optimizer.step()
+        momentums.append(optimizer.beta1)
+    assert np.isclose(momentums[0], 0.95) and np.isclose(momentums[3], 0.85) and np.isclose(momentums[10], 0.95)
+    assert np.isclose(optimizer.learning_rate, schedule[10])
+
+
+def test_short_cycle():
+    """With a warm-up or an annealing shorter than a step, the values stay finite"""
+    for total_steps, pct_start in [(3, 0.1), (2, 0.), (2, 1.), (1, 0.3)]:
+        optimizer = nn.optimizers.SGD(flamb.to_tensor([flamb.Variable(1.)]), learning_rate=1.)
+        schedule = OneCycleLR(optimizer, total_steps=total_steps, pct_start=pct_start).schedule(total_steps + 1)
+        assert np.all(np.isfinite(schedule)) and np.isclose(schedule[0], 1 / 25)
+        assert np.isclose(schedule.max(), 1.)
+
+
+if __name__ == '__main__':
+    test_value()
+    test_short_cycle()
@@ -0,0 +1,24 @@
+import flamb
+from flamb import nn
+from flamb.nn.optimizers.schedulers import ReduceLROnPlateau
+
+
+def test_report():
+    optimizer = nn.optimizers.SGD(flamb.to_tensor([flamb.Variable(1.)]), learning_rate=1.)
+    scheduler = ReduceLROnPlateau(optimizer, factor=0.5, patience=1, min_value=0.3)
+    for loss in [3., 2., 2., 2.]:
+        scheduler.report(loss)
+    assert optimizer.learning_rate == 0.5, f"The learning rate should be 0.5, not {optimizer.learning_rate}"
+    optimizer.step()
+    assert optimizer.learning_rate == 0.5
+
+    for loss in [2., 2.]:
+        scheduler.report(loss)
+    assert optimizer.learning_rate == 0.3, "The learning rate should not go below min_value"
+
+    scheduler.report(1.)
+    assert scheduler.best == 1. and scheduler.nb_bad_reports == 0
+
+
+if __name__ == '__main__':
+    test_report()
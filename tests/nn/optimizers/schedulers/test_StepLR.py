@@ -0,0 +1,42 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.nn.optimizers.schedulers import StepLR
+
+
+def test_value():
+    """The learning rate used by each step follows the schedule, and the moments of Adam are kept"""
+    x = flamb.Variable(1.)
+    optimizer = nn.optimizers.Adam(flamb.to_tensor([x]), learning_rate=1.)
+    scheduler = StepLR(optimizer, step_size=2, gamma=0.5)
+    learning_rates = []
+    for _ in range(5):
+        x.grad = 1.
+        optimizer.step()
+        learning_rates.append(optimizer.learning_rate)
+
+    assert learning_rates == [1., 1., 0.5, 0.5, 0.25], f"Wrong learning rates {learning_rates}"
+    assert np.allclose(scheduler.schedule(5), learning_rates)
+    assert np.isclose(optimizer.state["first_momentum"][0], 1 - 0.9 ** 5)
+
+
+def test_state_dict():
+    x = flamb.Variable(1.)
+    optimizer = nn.optimizers.SGD(flamb.to_tensor([x]), learning_rate=1.)
+    StepLR(optimizer, step_size=2, gamma=0.5)
+    for _ in range(3):
+        optimizer.step()
+    state_dict = optimizer.state_dict()
+
+    y = flamb.Variable(1.)
+    new_optimizer = nn.optimizers.SGD(flamb.to_tensor([y]), learning_rate=3.)
+    scheduler = StepLR(new_optimizer, step_size=10)
+    new_optimizer.load_state_dict(state_dict)
+    assert (scheduler.base_value, scheduler.step_size, scheduler.gamma) == (1., 2, 0.5)
+    new_optimizer.step()
+    assert new_optimizer.learning_rate == 0.5
+
+
+if __name__ == '__main__':
+    test_value()
+    test_state_dict()
@@ -0,0 +1,38 @@
+import flamb
+from flamb import Variable, Parameter
+from flamb.nn.optimizers import Adagrad
+import numpy as np
+
+
+def test_value():
+    """Test Adagrad against a reference implementation"""
+    values = np.array([1.0, -2.0, 3.0])
+    param = Parameter(values)
+    learning_rate, eps = 1e-1, 1e-10
+    optimizer = Adagrad(flamb.to_tensor([param]), learning_rate=learning_rate)
+
+    square_sum = np.zeros(3)
+    for t in range(1, 4):
+        grad = np.array([0.5, 1.0, -2.0]) * t
+        param.add_grad(grad)
+        optimizer.step()
+
+        square_sum += grad**2
+        values = values - learning_rate * grad / (square_sum**(1/2) + eps)
+        assert np.allclose(param.data, values)
+
+
+def test_sparse_update():
+    """With a sparse gradient, the sum of squares is only updated on the rows having a gradient"""
+    layer = flamb.nn.Embedding(10, 2)
+    optimizer = Adagrad(layer.get_parameters())
+    layer([4]).sum().backward()
+    optimizer.step()
+    square_sum = optimizer.sparse_state[0]["square_sum"]
+    assert np.allclose(square_sum[4], 1)
+    assert np.allclose(np.delete(square_sum, 4, axis=0), 0)
+
+
+if __name__ == '__main__':
+    test_value()
+    test_sparse_update()
@@ -1,4 +1,5 @@
 import flamb
+import pickle
 from flamb import Variable, Tensor
 from flamb.nn.optimizers import Adam
 
@@ -22,17 +23,62 @@ def test_value():
     loss = x**2 + y**2
     loss.backward()
     optimizer.step()
-    second_momentum_norm_sq = 8**2 + 4**2
-    new_x = 4 - learning_rate * (1 - beta1)*2*4 / ( ( (1 - beta2) * second_momentum_norm_sq ) ** (1/2) + eps)
-    new_y = 2 - learning_rate * (1 - beta1)*2*2 / ( ( (1 - beta2) * second_momentum_norm_sq ) ** (1/2) + eps)
-    assert abs(x.value - new_x) < 1e-4 # < 1e-4 for approximation errors
-    assert abs(y.value - new_y) < 1e-4
+    # With bias correction, the first step moves each variable by learning_rate * g / (|g| + eps)
+    new_x = 4 - learning_rate * 8 / (8 + eps)
+    new_y = 2 - learning_rate * 4 / (4 + eps)
+    assert abs(x.value - new_x) < 1e-10
+    assert abs(y.value - new_y) < 1e-10
+
+    loss = x**2 + y**2
+    loss.backward()
+    optimizer.step()
+    m = beta1 * (1 - beta1) * 8 + (1 - beta1) * 2 * new_x
+    v = beta2 * (1 - beta2) * 8**2 + (1 - beta2) * (2 * new_x)**2
+    m_hat, v_hat = m / (1 - beta1**2), v / (1 - beta2**2)
+    assert abs(x.value - (new_x - learning_rate * m_hat / (v_hat**(1/2) + eps))) < 1e-10
 
     assert id(x) == first_id
 
 
+def test_sparse_update():
+    """Adam only updates the rows of an embedding table having a gradient"""
+    layer = flamb.nn.Embedding(100, 2)
+    x = Variable(1)
+    initial = layer.weights.data.copy()
+    optimizer = Adam(flamb.concatenate(flamb.to_tensor([x]), layer.get_parameters()), learning_rate=1e-1)
+
+    loss = layer([7]).sum() + x**2
+    loss.backward()
+    optimizer.step()
+    changed = (layer.weights.data != initial).any(axis=1)
+    assert changed.nonzero()[0].tolist() == [7]
+    assert x != 1
+
+
+def test_state_dict():
+    """The state of the optimizer can be saved (and pickled) and restored"""
+    x = Variable(4)
+    optimizer = Adam(flamb.to_tensor([x]), learning_rate=1e-1)
+    (x**2).backward()
+    optimizer.step()
+    state = pickle.loads(pickle.dumps(optimizer.state_dict()))
+
+    y = Variable(x.value)
+    restored = Adam(flamb.to_tensor([y]))
+    restored.load_state_dict(state)
+    assert restored.learning_rate == 1e-1 and restored.step_count == 1
+
+    (x**2).backward()
+    optimizer.step()
+    (y**2).backward()
+    restored.step()
+    assert x.value == y.value
+
+
 if __name__ == '__main__':
     test_value()
+    test_sparse_update()
+    test_state_dict()
 
 
 
@@ -0,0 +1,28 @@
+import flamb
+from flamb import Parameter
+from flamb.nn.optimizers import AdamW
+import numpy as np
+
+
+def test_value():
+    """Test the decoupled weight decay against a reference implementation"""
+    values = np.array([1.0, -2.0, 3.0])
+    param = Parameter(values)
+    learning_rate, beta1, beta2, eps, weight_decay = 1e-1, 0.9, 0.999, 1e-7, 0.5
+    optimizer = AdamW(flamb.to_tensor([param]), learning_rate=learning_rate, weight_decay=weight_decay)
+
+    m, v = np.zeros(3), np.zeros(3)
+    for t in range(1, 4):
+        grad = np.array([0.5, 1.0, -2.0]) * t
+        param.add_grad(grad)
+        optimizer.step()
+
+        values = values * (1 - learning_rate * weight_decay)
+        m = beta1 * m + (1 - beta1) * grad
+        v = beta2 * v + (1 - beta2) * grad**2
+        values = values - learning_rate * (m / (1 - beta1**t)) / ((v / (1 - beta2**t))**(1/2) + eps)
+        assert np.allclose(param.data, values)
+
+
+if __name__ == '__main__':
+    test_value()
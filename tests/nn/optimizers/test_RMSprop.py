@@ -0,0 +1,27 @@
+import flamb
+from flamb import Parameter
+from flamb.nn.optimizers import RMSprop
+import numpy as np
+
+
+def test_value():
+    """Test RMSprop with momentum against a reference implementation"""
+    values = np.array([1.0, -2.0, 3.0])
+    param = Parameter(values)
+    learning_rate, alpha, eps, momentum = 1e-2, 0.9, 1e-8, 0.5
+    optimizer = RMSprop(flamb.to_tensor([param]), learning_rate=learning_rate, alpha=alpha, momentum=momentum)
+
+    square_average, buffer = np.zeros(3), np.zeros(3)
+    for t in range(1, 4):
+        grad = np.array([0.5, 1.0, -2.0]) * t
+        param.add_grad(grad)
+        optimizer.step()
+
+        square_average = alpha * square_average + (1 - alpha) * grad**2
+        buffer = momentum * buffer + grad / (square_average**(1/2) + eps)
+        values = values - learning_rate * buffer
+        assert np.allclose(param.data, values)
+
+
+if __name__ == '__main__':
+    test_value()
@@ -1,4 +1,5 @@
 import flamb
+import numpy as np
 from flamb import Variable, Tensor
 from flamb.nn.optimizers import SGD
 
@@ -24,7 +25,74 @@ def test_value():
     current_id = id(x)
     assert first_id == current_id
 
+def test_sparse_update():
+    """Only the rows of an embedding table having a gradient are updated"""
+    layer = flamb.nn.Embedding(100, 2)
+    initial = layer.weights.data.copy()
+    optimizer = SGD(layer.get_parameters(), learning_rate=1e-1)
+
+    layer([3, 5, 3]).sum().backward()
+    optimizer.step()
+    changed = (layer.weights.data != initial).any(axis=1)
+    assert changed.nonzero()[0].tolist() == [3, 5]
+    assert abs(layer.weights.data[3, 0] - (initial[3, 0] - 2e-1)) < 1e-12
+    assert layer.weights.grad is None
+
+
+def test_zero_grad():
+    """The gradients are set to 0 after each step, or with zero_grad"""
+    x = Variable(4)
+    optimizer = SGD(flamb.to_tensor([x]), learning_rate=1e-1)
+    (x**2).backward()
+    optimizer.step()
+    assert x.grad == 0
+
+    (x**2).backward()
+    optimizer.zero_grad()
+    assert x.grad == 0
+    assert optimizer.storage.grads.tolist() == [0]
+
+
+def test_momentum():
+    """Test the classical and the Nesterov momentum, with weight decay, against a reference implementation"""
+    for nesterov in [False, True]:
+        values = np.array([1.0, -2.0])
+        param = flamb.Parameter(values)
+        learning_rate, momentum, weight_decay = 1e-1, 0.9, 1e-2
+        optimizer = SGD(flamb.to_tensor([param]), learning_rate=learning_rate, momentum=momentum,
+                        nesterov=nesterov, weight_decay=weight_decay)
+        buffer = np.zeros(2)
+        for t in range(1, 4):
+            grad = np.array([1.0, 3.0]) * t
+            param.add_grad(grad)
+            optimizer.step()
+
+            grad = grad + weight_decay * values
+            buffer = momentum * buffer + grad
+            values = values - learning_rate * (grad + momentum * buffer if nesterov else buffer)
+            assert np.allclose(param.data, values)
+
+
+def test_load_momentum_state():
+    """The state of an SGD with momentum can be loaded into an SGD built without momentum"""
+    params = [flamb.Parameter(np.array([1.0, -2.0])) for _ in range(2)]
+    optimizers = [SGD(flamb.to_tensor([params[0]]), learning_rate=0.1, momentum=0.9),
+                  SGD(flamb.to_tensor([params[1]]), learning_rate=0.1)]
+    params[0].add_grad(np.array([1.0, 3.0]))
+    optimizers[0].step()
+    params[1].data[...] = params[0].data
+    optimizers[1].load_state_dict(optimizers[0].state_dict())
+    for param, optimizer in zip(params, optimizers):
+        param.add_grad(np.array([2.0, -1.0]))
+        optimizer.step()
+    assert np.allclose(params[0].data, params[1].data)
+
+
 if __name__ == '__main__':
     test_value()
+    test_sparse_update()
+    test_zero_grad()
+    test_momentum()
+    test_load_momentum_state()
 
 
@@ -0,0 +1,74 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.autograd.operators import get_value
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(3, 2)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear(x)
+
+
+class ScaledModel(Model):
+    def __call__(self, x):
+        return super().__call__(x) * 2
+
+
+def test_forward_hooks():
+    """The pre hooks can replace the inputs and the forward hooks the outputs"""
+    model = Model()
+    x = flamb.to_tensor(np.ones((4, 3)))
+    expected = get_value(model(x))
+    doubled = get_value(model(2 * x))
+    calls = []
+    pre_handle = model.linear.register_forward_pre_hook(lambda layer, args: (args[0] * 2,))
+    handle = model.register_forward_hook(lambda module, args, output: calls.append(module) or output * 3)
+    output = model(x)
+    assert calls == [model]
+    assert np.allclose(get_value(output), 3 * doubled)
+
+    pre_handle.remove()
+    handle.remove()
+    assert model._hooks is None and model.linear._hooks is None
+    assert np.allclose(get_value(model(x)), expected)
+
+
+def test_backward_hook():
+    """The backward hooks receive the gradients of the outputs, and can replace them"""
+    grads = []
+
+    def hook(layer, grad_output):
+        grads.append(grad_output[0].copy())
+        return (grad_output[0] * 10,)
+
+    model = Model()
+    x = flamb.to_tensor(np.ones((4, 3)))
+    model(x).sum().backward()
+    reference = [var.grad for var in model.linear.weights.flat]
+    for var in model.linear.get_parameters():
+        var.grad = 0
+
+    with model.linear.register_backward_hook(hook):
+        model(x).sum().backward()
+    assert len(grads) == 1 and np.array_equal(grads[0], np.ones((4, 2)))
+    assert np.allclose([var.grad for var in model.linear.weights.flat], np.array(reference) * 10)
+
+
+def test_inherited_call():
+    """A __call__ calling the one of its parent class runs the hooks once"""
+    model = ScaledModel()
+    calls = []
+    model.register_forward_pre_hook(lambda module, args: calls.append(module))
+    model(flamb.to_tensor(np.ones((1, 3))))
+    assert calls == [model]
+
+
+if __name__ == "__main__":
+    test_forward_hooks()
+    test_backward_hook()
+    test_inherited_call()
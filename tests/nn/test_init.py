@@ -0,0 +1,44 @@
+import math
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.autograd.operators import get_value
+
+
+def test_xavier_kaiming():
+    """The initializations follow the bounds and standard deviations given by the fans of the weights"""
+    layer = nn.Linear(200, 100)
+    nn.init.xavier_uniform_(layer.weights, generator=flamb.Generator(0))
+    bound = math.sqrt(6 / 300)
+    weights = get_value(layer.weights)
+    assert np.abs(weights).max() <= bound and np.abs(weights).max() > 0.9 * bound
+
+    nn.init.kaiming_normal_(layer.weights, nonlinearity="relu", generator=flamb.Generator(0))
+    assert abs(get_value(layer.weights).std() - math.sqrt(2 / 200)) < 0.005
+
+    conv = nn.Conv2d(4, 8, 3)
+    assert nn.init.calculate_fans(conv.weights.shape) == (36, 72)
+    nn.init.kaiming_uniform_(conv.weights, mode="fan_out", generator=flamb.Generator(0))
+    assert np.abs(get_value(conv.weights)).max() <= math.sqrt(6 / 72)
+
+
+def test_stored_parameters():
+    """The parameters stored by an optimizer are initialized in the flat arrays, with the same values"""
+    values = []
+    for stored in (False, True):
+        layer = nn.Linear(3, 2)
+        if stored:
+            optimizer = nn.optimizers.SGD(flamb.to_tensor(list(layer.weights.flat)), learning_rate=0.1)
+        nn.init.normal_(layer.weights, std=0.1, generator=flamb.Generator(3))
+        values.append(get_value(layer.weights))
+    assert np.array_equal(optimizer.storage.values, values[1].ravel())
+    assert np.array_equal(values[0], values[1])
+
+    embedding = nn.Embedding(4, 2)
+    nn.init.uniform_(embedding.weights, -0.5, 0.5)
+    assert np.abs(embedding.weights.data).max() <= 0.5
+
+
+if __name__ == '__main__':
+    test_xavier_kaiming()
+    test_stored_parameters()
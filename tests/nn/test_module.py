@@ -22,6 +22,30 @@ def test_module():
     assert (model.parameters.shape == (30*10 + 30 + 50*30 + 50,)), "The number of parameters is not correct"
 
 
+def test_train_eval():
+    """train and eval are propagated to the layers and the submodules"""
+    class Block(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.dropout = nn.Dropout(0.5)
+
+    class Model(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.block = Block()
+            self.batch_norm = nn.BatchNorm1d(3)
+
+    model = Model()
+    assert model.training and model.block.dropout.training
+    model.eval()
+    assert not model.training
+    assert not model.block.training and not model.block.dropout.training
+    assert not model.batch_norm.training
+    model.train()
+    assert model.block.dropout.training and model.batch_norm.training
+
+
 if __name__ == '__main__':
     test_module()
+    test_train_eval()
 
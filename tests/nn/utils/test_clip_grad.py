@@ -0,0 +1,64 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.nn.utils import clip_grad_norm_, clip_grad_value_
+
+
+def make_params():
+    params = flamb.to_tensor([flamb.Variable(1.), flamb.Variable(2.)])
+    params[0].grad, params[1].grad = 3., 4.
+    weights = flamb.Parameter(np.zeros((2, 3)))
+    weights.add_grad(np.full((2, 3), 2.))
+    return flamb.concatenate(params, flamb.to_tensor([weights])), weights
+
+
+def test_clip_grad_norm():
+    """Clipping works the same way whether the parameters are stored in flat arrays or not"""
+    for stored in [False, True]:
+        params, weights = make_params()
+        optimizer = nn.optimizers.SGD(params) if stored else None
+        norm = clip_grad_norm_(optimizer if stored else params, 1.)
+        assert np.isclose(norm, 7.), f"The norm of the gradients should be 7 but it is {norm}"
+        assert np.isclose(params[0].grad, 3/7, rtol=1e-5) and np.isclose(params[1].grad, 4/7, rtol=1e-5)
+        assert np.allclose(weights.grad, 2/7, rtol=1e-5)
+
+        # Gradients whose norm is below max_norm are not modified
+        norm = clip_grad_norm_(params, 10.)
+        assert np.isclose(norm, 1., rtol=1e-5) and np.isclose(params[0].grad, 3/7, rtol=1e-5)
+
+
+def test_clip_grad_norm_nonfinite():
+    params, _ = make_params()
+    params[0].grad = float("nan")
+    assert np.isnan(clip_grad_norm_(params, 1.))
+    try:
+        clip_grad_norm_(params, 1., error_if_nonfinite=True)
+        raise AssertionError("A non finite norm should raise an exception")
+    except Exception as e:
+        assert "cannot be clipped" in str(e)
+
+
+def test_clip_grad_value():
+    for stored in [False, True]:
+        params, weights = make_params()
+        if stored:
+            nn.optimizers.SGD(params)
+        clip_grad_value_(params, 2.5)
+        assert params[0].grad == 2.5 and params[1].grad == 2.5
+        assert np.all(weights.grad == 2.)
+
+
+def test_clip_grad_norm_repeated_indices():
+    """The rows of a sparse gradient looked up several times are summed before the norm is computed"""
+    embedding = nn.Embedding(10, 1)
+    embedding.weights.add_grad(flamb.autograd.SparseGrad(np.array([3, 3, 3, 3]), np.ones((4, 1))))
+    params = flamb.to_tensor([embedding.weights])
+    assert np.isclose(clip_grad_norm_(params, 1.), 4.)
+    assert np.isclose(embedding.weights.grad.to_dense((10, 1))[3, 0], 1., atol=1e-5)
+
+
+if __name__ == '__main__':
+    test_clip_grad_norm()
+    test_clip_grad_norm_nonfinite()
+    test_clip_grad_value()
+    test_clip_grad_norm_repeated_indices()
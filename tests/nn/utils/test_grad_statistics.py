@@ -0,0 +1,59 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.nn.utils import GradStatistics
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(3, 2)
+        self.embedding = nn.Embedding(5, 2)
+        self.initialize_parameters()
+
+
+def test_grad_statistics():
+    """The report is the same whether the parameters are stored in flat arrays or not"""
+    reports = []
+    for stored in [False, True]:
+        model = Model()
+        for i, param in enumerate(model.linear.get_parameters()):
+            param.grad = float(i)
+        model.embedding.weights.add_grad(flamb.autograd.SparseGrad(np.array([1]), np.array([[3., 4.]])))
+        if stored:
+            nn.optimizers.Adam(model.parameters)
+        reports.append(GradStatistics(model)())
+
+    for report in reports:
+        linear_norm = np.sqrt(sum(i ** 2 for i in range(8)))
+        assert np.isclose(report["layer_norms"]["linear"], linear_norm)
+        assert np.isclose(report["layer_norms"]["embedding"], 5.)
+        assert np.isclose(report["global_norm"], np.sqrt(linear_norm ** 2 + 25))
+        assert report["nonfinite_layers"] == []
+
+
+def test_grad_statistics_nonfinite():
+    model = Model()
+    nn.optimizers.SGD(model.parameters)
+    statistics = GradStatistics(model)
+    model.linear.get_parameters()[0].grad = float("inf")
+    report = statistics()
+    assert report["nonfinite_layers"] == ["linear"], f"Only linear has non finite gradients, not {report['nonfinite_layers']}"
+    assert not np.isfinite(report["global_norm"])
+
+
+def test_grad_statistics_repeated_indices():
+    """Repeated indices of a sparse gradient are summed, and a dense gradient of a sparse Parameter is supported"""
+    model = Model()
+    nn.optimizers.SGD(model.parameters)
+    statistics = GradStatistics(model)
+    model.embedding.weights.add_grad(flamb.autograd.SparseGrad(np.array([3, 3, 3, 3]), np.ones((4, 2))))
+    assert np.isclose(statistics()["layer_norms"]["embedding"], np.sqrt(2 * 16))
+    model.embedding.weights.grad = np.ones((5, 2))
+    assert np.isclose(statistics()["layer_norms"]["embedding"], np.sqrt(10))
+
+
+if __name__ == '__main__':
+    test_grad_statistics()
+    test_grad_statistics_nonfinite()
+    test_grad_statistics_repeated_indices()
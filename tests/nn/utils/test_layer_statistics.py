@@ -0,0 +1,56 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.autograd.operators import get_value
+from flamb.nn.utils import LayerStatistics
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.embedding = nn.Embedding(5, 3)
+        self.linear = nn.Linear(3, 4)
+        self.linear2 = nn.Linear(4, 1)
+        self.initialize_parameters()
+
+    def __call__(self, indices):
+        return self.linear2(self.linear(self.embedding(indices)))
+
+
+def test_layer_statistics():
+    model = Model()
+    indices = flamb.to_tensor(np.array([[0, 1], [2, 4]]))
+    expected = get_value(model(indices))
+    with LayerStatistics(model, backward_time=True) as statistics:
+        output = model(indices)
+        (output.sum() * 2).backward()
+    report = statistics.report()
+
+    assert np.allclose(get_value(output), expected)
+    assert set(report) == {"embedding", "linear", "linear2"}
+    assert all(report[name]["calls"] == 1 and report[name]["forward_time"] > 0 for name in report)
+    assert report["linear"]["backward_time"] > 0 and report["linear2"]["backward_time"] > 0
+    assert report["embedding"]["backward_time"] == 0
+    assert report["linear2"]["output_shape"] == (2, 2, 1) and report["linear"]["output_size"] == 16
+    assert np.isclose(report["linear2"]["activation_norm"], np.linalg.norm(expected))
+    assert np.isclose(report["linear2"]["grad_norm"], 4.)
+    assert "linear2" in statistics.table()
+    assert model.linear._hooks is None
+
+
+def test_inputs_unchanged():
+    """Without backward_time, the inputs of the layers are given to them as they are"""
+    model = Model()
+    x = flamb.to_tensor(np.ones((2, 3)))
+    with LayerStatistics(model.linear) as statistics:
+        output = model.linear(x)
+        linear_output = output.last_operation.variables[0]
+        assert linear_output.last_operation.variables[0] is x
+        output.sum().backward()
+    report = statistics.report()["Linear"]
+    assert report["backward_time"] == 0 and np.isclose(report["grad_norm"], np.sqrt(8))
+
+
+if __name__ == "__main__":
+    test_layer_statistics()
+    test_inputs_unchanged()
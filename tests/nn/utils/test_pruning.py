@@ -0,0 +1,108 @@
+import os
+import tempfile
+import numpy as np
+import flamb
+from flamb import nn
+from flamb import functional as F
+from flamb.autograd.operators import get_value
+from flamb.nn.utils import prune, prune_module, sparsify
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(6, 8)
+        self.linear2 = nn.Linear(8, 3)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear2(F.ReLU(self.linear(x)))
+
+
+def test_prune():
+    layer = nn.Linear(10, 6)
+    weights = get_value(layer.weights).copy()
+    mask = prune(layer, 0.3)
+    assert mask.sum() == 42 and np.all(get_value(layer.weights) == weights * mask)
+    assert np.abs(weights[~mask]).max() <= np.abs(weights[mask]).min()
+    # Pruning again counts the weights already pruned
+    assert prune(layer, 0.5).sum() == 30
+
+    layer = nn.Linear(10, 6)
+    mask = prune(layer, 0.5, structured="rows")
+    assert np.all(mask.all(axis=1) | ~mask.any(axis=1)) and mask.any(axis=1).sum() == 5
+    mask = prune(layer, 0.5, structured="columns")
+    assert np.all(get_value(layer.weights)[:, ~mask.any(axis=0)] == 0) and mask.any(axis=0).sum() == 3
+
+
+def test_fine_tuning():
+    """The pruned weights stay at 0 after the steps of the optimizers"""
+    for optimizer_class in [nn.optimizers.SGD, nn.optimizers.Adam]:
+        model = Model()
+        optimizer = optimizer_class(model.parameters, learning_rate=0.1)
+        masks = prune_module(model, 0.6, optimizer=optimizer)
+        x, y = np.random.normal(size=(16, 6)), np.random.normal(size=(16, 3))
+        for _ in range(3):
+            diff = (model(flamb.to_tensor(x)) - y) ** 2
+            loss = diff.sum() / diff.size
+            loss.backward()
+            optimizer.step()
+        for name, layer in model.named_layers():
+            weights = get_value(layer.weights)
+            assert np.all(weights[~masks[name]] == 0) and np.all(weights[masks[name]] != 0)
+
+
+def test_state_dict():
+    """An optimizer restored from a state dict keeps the pruned weights at 0"""
+    model = Model()
+    optimizer = nn.optimizers.SGD(model.parameters, learning_rate=0.1)
+    masks = prune_module(model, 0.5, optimizer=optimizer)
+    state_dict = optimizer.state_dict()
+
+    # The parameters of a model can only be given to one optimizer
+    restored_model = Model()
+    restored = nn.optimizers.SGD(restored_model.parameters, learning_rate=0.1)
+    restored.load_state_dict(state_dict)
+    restored.storage.grads[...] = 1.
+    restored.step()
+    for name, layer in restored_model.named_layers():
+        assert np.all(get_value(layer.weights)[~masks[name]] == 0)
+
+
+def test_optimizer_created_after():
+    """An optimizer created after the pruning keeps the pruned weights at 0"""
+    model = Model()
+    masks = prune_module(model, 0.5)
+    optimizer = nn.optimizers.SGD(model.parameters, learning_rate=0.1)
+    optimizer.storage.grads[...] = 1.
+    optimizer.step()
+    for name, layer in model.named_layers():
+        assert np.all(get_value(layer.weights)[~masks[name]] == 0)
+        assert np.any(get_value(layer.weights)[masks[name]] != 0)
+
+
+def test_sparsify():
+    model = Model()
+    prune(model.linear, 0.5, structured="columns")
+    prune(model.linear2, 0.5)
+    x = np.random.normal(size=(5, 6))
+    with flamb.no_grad():
+        expected = get_value(model(flamb.to_tensor(x)))
+    for max_csr_density, format in [(0.5, "compact"), (1, "csr")]:
+        sparse_model = sparsify(model, max_csr_density=max_csr_density)
+        assert isinstance(model.linear, nn.Linear) and sparse_model.linear.format == format
+        with flamb.no_grad():
+            assert np.allclose(get_value(sparse_model(x)), expected)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.npz")
+            flamb.export(sparse_model, flamb.to_tensor(x), path)
+            assert np.allclose(flamb.runtime.load(path)(x), expected)
+
+
+if __name__ == '__main__':
+    test_prune()
+    test_fine_tuning()
+    test_state_dict()
+    test_optimizer_created_after()
+    test_sparsify()
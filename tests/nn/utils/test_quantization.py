@@ -0,0 +1,45 @@
+import os
+import tempfile
+import numpy as np
+import flamb
+from flamb import nn
+from flamb import functional as F
+from flamb.autograd.operators import get_value
+from flamb.nn.utils import quantize, quantization_report
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(16, 32)
+        self.linear2 = nn.Linear(32, 4)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear2(F.ReLU(self.linear(x)))
+
+
+def test_quantize():
+    model = Model()
+    batches = [np.random.normal(size=(8, 16)) for _ in range(3)]
+    quantized = quantize(model, batches)
+    assert isinstance(quantized.linear, nn.QuantizedLinear) and isinstance(model.linear, nn.Linear)
+    assert np.isclose(quantized.linear.input_scale * 127, max(np.abs(batch).max() for batch in batches))
+
+    report = quantization_report(model, quantized, batches)
+    assert report["relative_error"] < 0.05, f"The quantized model is not accurate enough: {report}"
+    assert report["quantized_nbytes"] < report["float_nbytes"] / 4
+    assert model.training, "The mode of the float model should be restored"
+
+    # The quantized model can be exported, with int8 weights
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.npz")
+        flamb.export(quantized, flamb.to_tensor(batches[0]), path)
+        with np.load(path) as data:
+            assert any(data[name].dtype == np.int8 for name in data.files)
+        program = flamb.runtime.load(path)
+    assert np.array_equal(program(batches[1]), get_value(quantized(batches[1])))
+
+
+if __name__ == '__main__':
+    test_quantize()
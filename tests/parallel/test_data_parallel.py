@@ -0,0 +1,55 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.data import DataLoader, TensorDataset
+from flamb.parallel import DataParallel
+from flamb.train import Trainer
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(3, 2)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear(x)
+
+
+def mean_squared_error(output, target):
+    diff = (output - target) ** 2
+    return diff.sum() / diff.size
+
+
+def make_loader():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(10, 3))
+    return DataLoader(TensorDataset(x, x[:, :2] * 2 - 1), batch_size=5)
+
+
+def make_trainer():
+    flamb.manual_seed(0)
+    model = Model()
+    return Trainer(model, mean_squared_error, nn.optimizers.Adam(model.parameters, learning_rate=0.1))
+
+
+def test_data_parallel():
+    """Training with 3 workers gives the same parameters and optimizer state as a single process"""
+    trainer = make_trainer()
+    history = trainer.fit(make_loader(), epochs=3)
+
+    parallel_trainer = make_trainer()
+    optimizer = parallel_trainer.optimizer
+    with DataParallel(parallel_trainer.model, mean_squared_error, optimizer, nb_workers=3) as data_parallel:
+        losses = data_parallel.fit(make_loader(), epochs=3)
+        # The parameters of the main process are updated by the workers
+        assert np.allclose([var.value for var in parallel_trainer.model.parameters], optimizer.storage.values)
+
+    assert np.allclose(losses, [metrics["loss"] for metrics in history])
+    assert np.allclose(optimizer.storage.values, trainer.optimizer.storage.values)
+    assert np.allclose(optimizer.state["first_momentum"], trainer.optimizer.state["first_momentum"])
+    assert optimizer.step_count == trainer.optimizer.step_count == 6
+
+
+if __name__ == '__main__':
+    test_data_parallel()
@@ -0,0 +1,78 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.data import DataLoader, TensorDataset
+from flamb.parallel import Hogwild
+from flamb.train import Trainer
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(4, 1)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear(x)
+
+
+def mean_squared_error(output, target):
+    diff = (output - target) ** 2
+    return diff.sum() / diff.size
+
+
+def test_convergence():
+    """Hogwild SGD converges to the same solution as single-process SGD on a synthetic regression"""
+    rng = np.random.default_rng(0)
+    weights = np.array([[1.], [-2.], [0.5], [3.]])
+    x = rng.normal(size=(200, 4))
+    dataset = TensorDataset(x, x @ weights + 0.7)
+    solution = np.concatenate([weights.ravel(), [0.7]])
+
+    flamb.manual_seed(0)
+    model = Model()
+    optimizer = nn.optimizers.SGD(model.parameters, learning_rate=0.05)
+    with Hogwild(model, mean_squared_error, optimizer, nb_workers=2) as hogwild:
+        statistics = hogwild.fit(dataset, batch_size=10, epochs=15)
+        hogwild_values = optimizer.storage.values.copy()
+
+    assert [result["rank"] for result in statistics] == [0, 1]
+    assert all(result["samples"] == 100 * 15 and result["samples_per_second"] > 0 for result in statistics)
+    assert np.allclose(hogwild_values, solution, atol=1e-2), f"{hogwild_values} != {solution}"
+    assert np.all([var.value for var in model.parameters] == hogwild_values)
+
+    flamb.manual_seed(0)
+    model = Model()
+    trainer = Trainer(model, mean_squared_error, nn.optimizers.SGD(model.parameters, learning_rate=0.05))
+    trainer.fit(DataLoader(dataset, batch_size=10, shuffle=True, seed=0), epochs=15)
+    assert np.allclose(trainer.optimizer.storage.values, hogwild_values, atol=1e-2)
+
+
+def test_sparse_model():
+    """The sparse parameters are shared too: workers update the rows of the features of their samples"""
+    class SparseLinear(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.embedding = nn.Embedding(40, 1)
+            self.initialize_parameters()
+
+        def __call__(self, features):
+            embedded = self.embedding(features)
+            return embedded[:, 0] + embedded[:, 1] + embedded[:, 2]
+
+    rng = np.random.default_rng(1)
+    weights = rng.normal(size=40)
+    features = rng.integers(0, 40, size=(400, 3))
+    dataset = TensorDataset(features, weights[features].sum(axis=1, keepdims=True))
+
+    model = SparseLinear()
+    optimizer = nn.optimizers.SGD(model.parameters, learning_rate=0.1)
+    prepare_batch = lambda batch: (batch[0], flamb.to_tensor(batch[1]))
+    with Hogwild(model, mean_squared_error, optimizer, nb_workers=2, prepare_batch=prepare_batch) as hogwild:
+        hogwild.fit(dataset, batch_size=4, epochs=10)
+    assert np.allclose(model.embedding.weights.data.ravel(), weights, atol=0.05)
+
+
+if __name__ == '__main__':
+    test_convergence()
+    test_sparse_model()
@@ -0,0 +1,90 @@
+import asyncio
+import numpy as np
+from flamb import nn
+from flamb.autograd.operators import get_value
+from flamb.serve import DynamicBatcher
+import flamb
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(3, 2)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear(x)
+
+
+def test_dynamic_batching():
+    """Concurrent requests are merged into batches, and each one gets its own output"""
+    model = Model()
+    samples = np.random.default_rng(0).normal(size=(20, 3))
+    expected = get_value(model(flamb.to_tensor(samples)))
+
+    async def main(worker_type):
+        batcher = DynamicBatcher(model, max_batch_size=8, max_wait=0.05, worker_type=worker_type)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*[batcher.predict(sample) for sample in samples]), batcher.statistics
+        finally:
+            await batcher.stop()
+
+    for worker_type in ["thread", "process"]:
+        outputs, statistics = asyncio.run(main(worker_type))
+        assert np.allclose(outputs, expected)
+        report = statistics.report()
+        assert report["requests"] == 20 and max(report["batch_sizes"]) == 8
+        assert sum(size * count for size, count in report["batch_sizes"].items()) == 20
+        assert report["p50_ms"] <= report["p90_ms"] <= report["p99_ms"]
+    assert not model.training, "The model should be in evaluation mode"
+
+
+def test_malformed_request():
+    """A request with a wrong shape fails alone, and the batcher keeps answering the next requests"""
+    model = Model()
+    samples = np.random.default_rng(0).normal(size=(3, 3))
+    expected = get_value(model(flamb.to_tensor(samples)))
+
+    async def main():
+        batcher = DynamicBatcher(model, max_batch_size=8, max_wait=0.05)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(
+                batcher.predict(samples[0]), batcher.predict(np.ones(5)), batcher.predict(samples[1]),
+                return_exceptions=True,
+            )
+            return results, await batcher.predict(samples[2])
+        finally:
+            await batcher.stop()
+
+    results, last_output = asyncio.run(main())
+    assert isinstance(results[1], Exception)
+    assert np.allclose(results[0], expected[0]) and np.allclose(results[2], expected[1])
+    assert np.allclose(last_output, expected[2])
+
+
+def test_wrong_number_of_outputs():
+    """If the model does not return one output per sample, all the requests of the batch fail"""
+    def model(x):
+        assert isinstance(x, np.ndarray) and x.dtype == np.float64, "The batch should be a float array"
+        return x[:1]
+
+    async def main():
+        batcher = DynamicBatcher(model, max_batch_size=8, max_wait=0.05)
+        await batcher.start()
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*[batcher.predict(np.ones(3)) for _ in range(3)], return_exceptions=True), 5
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, Exception) for result in results)
+
+
+if __name__ == '__main__':
+    test_dynamic_batching()
+    test_malformed_request()
+    test_wrong_number_of_outputs()
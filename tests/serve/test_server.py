@@ -0,0 +1,43 @@
+import asyncio
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.autograd.operators import get_value
+from flamb.serve import DynamicBatcher, Server, generate_load
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(4, 1)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear(x)
+
+
+def test_load():
+    """A load generator with concurrent clients gets the right outputs from a server on a local socket"""
+    model = Model()
+    samples = np.random.default_rng(0).normal(size=(60, 4))
+    expected = get_value(model(flamb.to_tensor(samples)))
+
+    async def main():
+        server = Server(DynamicBatcher(model, max_batch_size=16, max_wait=0.01))
+        await server.start()
+        try:
+            outputs, client_statistics = await generate_load(server.host, server.port, list(samples), nb_clients=12)
+        finally:
+            await server.stop()
+        return outputs, client_statistics, server.batcher.statistics
+
+    outputs, client_statistics, server_statistics = asyncio.run(main())
+    assert np.allclose(np.array(outputs), expected)
+    assert client_statistics.report()["requests"] == 60
+    batch_sizes = server_statistics.report()["batch_sizes"]
+    assert sum(size * count for size, count in batch_sizes.items()) == 60
+    assert max(batch_sizes) > 1, "Concurrent requests should be batched"
+
+
+if __name__ == '__main__':
+    test_load()
@@ -0,0 +1,111 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb import functional as F
+from flamb.autograd.operators import TensorOperator
+from flamb.utils import checkpoint, checkpoint_sequential
+
+
+class Model(nn.Module):
+    def __init__(self, depth=8):
+        super().__init__()
+        self.depth = depth
+        for i in range(depth):
+            setattr(self, f"linear{i}", nn.Linear(4, 4))
+        self.initialize_parameters()
+
+    def functions(self):
+        for i in range(self.depth):
+            yield getattr(self, f"linear{i}")
+            yield F.tanh
+
+    def __call__(self, x, segments=None):
+        if segments is not None:
+            return checkpoint_sequential(self.functions(), segments, x)
+        for function in self.functions():
+            x = function(x)
+        return x
+
+
+def graph_operators(x):
+    """Returns the TensorOperators kept by the graph of x"""
+    operators, stack = set(), [x]
+    while stack:
+        operator = getattr(stack.pop(), "last_operation", None)
+        if isinstance(operator, TensorOperator) and operator not in operators:
+            operators.add(operator)
+            stack.extend(operator.variables)
+    return operators
+
+
+def test_checkpoint_sequential():
+    """The gradients of the parameters and of the input are the same, and the graph only keeps the segments"""
+    model = Model()
+    optimizer = nn.optimizers.SGD(model.parameters)
+    x = np.random.normal(size=(3, 4))
+    grads = []
+    for segments in [None, 4]:
+        optimizer.zero_grad()
+        inputs = flamb.to_tensor(x, requires_grad=True)
+        output = model(inputs, segments)
+        if segments is not None:
+            # 3 checkpointed segments, and the 4 operators of the last segment
+            assert len(graph_operators(output)) == 3 + 4
+        (output * output).sum().backward()
+        grads.append((optimizer.storage.grads.copy(), np.array([var.grad for var in inputs.flat])))
+    assert np.allclose(grads[0][0], grads[1][0]) and np.any(grads[0][0] != 0)
+    assert np.allclose(grads[0][1], grads[1][1])
+
+
+def test_checkpoint():
+    """The input of a checkpoint does not need a gradient for the parameters used inside to get one"""
+    linear = nn.Linear(3, 2)
+    optimizer = nn.optimizers.SGD(linear.get_parameters())
+    x = flamb.to_tensor(np.random.normal(size=(5, 3)))
+    checkpoint(lambda x: F.tanh(linear(x)), x).sum().backward()
+    expected = optimizer.storage.grads.copy()
+    optimizer.zero_grad()
+    F.tanh(linear(x)).sum().backward()
+    assert np.allclose(optimizer.storage.grads, expected)
+
+
+def check_dropout(dropout, fn):
+    """The gradients of the parameters of linear are the same with and without checkpointing fn"""
+    optimizer.zero_grad()
+    x = flamb.to_tensor(np.random.normal(size=(4, 8)))
+    state = flamb.random.get_generator(dropout.generator).get_state()
+    checkpoint(fn, x).sum().backward()
+    expected = optimizer.storage.grads.copy()
+    optimizer.zero_grad()
+    flamb.random.get_generator(dropout.generator).set_state(state)
+    fn(x).sum().backward()
+    assert np.allclose(optimizer.storage.grads, expected)
+
+
+linear = nn.Linear(8, 8)
+optimizer = nn.optimizers.SGD(linear.get_parameters())
+dropout = nn.Dropout(0.5, seed=0)
+layers = {"dropout": nn.Dropout(0.5, generator=flamb.Generator(2))}
+
+
+def global_block(x):
+    return dropout(linear(x))
+
+
+def dict_block(x):
+    return layers["dropout"](linear(x))
+
+
+def test_checkpoint_dropout():
+    """The Dropout layers draw the same mask when fn is run again, with the default generator or their own"""
+    for layer in [nn.Dropout(0.5), nn.Dropout(0.5, seed=0), nn.Dropout(0.5, generator=flamb.Generator(1))]:
+        check_dropout(layer, lambda x: layer(linear(x)))
+    # Layers which fn reaches through the globals of its module, or through a dict
+    check_dropout(dropout, global_block)
+    check_dropout(layers["dropout"], dict_block)
+
+
+if __name__ == '__main__':
+    test_checkpoint_sequential()
+    test_checkpoint()
+    test_checkpoint_dropout()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import numpy as np
+import flamb
+from flamb import nn
+from flamb import functional as F
+from flamb.autograd.operators import get_value
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(5, 8)
+        self.batch_norm = nn.BatchNorm1d(8)
+        self.dropout = nn.Dropout(0.3)
+        self.linear2 = nn.Linear(8, 2)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        x = F.ReLU(self.linear(x))
+        x = F.tanh(self.batch_norm(x))
+        return self.linear2(self.dropout(x))
+
+
+def test_export():
+    """The runtime gives bit-identical results to the eager forward (in evaluation mode)"""
+    model = Model()
+    model.batch_norm.running_mean = np.random.normal(size=8)
+    x = np.random.normal(size=(16, 5))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.npz")
+        flamb.export(model, flamb.to_tensor(x), path)
+        assert model.training, "The module should be back in training mode"
+        program = flamb.runtime.load(path)
+
+    assert [operation["type"] for operation in program.operations] == ["linear", "relu", "affine", "tanh", "linear"]
+    model.eval()
+    for batch in [x, np.random.normal(size=(3, 5))]:
+        expected = get_value(model(flamb.to_tensor(batch)))
+        assert np.array_equal(program(batch), expected)
+        assert np.array_equal(program(batch), expected), "Reusing the planned buffers should not change the results"
+
+
+def test_unsupported_operation():
+    class Residual(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.linear = nn.Linear(3, 3)
+            self.linear2 = nn.Linear(3, 3)
+
+        def __call__(self, x):
+            return self.linear2(self.linear(x) + x)
+
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            flamb.export(Residual(), flamb.to_tensor(np.ones((2, 3))), os.path.join(directory, "model.npz"))
+            raise AssertionError("The sum of tensors cannot be exported")
+        except Exception as e:
+            assert "cannot be exported" in str(e)
+
+
+if __name__ == '__main__':
+    test_export()
+    test_unsupported_operation()
@@ -0,0 +1,58 @@
+import multiprocessing
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.autograd.operators import get_value
+from flamb.random import default_generator, seed_worker
+
+
+def test_manual_seed():
+    """The same seed gives the same tensors and the same initializations"""
+    flamb.manual_seed(0)
+    x, layer = flamb.rand((3, 4)), nn.Linear(4, 2)
+    flamb.manual_seed(0)
+    assert np.array_equal(get_value(flamb.rand((3, 4))), get_value(x))
+    assert np.array_equal(get_value(nn.Linear(4, 2).weights), get_value(layer.weights))
+    assert np.all(np.abs(get_value(x)) <= 1)
+
+
+def test_generator():
+    """A generator is independent from the default generator, and its state can be saved and restored"""
+    generator = flamb.Generator(5)
+    state = generator.get_state()
+    flamb.manual_seed(1)
+    x = flamb.randn((100,), generator=generator)
+    flamb.rand((10,))
+    generator.set_state(state)
+    assert np.array_equal(get_value(flamb.randn((100,), generator=generator)), get_value(x))
+    assert np.array_equal(get_value(nn.Embedding(3, 2, generator=flamb.Generator(2)).weights),
+                          get_value(nn.Embedding(3, 2, generator=flamb.Generator(2)).weights))
+
+
+def draw(generator, queue):
+    seed_worker(generator)
+    queue.put(get_value(flamb.rand((5,))))
+
+
+def test_workers():
+    """Forked workers seeded with spawned generators draw different numbers, the same ones at each run"""
+    context = multiprocessing.get_context("fork")
+    values = []
+    for _ in range(2):
+        flamb.manual_seed(0)
+        queue = context.Queue()
+        workers = [context.Process(target=draw, args=(generator, queue)) for generator in default_generator.spawn(2)]
+        for worker in workers:
+            worker.start()
+        results = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        values.append(sorted(results, key=lambda x: x[0]))
+    assert not np.array_equal(values[0][0], values[0][1])
+    assert np.array_equal(values[0], values[1])
+
+
+if __name__ == '__main__':
+    test_manual_seed()
+    test_generator()
+    test_workers()
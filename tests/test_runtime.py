@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from flamb import runtime
+
+
+def make_program(path):
+    weights, bias = np.arange(6.).reshape(3, 2), np.array([1., -20.])
+    graph = {
+        "operations": [
+            {"type": "linear", "inputs": ["input", "weights", "bias"], "output": "hidden"},
+            {"type": "relu", "inputs": ["hidden"], "output": "output"},
+        ],
+        "output": "output",
+    }
+    runtime.save(path, graph, {"weights": weights, "bias": bias})
+    return weights, bias
+
+
+def test_program():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.npz")
+        weights, bias = make_program(path)
+        program = runtime.load(path)
+    x = np.arange(12.).reshape(4, 3)
+    output = program(x)
+    assert np.array_equal(output, np.maximum(x @ weights + bias, 0))
+    assert list(program.plans) == [(4, 3)], "The execution should be planned once per input shape"
+    assert program(x) is not output and np.array_equal(program(x), output)
+
+
+def test_standalone():
+    """The runtime only imports numpy: it can be used without flamb"""
+    code = (
+        "import importlib.util, sys\n"
+        f"spec = importlib.util.spec_from_file_location('runtime', {runtime.__file__!r})\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        "assert 'flamb' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+if __name__ == '__main__':
+    test_program()
+    test_standalone()
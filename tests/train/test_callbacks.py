@@ -0,0 +1,56 @@
+import os
+import pickle
+import tempfile
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.data import DataLoader, TensorDataset
+from flamb.train import Trainer, Callback, Evaluation, Checkpoint
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(2, 1)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear(x)
+
+
+def test_callbacks():
+    class Recorder(Callback):
+        def __init__(self):
+            self.events = []
+
+        def on_epoch_begin(self, trainer):
+            self.events.append("epoch")
+
+        def on_step_end(self, trainer):
+            assert any(var.grad != 0 for var in trainer.model.parameters), "The gradients are kept until the callbacks"
+            self.events.append("step")
+
+    x = np.arange(12.).reshape(6, 2) / 10
+    loader = DataLoader(TensorDataset(x, x.sum(axis=1, keepdims=True)), batch_size=3)
+    model = Model()
+    recorder = Recorder()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "checkpoint_{epoch}.pkl")
+        trainer = Trainer(model, nn.MSE(), nn.optimizers.SGD(model.parameters), callbacks=[
+            recorder, Evaluation(loader, every=2), Checkpoint(path, every=2)
+        ])
+        history = trainer.fit(loader, epochs=2)
+        assert recorder.events == ["epoch", "step", "step", "epoch", "step", "step"]
+        assert "validation_loss" not in history[0] and "validation_loss" in history[1]
+
+        with open(path.format(epoch=1), "rb") as file:
+            state_dict = pickle.load(file)
+        new_model = Model()
+        new_trainer = Trainer(new_model, nn.MSE(), nn.optimizers.SGD(new_model.parameters))
+        new_trainer.load_state_dict(state_dict)
+        assert new_trainer.epoch == 1 and new_trainer.step_count == 4
+        assert np.all([var.value for var in new_model.parameters] == trainer.optimizer.storage.values)
+
+
+if __name__ == '__main__':
+    test_callbacks()
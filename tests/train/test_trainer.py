@@ -0,0 +1,96 @@
+import numpy as np
+import flamb
+from flamb import nn
+from flamb.data import DataLoader, TensorDataset
+from flamb.train import Trainer
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = nn.Linear(3, 1)
+        self.initialize_parameters()
+
+    def __call__(self, x):
+        return self.linear(x)
+
+
+def mean_squared_error(output, target):
+    diff = (output - target) ** 2
+    return diff.sum() / diff.size
+
+
+def make_dataset(seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(8, 3))
+    return TensorDataset(x, x @ np.array([[1.], [-2.], [0.5]]) + 0.3)
+
+
+def test_accumulation():
+    """Accumulating the gradients of batches or micro-batches is equivalent to a step on the whole batch"""
+    values = []
+    for batch_size, accumulation_steps, micro_batch_size in [(8, 1, None), (4, 2, None), (2, 4, None), (8, 1, 3)]:
+        np.random.seed(0)
+        flamb.manual_seed(0)
+        model = Model()
+        optimizer = nn.optimizers.SGD(model.parameters, learning_rate=0.1)
+        trainer = Trainer(model, mean_squared_error, optimizer, accumulation_steps=accumulation_steps,
+                          micro_batch_size=micro_batch_size)
+        trainer.fit(DataLoader(make_dataset(), batch_size=batch_size))
+        assert trainer.step_count == 1
+        values.append(optimizer.storage.values.copy())
+
+    for value in values[1:]:
+        assert np.allclose(value, values[0]), f"{value} != {values[0]}"
+
+
+def test_last_accumulation():
+    """The last group of batches, smaller than accumulation_steps, gives the gradient of its mean loss"""
+    values = []
+    for batch_size, accumulation_steps in [(6, 1), (2, 3)]:
+        flamb.manual_seed(0)
+        model = Model()
+        optimizer = nn.optimizers.SGD(model.parameters, learning_rate=0.1)
+        trainer = Trainer(model, mean_squared_error, optimizer, accumulation_steps=accumulation_steps)
+        trainer.fit(DataLoader(make_dataset(), batch_size=batch_size))
+        assert trainer.step_count == 2
+        values.append(optimizer.storage.values.copy())
+    assert np.allclose(values[0], values[1]), f"{values[1]} != {values[0]}"
+
+
+def test_evaluate_empty():
+    model = Model()
+    trainer = Trainer(model, mean_squared_error, nn.optimizers.SGD(model.parameters))
+    assert np.isnan(trainer.evaluate([]))
+
+
+def test_evaluate_mode():
+    """evaluate puts the model back in the mode it was in"""
+    model = Model()
+    trainer = Trainer(model, mean_squared_error, nn.optimizers.SGD(model.parameters))
+    for training in [True, False]:
+        model.train(training)
+        trainer.evaluate(DataLoader(make_dataset(), batch_size=4))
+        assert model.training == training and model.linear.training == training
+
+
+def test_fit():
+    model = Model()
+    optimizer = nn.optimizers.Adam(model.parameters, learning_rate=0.1)
+    trainer = Trainer(model, mean_squared_error, optimizer)
+    history = trainer.fit(DataLoader(make_dataset(), batch_size=4, shuffle=True, seed=0), epochs=30)
+
+    assert len(history) == 30 and trainer.step_count == 60
+    assert history[-1]["loss"] < history[0]["loss"] / 10, "The loss should decrease"
+    assert all(history[-1][f"time_{phase}"] > 0 for phase in Trainer.phases)
+    assert np.isclose(trainer.evaluate(DataLoader(make_dataset(), batch_size=3)),
+                      trainer.evaluate(DataLoader(make_dataset(), batch_size=8)))
+    assert all(var.grad == 0 for var in model.parameters), "The gradients should be set to 0 after the steps"
+
+
+if __name__ == '__main__':
+    test_accumulation()
+    test_last_accumulation()
+    test_evaluate_empty()
+    test_evaluate_mode()
+    test_fit()